@@ -1,9 +1,20 @@
 from fastapi import APIRouter
+from app.core.config import settings
 from app.api.v1.endpoints.auth import router as auth_router
-from app.api.v1.endpoints.admin import router as admin_router
-from app.api.v1.endpoints.restaurant import router as restaurant_router
-from app.api.v1.endpoints.cashier import router as cashier_router
-from app.api.v1.endpoints.inventory import router as inventory_router
+from app.api.v1.endpoints.kitchen import router as kitchen_router
+
+if settings.ASYNC_ENDPOINTS:
+    from app.api.v1.async_endpoints.admin import router as admin_router
+    from app.api.v1.async_endpoints.restaurant import router as restaurant_router
+    from app.api.v1.async_endpoints.cashier import router as cashier_router
+    from app.api.v1.async_endpoints.inventory import router as inventory_router
+    from app.api.v1.async_endpoints.reports import router as reports_router
+else:
+    from app.api.v1.endpoints.admin import router as admin_router
+    from app.api.v1.endpoints.restaurant import router as restaurant_router
+    from app.api.v1.endpoints.cashier import router as cashier_router
+    from app.api.v1.endpoints.inventory import router as inventory_router
+    from app.api.v1.endpoints.reports import router as reports_router
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -12,5 +23,7 @@ api_router.include_router(admin_router)
 api_router.include_router(restaurant_router)
 api_router.include_router(cashier_router)
 api_router.include_router(inventory_router)
+api_router.include_router(reports_router)
+api_router.include_router(kitchen_router)
 
 __all__ = ["api_router"]
@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_session import get_async_db
+from app.core.security import get_current_user, require_permission
+from app.schemas.user import UserResponse, UserCreate, UserUpdate, RoleResponse, RoleCreate, PermissionResponse, PermissionCreate
+from app.api.v1.pagination import PageParams
+from app.api.v1.projections import PERMISSIONS, USER_PAGE, role_lookup
+from app.crud.aio import user as crud_user
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# User endpoints
+@router.get("/users", response_model=list[UserResponse], dependencies=[Depends(require_permission("view_users"))])
+async def list_users(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """List users, one page at a time"""
+    users = await crud_user.get_users(db, page.limit, page.cursor, columns=USER_PAGE.columns)
+    roles = role_lookup(await crud_user.get_roles(db))
+    return USER_PAGE.page_response(users, role=lambda row: roles.get(row.role_id))
+
+@router.post("/users", response_model=UserResponse, dependencies=[Depends(require_permission("manage_users"))])
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new user"""
+    existing = await crud_user.get_user_by_username(db, user.username)
+    if existing:
+        raise HTTPException(status_code=400, detail="Username already exists")
+    return await crud_user.create_user(db, user)
+
+@router.get("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_permission("view_users"))])
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific user"""
+    user = await crud_user.get_user(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@router.put("/users/{user_id}", response_model=UserResponse, dependencies=[Depends(require_permission("manage_users"))])
+async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update a user"""
+    updated = await crud_user.update_user(db, user_id, user)
+    if not updated:
+        raise HTTPException(status_code=404, detail="User not found")
+    return updated
+
+@router.delete("/users/{user_id}", dependencies=[Depends(require_permission("manage_users"))])
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a user"""
+    deleted = await crud_user.delete_user(db, user_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"deleted": True}
+
+# Role endpoints
+@router.get("/roles", response_model=list[RoleResponse], dependencies=[Depends(require_permission("view_roles"))])
+async def list_roles(db: AsyncSession = Depends(get_async_db)):
+    """List all roles"""
+    return await crud_user.get_roles(db)
+
+@router.post("/roles", response_model=RoleResponse, dependencies=[Depends(require_permission("manage_roles"))])
+async def create_role(role: RoleCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new role"""
+    return await crud_user.create_role(db, role)
+
+@router.get("/roles/{role_id}", response_model=RoleResponse, dependencies=[Depends(require_permission("view_roles"))])
+async def get_role(role_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific role"""
+    role = await crud_user.get_role(db, role_id)
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return role
+
+@router.put("/roles/{role_id}", response_model=RoleResponse, dependencies=[Depends(require_permission("manage_roles"))])
+async def update_role(role_id: int, role: RoleCreate, db: AsyncSession = Depends(get_async_db)):
+    """Update a role"""
+    updated = await crud_user.update_role(db, role_id, role)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return updated
+
+@router.delete("/roles/{role_id}", dependencies=[Depends(require_permission("manage_roles"))])
+async def delete_role(role_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a role"""
+    deleted = await crud_user.delete_role(db, role_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return {"deleted": True}
+
+# Permission endpoints
+@router.get("/permissions", response_model=list[PermissionResponse], dependencies=[Depends(require_permission("view_permissions"))])
+async def list_permissions(db: AsyncSession = Depends(get_async_db)):
+    """List all permissions"""
+    return PERMISSIONS.response(await crud_user.get_permissions(db, columns=PERMISSIONS.columns))
+
+@router.post("/permissions", response_model=PermissionResponse, dependencies=[Depends(require_permission("manage_permissions"))])
+async def create_permission(permission: PermissionCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new permission"""
+    return await crud_user.create_permission(db, permission)
+
+@router.delete("/permissions/{permission_id}", dependencies=[Depends(require_permission("manage_permissions"))])
+async def delete_permission(permission_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a permission"""
+    deleted = await crud_user.delete_permission(db, permission_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Permission not found")
+    return {"deleted": True}
+
+# Role-Permission assignment
+@router.post("/roles/{role_id}/permissions/{permission_id}", dependencies=[Depends(require_permission("manage_roles"))])
+async def assign_permission_to_role(role_id: int, permission_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Assign a permission to a role"""
+    result = await crud_user.assign_permission_to_role(db, role_id, permission_id)
+    if not result:
+        raise HTTPException(status_code=404, detail="Role or Permission not found")
+    return {"status": "permission assigned"}
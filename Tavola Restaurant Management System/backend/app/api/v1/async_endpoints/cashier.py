@@ -0,0 +1,79 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_session import get_async_db
+from app.core.security import require_permission
+from app.schemas.order import PaymentResponse, PaymentCreate, InvoiceResponse, OrderTotalsCheck, PaymentReconciliation
+from app.api.v1.pagination import PageParams
+from app.api.v1.projections import PAYMENT_PAGE
+from app.api.v1.export import ExportParams, export_response
+from app.crud import order as sync_order
+from app.crud.aio import order as crud_order
+from app.crud.order import IdempotencyError, PaymentError
+
+router = APIRouter(prefix="/cashier", tags=["cashier"])
+
+@router.get("/orders/{order_id}/invoice", response_model=InvoiceResponse)
+async def generate_invoice(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Generate invoice for an order"""
+    order = await crud_order.get_order(db, order_id, load="items")
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    return {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "items": order.items,
+        "subtotal": order.subtotal,
+        "tax_amount": order.tax_amount,
+        "total_amount": order.total_amount,
+        "amount_paid": order.amount_paid,
+        "balance_due": order.balance_due,
+    }
+
+@router.post("/orders/totals/check", response_model=OrderTotalsCheck, dependencies=[Depends(require_permission("manage_billing"))])
+async def check_order_totals(fix: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Recompute stored order totals from their items and report (or fix) mismatches"""
+    checked, mismatched = await crud_order.check_order_totals(db, fix)
+    return {"checked": checked, "mismatched": mismatched, "fixed": fix and bool(mismatched)}
+
+@router.post("/payments", response_model=PaymentResponse)
+async def process_payment(
+    payment: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Process a full or partial payment; retries with the same Idempotency-Key are not charged twice"""
+    try:
+        created = await crud_order.create_payment(db, payment, idempotency_key)
+    except IdempotencyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except PaymentError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not created:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return created
+
+@router.post("/payments/reconcile", response_model=PaymentReconciliation, dependencies=[Depends(require_permission("manage_billing"))])
+async def reconcile_payments(fix: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Recompute paid balances from completed payments and report (or fix) mismatches"""
+    checked, mismatched = await crud_order.reconcile_payments(db, fix)
+    return {"checked": checked, "mismatched": mismatched, "fixed": fix and bool(mismatched)}
+
+@router.post("/payments/{payment_id}/refund", response_model=PaymentResponse)
+async def refund_payment(payment_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Refund a payment"""
+    refunded = await crud_order.refund_payment(db, payment_id)
+    if not refunded:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return refunded
+
+@router.get("/payments", response_model=list[PaymentResponse])
+async def list_payments(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """List payments, one page at a time"""
+    return PAYMENT_PAGE.page_response(await crud_order.get_payments(db, page.limit, page.cursor, columns=PAYMENT_PAGE.columns))
+
+@router.get("/payments/export")
+async def export_payments(params: ExportParams = Depends()):
+    """Stream payments as NDJSON or CSV, optionally limited to a date range"""
+    return export_response(sync_order.payment_export_query(params.start, params.end), params, "payments")
@@ -0,0 +1,110 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_session import get_async_db
+from app.schemas.inventory import InventoryItemResponse, InventoryItemCreate, StockMovementResponse, StockMovementCreate, StockMovementBatchResponse, StockLevelResponse, StockSnapshotResponse, StockAlertResponse, ForecastResponse
+from app.api.v1.pagination import PageParams
+from app.api.v1.projections import INGREDIENTS, INGREDIENT_PAGE, STOCK_MOVEMENT_PAGE
+from app.api.v1.export import ExportParams, export_response
+from app.api.v1.imports import RowError, import_openapi, read_rows
+from app.crud import inventory as sync_inventory
+from app.crud.aio import inventory as crud_inventory
+
+router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+@router.get("/items", response_model=list[InventoryItemResponse])
+async def list_items(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """List inventory items, one page at a time"""
+    return INGREDIENT_PAGE.page_response(await crud_inventory.get_ingredients(db, page.limit, page.cursor, columns=INGREDIENT_PAGE.columns))
+
+@router.post("/items", response_model=InventoryItemResponse)
+async def create_item(item: InventoryItemCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new inventory item"""
+    return await crud_inventory.create_ingredient(db, item)
+
+@router.get("/items/low-stock", response_model=list[InventoryItemResponse])
+async def get_low_stock_items(db: AsyncSession = Depends(get_async_db)):
+    """Get items with low stock (declared before /items/{item_id} so it is reachable)"""
+    return INGREDIENTS.response(await crud_inventory.get_low_stock_items(db, columns=INGREDIENTS.columns))
+
+@router.get("/alerts", response_model=list[StockAlertResponse])
+async def list_alerts(level: str = None, db: AsyncSession = Depends(get_async_db)):
+    """Ingredients currently below their reorder ("low") or minimum ("critical") level"""
+    return await crud_inventory.get_alerts(db, level)
+
+@router.get("/items/{item_id}", response_model=InventoryItemResponse)
+async def get_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific inventory item"""
+    item = await crud_inventory.get_ingredient(db, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+@router.put("/items/{item_id}", response_model=InventoryItemResponse)
+async def update_item(item_id: int, item: InventoryItemCreate, db: AsyncSession = Depends(get_async_db)):
+    """Update an inventory item"""
+    updated = await crud_inventory.update_ingredient(db, item_id, item)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return updated
+
+@router.delete("/items/{item_id}")
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete an inventory item"""
+    deleted = await crud_inventory.delete_ingredient(db, item_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return {"deleted": True}
+
+@router.post("/movements", response_model=StockMovementResponse)
+async def create_stock_movement(movement: StockMovementCreate, db: AsyncSession = Depends(get_async_db)):
+    """Record a stock movement"""
+    try:
+        result = await crud_inventory.create_stock_movement(db, movement)
+    except crud_inventory.StockError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not result:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return result
+
+@router.post("/movements/batch", response_model=StockMovementBatchResponse, openapi_extra=import_openapi(StockMovementCreate))
+async def create_stock_movements(request: Request, all_or_nothing: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Record a batch of stock movements (JSON array, NDJSON or CSV) in one transaction"""
+    rows, errors = await read_rows(request, StockMovementCreate)
+    received = len(rows) + len(errors)
+    inserted = 0
+    if rows and not (errors and all_or_nothing):
+        inserted, row_errors = await crud_inventory.create_stock_movements(db, rows, all_or_nothing)
+        errors += [RowError(*error) for error in row_errors]
+    return {"received": received, "inserted": inserted, "errors": sorted(errors)}
+
+@router.get("/movements", response_model=list[StockMovementResponse])
+async def list_movements(ingredient_id: int = None, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """List stock movements, one page at a time"""
+    movements = await crud_inventory.get_stock_movements(db, ingredient_id, page.limit, page.cursor, columns=STOCK_MOVEMENT_PAGE.columns)
+    return STOCK_MOVEMENT_PAGE.page_response(movements)
+
+@router.get("/movements/export")
+async def export_movements(ingredient_id: int = None, params: ExportParams = Depends()):
+    """Stream stock movements as NDJSON or CSV, optionally limited to a date range"""
+    query = sync_inventory.stock_movement_export_query(params.start, params.end, ingredient_id)
+    return export_response(query, params, "stock_movements")
+
+@router.get("/stock", response_model=list[StockLevelResponse])
+async def get_stock_at(at: datetime, ingredient_id: int = None, db: AsyncSession = Depends(get_async_db)):
+    """Stock levels at a point in time, from the nearest snapshot and the movements since"""
+    levels = await crud_inventory.stock_at(db, at, ingredient_id)
+    return [{"ingredient_id": id_, "stock": stock} for id_, stock in levels.items()]
+
+@router.post("/snapshots", response_model=StockSnapshotResponse)
+async def take_stock_snapshot(db: AsyncSession = Depends(get_async_db)):
+    """Checkpoint the current stock of every ingredient"""
+    taken_at, count = await crud_inventory.take_stock_snapshot(db)
+    return {"taken_at": taken_at, "ingredients": count}
+
+@router.get("/forecast", response_model=ForecastResponse)
+async def get_forecast(reorder_only: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Forecast daily usage, stock-out dates and suggested reorder quantities"""
+    forecast = await crud_inventory.get_forecast(db)
+    items = [item for item in forecast.items if item.suggested_reorder > 0] if reorder_only else forecast.items
+    return {"generated_at": forecast.generated_at, "items": items}
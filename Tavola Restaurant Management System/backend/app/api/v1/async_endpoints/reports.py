@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_session import get_async_db
+from app.core.security import require_permission
+from app.schemas.report import SalesReportResponse, ItemSalesResponse, PaymentMixResponse, MenuEngineeringResponse, RollupBackfillResponse
+from app.api.v1.reports import Grain, ReportParams
+from app.crud.aio import menu_engineering as crud_menu_engineering
+from app.crud.aio import reports as crud_reports
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+@router.get("/sales", response_model=SalesReportResponse, dependencies=[Depends(require_permission("view_reports"))])
+async def sales_report(grain: Grain = Grain.day, params: ReportParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Revenue, covers, items sold and margin, in total and per hour or day"""
+    return await crud_reports.get_sales(db, params.start, params.end, grain.value)
+
+@router.get("/items", response_model=list[ItemSalesResponse], dependencies=[Depends(require_permission("view_reports"))])
+async def item_sales_report(category_id: Optional[int] = None, params: ReportParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Quantity, revenue and margin per menu item, best sellers first"""
+    return await crud_reports.get_item_sales(db, params.start, params.end, category_id)
+
+@router.get("/payment-methods", response_model=list[PaymentMixResponse], dependencies=[Depends(require_permission("view_reports"))])
+async def payment_mix_report(params: ReportParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Payment count, amount and share per payment method"""
+    return await crud_reports.get_payment_mix(db, params.start, params.end)
+
+@router.get("/menu-engineering", response_model=MenuEngineeringResponse, dependencies=[Depends(require_permission("view_reports"))])
+async def menu_engineering_report(category_id: Optional[int] = None, params: ReportParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Classify menu items as stars, plowhorses, puzzles or dogs within their category"""
+    return await crud_menu_engineering.get_menu_engineering(db, params.start, params.end, category_id)
+
+@router.post("/rollups/backfill", response_model=RollupBackfillResponse, dependencies=[Depends(require_permission("manage_reports"))])
+async def backfill_rollups(since: Optional[datetime] = None, db: AsyncSession = Depends(get_async_db)):
+    """Rebuild the report rollups from orders and payments, from since onwards"""
+    return await crud_reports.backfill_rollups(db, since)
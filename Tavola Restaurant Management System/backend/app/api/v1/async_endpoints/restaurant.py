@@ -0,0 +1,162 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.async_session import get_async_db
+from app.schemas.menu import MenuCategoryResponse, MenuCategoryCreate, MenuItemResponse, MenuItemCreate
+from app.schemas.order import TableResponse, TableCreate, OrderResponse, OrderCreate, OrderStatusUpdate, OrderItemCreate, OrderItemUpdate, OrderItemResponse
+from app.api.v1.pagination import PageParams, paginated
+from app.api.v1.export import ExportParams, export_response
+from app.api.v1.catalog import catalog_response
+from app.api.v1.projections import TABLE_PAGE
+from app.crud import order as sync_order
+from app.crud.aio import menu as crud_menu
+from app.crud.aio import order as crud_order
+
+router = APIRouter(prefix="/restaurant", tags=["restaurant"])
+
+# Menu Category endpoints
+@router.get("/categories", response_model=list[MenuCategoryResponse])
+async def list_categories(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """List all menu categories"""
+    return catalog_response(request, (await crud_menu.get_catalog(db)).categories_body)
+
+@router.post("/categories", response_model=MenuCategoryResponse)
+async def create_category(category: MenuCategoryCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new menu category"""
+    return await crud_menu.create_category(db, category)
+
+@router.get("/categories/{category_id}", response_model=MenuCategoryResponse)
+async def get_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific menu category"""
+    category = await crud_menu.get_category(db, category_id)
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
+@router.put("/categories/{category_id}", response_model=MenuCategoryResponse)
+async def update_category(category_id: int, category: MenuCategoryCreate, db: AsyncSession = Depends(get_async_db)):
+    """Update a menu category"""
+    updated = await crud_menu.update_category(db, category_id, category)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return updated
+
+@router.delete("/categories/{category_id}")
+async def delete_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a menu category"""
+    deleted = await crud_menu.delete_category(db, category_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return {"deleted": True}
+
+# Menu Item endpoints
+@router.get("/items", response_model=list[MenuItemResponse])
+async def list_items(request: Request, category_id: int = None, db: AsyncSession = Depends(get_async_db)):
+    """List all menu items"""
+    return catalog_response(request, (await crud_menu.get_catalog(db)).items_response(category_id))
+
+@router.post("/items", response_model=MenuItemResponse)
+async def create_item(item: MenuItemCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new menu item"""
+    return await crud_menu.create_item(db, item)
+
+@router.get("/items/{item_id}", response_model=MenuItemResponse)
+async def get_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific menu item"""
+    item = (await crud_menu.get_catalog(db)).items_by_id.get(item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+@router.put("/items/{item_id}", response_model=MenuItemResponse)
+async def update_item(item_id: int, item: MenuItemCreate, db: AsyncSession = Depends(get_async_db)):
+    """Update a menu item"""
+    updated = await crud_menu.update_item(db, item_id, item)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return updated
+
+@router.delete("/items/{item_id}")
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Delete a menu item"""
+    deleted = await crud_menu.delete_item(db, item_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return {"deleted": True}
+
+# Table endpoints
+@router.get("/tables", response_model=list[TableResponse])
+async def list_tables(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """List tables, one page at a time"""
+    return TABLE_PAGE.page_response(await crud_order.get_tables(db, page.limit, page.cursor, columns=TABLE_PAGE.columns))
+
+@router.post("/tables", response_model=TableResponse)
+async def create_table(table: TableCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new table"""
+    return await crud_order.create_table(db, table)
+
+@router.get("/tables/{table_id}", response_model=TableResponse)
+async def get_table(table_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific table"""
+    table = await crud_order.get_table(db, table_id)
+    if not table:
+        raise HTTPException(status_code=404, detail="Table not found")
+    return table
+
+# Order endpoints
+@router.get("/orders", response_model=list[OrderResponse])
+async def list_orders(response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """List orders, one page at a time"""
+    orders = await crud_order.get_orders(db, page.limit, page.cursor, load="items")
+    return paginated(response, orders)
+
+# Declared before /orders/{order_id} so "export" is not taken as an id
+@router.get("/orders/export")
+async def export_orders(params: ExportParams = Depends()):
+    """Stream orders with their subtotal as NDJSON or CSV, optionally limited to a date range"""
+    return export_response(sync_order.order_export_query(params.start, params.end), params, "orders")
+
+@router.post("/orders", response_model=OrderResponse)
+async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new order"""
+    try:
+        return await crud_order.create_order(db, order)
+    except crud_order.OrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/orders/{order_id}", response_model=OrderResponse)
+async def get_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get a specific order"""
+    order = await crud_order.get_order(db, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+@router.put("/orders/{order_id}/status", response_model=OrderResponse)
+async def update_order_status(order_id: int, status_update: OrderStatusUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Update order status"""
+    updated = await crud_order.update_order_status(db, order_id, status_update)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return updated
+
+@router.post("/orders/{order_id}/items", response_model=OrderItemResponse)
+async def add_order_item(order_id: int, item: OrderItemCreate, db: AsyncSession = Depends(get_async_db)):
+    """Add an item to an order"""
+    try:
+        added = await crud_order.add_order_item(db, order_id, item)
+    except crud_order.OrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not added:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return added
+
+@router.put("/orders/{order_id}/items/{item_id}", response_model=OrderItemResponse)
+async def update_order_item(order_id: int, item_id: int, item: OrderItemUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Change an order item's quantity or status (set status to "cancelled" to cancel it)"""
+    try:
+        updated = await crud_order.update_order_item(db, order_id, item_id, item)
+    except crud_order.OrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    return updated
@@ -0,0 +1,20 @@
+"""Conditional responses for the cached menu catalog"""
+from fastapi import Request, Response
+
+from app.crud.catalog import CachedBody
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def catalog_response(request: Request, cached: CachedBody) -> Response:
+    """Serve a pre-serialized body, or 304 when the client already has it"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -3,15 +3,19 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.security import get_current_user, require_permission
 from app.schemas.user import UserResponse, UserCreate, UserUpdate, RoleResponse, RoleCreate, PermissionResponse, PermissionCreate
+from app.api.v1.pagination import PageParams
+from app.api.v1.projections import PERMISSIONS, USER_PAGE, role_lookup
 from app.crud import user as crud_user
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 # User endpoints
 @router.get("/users", response_model=list[UserResponse], dependencies=[Depends(require_permission("view_users"))])
-def list_users(db: Session = Depends(get_db)):
-    """List all users"""
-    return crud_user.get_users(db)
+def list_users(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """List users, one page at a time"""
+    users = crud_user.get_users(db, page.limit, page.cursor, columns=USER_PAGE.columns)
+    roles = role_lookup(crud_user.get_roles(db))
+    return USER_PAGE.page_response(users, role=lambda row: roles.get(row.role_id))
 
 @router.post("/users", response_model=UserResponse, dependencies=[Depends(require_permission("manage_users"))])
 def create_user(user: UserCreate, db: Session = Depends(get_db)):
@@ -84,7 +88,7 @@ def delete_role(role_id: int, db: Session = Depends(get_db)):
 @router.get("/permissions", response_model=list[PermissionResponse], dependencies=[Depends(require_permission("view_permissions"))])
 def list_permissions(db: Session = Depends(get_db)):
     """List all permissions"""
-    return crud_user.get_permissions(db)
+    return PERMISSIONS.response(crud_user.get_permissions(db, columns=PERMISSIONS.columns))
 
 @router.post("/permissions", response_model=PermissionResponse, dependencies=[Depends(require_permission("manage_permissions"))])
 def create_permission(permission: PermissionCreate, db: Session = Depends(get_db)):
@@ -1,32 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.auth import UserLogin, Token
+from app.schemas.auth import UserLogin, Token, RefreshRequest
+from app.crud import tokens as crud_tokens
 from app.crud import user as crud_user
-from app.core.security import create_access_token, get_current_user
-from datetime import timedelta
+from app.core import passwords
+from app.core.ratelimit import login_retry_after
+from app.core.security import get_current_user, get_token_payload
+from datetime import datetime
 from app.schemas.user import UserResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _issue_tokens(db: Session, db_user, new_hash: str = None) -> dict:
+    if new_hash:
+        crud_user.set_password_hash(db, db_user.id, new_hash)
+    return crud_tokens.issue_tokens(db, db_user)
+
+
 @router.post("/login", response_model=Token)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Login and get JWT token"""
-    # Authenticate user
-    db_user = crud_user.authenticate_user(db, user.username, user.password)
+    retry_after = login_retry_after(user.username, request.client.host if request.client else None)
+    if retry_after:
+        raise HTTPException(
+            status_code=429, detail="Too many login attempts", headers={"Retry-After": str(retry_after)}
+        )
+
+    db_user = await run_in_threadpool(crud_user.get_user_by_username, db, user.username)
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # Create access token
-    access_token_expires = timedelta(days=8)
-    access_token = create_access_token(
-        data={"sub": db_user.username}, expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+    # bcrypt runs on the hashing pool so the threadpool stays free for other requests
+    try:
+        valid, new_hash = await passwords.verify(user.password, db_user.hashed_password)
+    except passwords.HashPoolBusy:
+        raise HTTPException(status_code=503, detail="Too many logins in progress", headers={"Retry-After": "1"})
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if db_user.is_active is False:
+        raise HTTPException(status_code=403, detail="Inactive user")
+
+    return await run_in_threadpool(_issue_tokens, db, db_user, new_hash)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access and refresh token"""
+    issued = crud_tokens.rotate_refresh_token(db, body.refresh_token)
+    if issued is None:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return issued
+
+
+@router.post("/logout", status_code=204)
+def logout(payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)):
+    """Revoke the current access token and its refresh token"""
+    crud_tokens.logout(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    return Response(status_code=204)
 
 
 @router.get("/me", response_model=UserResponse)
-def read_current_user(current_user=Depends(get_current_user)):
+async def read_current_user(current_user=Depends(get_current_user)):
     """Get current authenticated user"""
     return current_user
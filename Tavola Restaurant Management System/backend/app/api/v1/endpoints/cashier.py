@@ -1,44 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.order import PaymentResponse, PaymentCreate
+from app.core.security import require_permission
+from app.schemas.order import PaymentResponse, PaymentCreate, InvoiceResponse, OrderTotalsCheck, PaymentReconciliation
+from app.api.v1.pagination import PageParams
+from app.api.v1.projections import PAYMENT_PAGE
+from app.api.v1.export import ExportParams, export_response
 from app.crud import order as crud_order
+from app.crud.order import IdempotencyError, PaymentError
 
 router = APIRouter(prefix="/cashier", tags=["cashier"])
 
-@router.get("/orders/{order_id}/invoice")
+@router.get("/orders/{order_id}/invoice", response_model=InvoiceResponse)
 def generate_invoice(order_id: int, db: Session = Depends(get_db)):
     """Generate invoice for an order"""
-    order = crud_order.get_order(db, order_id)
+    order = crud_order.get_order(db, order_id, load="items")
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
     return {
         "order_id": order.id,
         "order_number": order.order_number,
-        "items": order.items if hasattr(order, 'items') else [],
-        "subtotal": order.total_amount,
-        "tax_amount": order.total_amount * 0.10,  # 10% tax
-        "total_amount": order.total_amount * 1.10,
+        "items": order.items,
+        "subtotal": order.subtotal,
+        "tax_amount": order.tax_amount,
+        "total_amount": order.total_amount,
+        "amount_paid": order.amount_paid,
+        "balance_due": order.balance_due,
     }
 
+@router.post("/orders/totals/check", response_model=OrderTotalsCheck, dependencies=[Depends(require_permission("manage_billing"))])
+def check_order_totals(fix: bool = False, db: Session = Depends(get_db)):
+    """Recompute stored order totals from their items and report (or fix) mismatches"""
+    checked, mismatched = crud_order.check_order_totals(db, fix)
+    return {"checked": checked, "mismatched": mismatched, "fixed": fix and bool(mismatched)}
+
 @router.post("/payments", response_model=PaymentResponse)
-def process_payment(payment: PaymentCreate, db: Session = Depends(get_db)):
-    """Process a payment for an order"""
-    order = crud_order.get_order(db, payment.order_id)
-    if not order:
+def process_payment(
+    payment: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+):
+    """Process a full or partial payment; retries with the same Idempotency-Key are not charged twice"""
+    try:
+        created = crud_order.create_payment(db, payment, idempotency_key)
+    except IdempotencyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except PaymentError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not created:
         raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Validate amount
-    expected_amount = order.total_amount * 1.10  # With tax
-    if payment.amount != expected_amount and payment.amount != order.total_amount:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Payment amount mismatch. Expected {expected_amount}"
-        )
-    
-    # Create payment
-    return crud_order.create_payment(db, payment)
+    return created
+
+@router.post("/payments/reconcile", response_model=PaymentReconciliation, dependencies=[Depends(require_permission("manage_billing"))])
+def reconcile_payments(fix: bool = False, db: Session = Depends(get_db)):
+    """Recompute paid balances from completed payments and report (or fix) mismatches"""
+    checked, mismatched = crud_order.reconcile_payments(db, fix)
+    return {"checked": checked, "mismatched": mismatched, "fixed": fix and bool(mismatched)}
 
 @router.post("/payments/{payment_id}/refund", response_model=PaymentResponse)
 def refund_payment(payment_id: int, db: Session = Depends(get_db)):
@@ -49,6 +68,11 @@ def refund_payment(payment_id: int, db: Session = Depends(get_db)):
     return refunded
 
 @router.get("/payments", response_model=list[PaymentResponse])
-def list_payments(db: Session = Depends(get_db)):
-    """List all payments"""
-    return crud_order.get_payments(db)
+def list_payments(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """List payments, one page at a time"""
+    return PAYMENT_PAGE.page_response(crud_order.get_payments(db, page.limit, page.cursor, columns=PAYMENT_PAGE.columns))
+
+@router.get("/payments/export")
+def export_payments(params: ExportParams = Depends()):
+    """Stream payments as NDJSON or CSV, optionally limited to a date range"""
+    return export_response(crud_order.payment_export_query(params.start, params.end), params, "payments")
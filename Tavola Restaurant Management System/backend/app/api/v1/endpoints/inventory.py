@@ -1,21 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.inventory import InventoryItemResponse, InventoryItemCreate, StockMovementResponse, StockMovementCreate
+from app.schemas.inventory import InventoryItemResponse, InventoryItemCreate, StockMovementResponse, StockMovementCreate, StockMovementBatchResponse, StockLevelResponse, StockSnapshotResponse, StockAlertResponse, ForecastResponse
+from app.api.v1.pagination import PageParams
+from app.api.v1.projections import INGREDIENTS, INGREDIENT_PAGE, STOCK_MOVEMENT_PAGE
+from app.api.v1.export import ExportParams, export_response
+from app.api.v1.imports import RowError, import_openapi, read_rows
+from app.crud import alerts as crud_alerts
+from app.crud import forecast as crud_forecast
 from app.crud import inventory as crud_inventory
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
 @router.get("/items", response_model=list[InventoryItemResponse])
-def list_items(db: Session = Depends(get_db)):
-    """List all inventory items"""
-    return crud_inventory.get_ingredients(db)
+def list_items(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """List inventory items, one page at a time"""
+    return INGREDIENT_PAGE.page_response(crud_inventory.get_ingredients(db, page.limit, page.cursor, columns=INGREDIENT_PAGE.columns))
 
 @router.post("/items", response_model=InventoryItemResponse)
 def create_item(item: InventoryItemCreate, db: Session = Depends(get_db)):
     """Create a new inventory item"""
     return crud_inventory.create_ingredient(db, item)
 
+@router.get("/items/low-stock", response_model=list[InventoryItemResponse])
+def get_low_stock_items(db: Session = Depends(get_db)):
+    """Get items with low stock (declared before /items/{item_id} so it is reachable)"""
+    return INGREDIENTS.response(crud_inventory.get_low_stock_items(db, columns=INGREDIENTS.columns))
+
+@router.get("/alerts", response_model=list[StockAlertResponse])
+def list_alerts(level: str = None, db: Session = Depends(get_db)):
+    """Ingredients currently below their reorder ("low") or minimum ("critical") level"""
+    return crud_alerts.get_alerts(db, level)
+
 @router.get("/items/{item_id}", response_model=InventoryItemResponse)
 def get_item(item_id: int, db: Session = Depends(get_db)):
     """Get a specific inventory item"""
@@ -40,20 +58,55 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Item not found")
     return {"deleted": True}
 
-@router.get("/items/low-stock", response_model=list[InventoryItemResponse])
-def get_low_stock_items(db: Session = Depends(get_db)):
-    """Get items with low stock"""
-    return crud_inventory.get_low_stock_items(db)
-
 @router.post("/movements", response_model=StockMovementResponse)
 def create_stock_movement(movement: StockMovementCreate, db: Session = Depends(get_db)):
     """Record a stock movement"""
-    result = crud_inventory.create_stock_movement(db, movement)
+    try:
+        result = crud_inventory.create_stock_movement(db, movement)
+    except crud_inventory.StockError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not result:
         raise HTTPException(status_code=404, detail="Item not found")
     return result
 
+@router.post("/movements/batch", response_model=StockMovementBatchResponse, openapi_extra=import_openapi(StockMovementCreate))
+async def create_stock_movements(request: Request, all_or_nothing: bool = False, db: Session = Depends(get_db)):
+    """Record a batch of stock movements (JSON array, NDJSON or CSV) in one transaction"""
+    rows, errors = await read_rows(request, StockMovementCreate)
+    received = len(rows) + len(errors)
+    inserted = 0
+    if rows and not (errors and all_or_nothing):
+        inserted, row_errors = await run_in_threadpool(crud_inventory.create_stock_movements, db, rows, all_or_nothing)
+        errors += [RowError(*error) for error in row_errors]
+    return {"received": received, "inserted": inserted, "errors": sorted(errors)}
+
 @router.get("/movements", response_model=list[StockMovementResponse])
-def list_movements(ingredient_id: int = None, db: Session = Depends(get_db)):
-    """List stock movements"""
-    return crud_inventory.get_stock_movements(db, ingredient_id)
+def list_movements(ingredient_id: int = None, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """List stock movements, one page at a time"""
+    movements = crud_inventory.get_stock_movements(db, ingredient_id, page.limit, page.cursor, columns=STOCK_MOVEMENT_PAGE.columns)
+    return STOCK_MOVEMENT_PAGE.page_response(movements)
+
+@router.get("/movements/export")
+def export_movements(ingredient_id: int = None, params: ExportParams = Depends()):
+    """Stream stock movements as NDJSON or CSV, optionally limited to a date range"""
+    query = crud_inventory.stock_movement_export_query(params.start, params.end, ingredient_id)
+    return export_response(query, params, "stock_movements")
+
+@router.get("/stock", response_model=list[StockLevelResponse])
+def get_stock_at(at: datetime, ingredient_id: int = None, db: Session = Depends(get_db)):
+    """Stock levels at a point in time, from the nearest snapshot and the movements since"""
+    levels = crud_inventory.stock_at(db, at, ingredient_id)
+    return [{"ingredient_id": id_, "stock": stock} for id_, stock in levels.items()]
+
+@router.post("/snapshots", response_model=StockSnapshotResponse)
+def take_stock_snapshot(db: Session = Depends(get_db)):
+    """Checkpoint the current stock of every ingredient"""
+    taken_at, count = crud_inventory.take_stock_snapshot(db)
+    return {"taken_at": taken_at, "ingredients": count}
+
+@router.get("/forecast", response_model=ForecastResponse)
+def get_forecast(reorder_only: bool = False, db: Session = Depends(get_db)):
+    """Forecast daily usage, stock-out dates and suggested reorder quantities"""
+    forecast = crud_forecast.get_forecast(db)
+    items = [item for item in forecast.items if item.suggested_reorder > 0] if reorder_only else forecast.items
+    return {"generated_at": forecast.generated_at, "items": items}
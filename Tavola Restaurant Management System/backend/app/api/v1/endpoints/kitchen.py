@@ -0,0 +1,94 @@
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.events import hub
+
+router = APIRouter(prefix="/kitchen", tags=["kitchen"])
+
+
+class EventFilters:
+    """Query parameters selecting which events a kitchen screen receives"""
+
+    def __init__(
+        self,
+        station: Optional[List[int]] = Query(None, description="Menu category ids; repeat for several stations"),
+        status: Optional[List[str]] = Query(None, description="Order or item statuses; repeat for several"),
+        after: Optional[int] = Query(None, description="Resume after this event sequence number"),
+    ):
+        self.stations = station
+        self.statuses = status
+        self.after = after
+
+
+def _sse(event) -> str:
+    return f"id: {event.seq}\nevent: {event.type}\ndata: {event.data}\n\n"
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    filters: EventFilters = Depends(),
+    last_event_id: Optional[int] = Header(None),
+):
+    """Stream order and item events as Server-Sent Events"""
+    # Browsers resend the last received id on reconnect
+    after = filters.after if filters.after is not None else last_event_id
+
+    async def stream():
+        with hub.subscribe(after, filters.stations, filters.statuses) as (subscription, replay):
+            for event in replay:
+                yield _sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.next(settings.EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                except EOFError:
+                    return
+                yield _sse(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    # Clients only listen; reading is how a closed connection is noticed
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/ws")
+async def events_websocket(websocket: WebSocket, filters: EventFilters = Depends()):
+    """Push order and item events over a WebSocket"""
+    await websocket.accept()
+    with hub.subscribe(filters.after, filters.stations, filters.statuses) as (subscription, replay):
+
+        async def send_events():
+            for event in replay:
+                await websocket.send_text(event.data)
+            while True:
+                try:
+                    event = await subscription.next(settings.EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    await websocket.send_json({"type": "heartbeat"})
+                    continue
+                except EOFError:
+                    # Too far behind; the client reconnects with ?after=<last seq>
+                    await websocket.close(code=1013)
+                    return
+                await websocket.send_text(event.data)
+
+        tasks = [asyncio.create_task(send_events()), asyncio.create_task(_wait_for_disconnect(websocket))]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.core.security import require_permission
+from app.schemas.report import SalesReportResponse, ItemSalesResponse, PaymentMixResponse, MenuEngineeringResponse, RollupBackfillResponse
+from app.api.v1.reports import Grain, ReportParams
+from app.crud import menu_engineering as crud_menu_engineering
+from app.crud import reports as crud_reports
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+@router.get("/sales", response_model=SalesReportResponse, dependencies=[Depends(require_permission("view_reports"))])
+def sales_report(grain: Grain = Grain.day, params: ReportParams = Depends(), db: Session = Depends(get_db)):
+    """Revenue, covers, items sold and margin, in total and per hour or day"""
+    return crud_reports.get_sales(db, params.start, params.end, grain.value)
+
+@router.get("/items", response_model=list[ItemSalesResponse], dependencies=[Depends(require_permission("view_reports"))])
+def item_sales_report(category_id: Optional[int] = None, params: ReportParams = Depends(), db: Session = Depends(get_db)):
+    """Quantity, revenue and margin per menu item, best sellers first"""
+    return crud_reports.get_item_sales(db, params.start, params.end, category_id)
+
+@router.get("/payment-methods", response_model=list[PaymentMixResponse], dependencies=[Depends(require_permission("view_reports"))])
+def payment_mix_report(params: ReportParams = Depends(), db: Session = Depends(get_db)):
+    """Payment count, amount and share per payment method"""
+    return crud_reports.get_payment_mix(db, params.start, params.end)
+
+@router.get("/menu-engineering", response_model=MenuEngineeringResponse, dependencies=[Depends(require_permission("view_reports"))])
+def menu_engineering_report(category_id: Optional[int] = None, params: ReportParams = Depends(), db: Session = Depends(get_db)):
+    """Classify menu items as stars, plowhorses, puzzles or dogs within their category"""
+    return crud_menu_engineering.get_menu_engineering(db, params.start, params.end, category_id)
+
+@router.post("/rollups/backfill", response_model=RollupBackfillResponse, dependencies=[Depends(require_permission("manage_reports"))])
+def backfill_rollups(since: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """Rebuild the report rollups from orders and payments, from since onwards"""
+    return crud_reports.backfill_rollups(db, since)
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.menu import MenuCategoryResponse, MenuCategoryCreate, MenuItemResponse, MenuItemCreate
-from app.schemas.order import TableResponse, TableCreate, OrderResponse, OrderCreate, OrderStatusUpdate
+from app.schemas.order import TableResponse, TableCreate, OrderResponse, OrderCreate, OrderStatusUpdate, OrderItemCreate, OrderItemUpdate, OrderItemResponse
+from app.api.v1.pagination import PageParams, paginated
+from app.api.v1.export import ExportParams, export_response
+from app.api.v1.catalog import catalog_response
+from app.api.v1.projections import TABLE_PAGE
+from app.crud.catalog import get_catalog
 from app.crud import menu as crud_menu
 from app.crud import order as crud_order
 
@@ -10,9 +15,9 @@ router = APIRouter(prefix="/restaurant", tags=["restaurant"])
 
 # Menu Category endpoints
 @router.get("/categories", response_model=list[MenuCategoryResponse])
-def list_categories(db: Session = Depends(get_db)):
+def list_categories(request: Request, db: Session = Depends(get_db)):
     """List all menu categories"""
-    return crud_menu.get_categories(db)
+    return catalog_response(request, get_catalog(db).categories_body)
 
 @router.post("/categories", response_model=MenuCategoryResponse)
 def create_category(category: MenuCategoryCreate, db: Session = Depends(get_db)):
@@ -45,9 +50,9 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
 
 # Menu Item endpoints
 @router.get("/items", response_model=list[MenuItemResponse])
-def list_items(category_id: int = None, db: Session = Depends(get_db)):
+def list_items(request: Request, category_id: int = None, db: Session = Depends(get_db)):
     """List all menu items"""
-    return crud_menu.get_items(db, category_id)
+    return catalog_response(request, get_catalog(db).items_response(category_id))
 
 @router.post("/items", response_model=MenuItemResponse)
 def create_item(item: MenuItemCreate, db: Session = Depends(get_db)):
@@ -57,7 +62,7 @@ def create_item(item: MenuItemCreate, db: Session = Depends(get_db)):
 @router.get("/items/{item_id}", response_model=MenuItemResponse)
 def get_item(item_id: int, db: Session = Depends(get_db)):
     """Get a specific menu item"""
-    item = crud_menu.get_item(db, item_id)
+    item = get_catalog(db).items_by_id.get(item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
@@ -80,9 +85,9 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
 
 # Table endpoints
 @router.get("/tables", response_model=list[TableResponse])
-def list_tables(db: Session = Depends(get_db)):
-    """List all tables"""
-    return crud_order.get_tables(db)
+def list_tables(page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """List tables, one page at a time"""
+    return TABLE_PAGE.page_response(crud_order.get_tables(db, page.limit, page.cursor, columns=TABLE_PAGE.columns))
 
 @router.post("/tables", response_model=TableResponse)
 def create_table(table: TableCreate, db: Session = Depends(get_db)):
@@ -99,15 +104,24 @@ def get_table(table_id: int, db: Session = Depends(get_db)):
 
 # Order endpoints
 @router.get("/orders", response_model=list[OrderResponse])
-def list_orders(db: Session = Depends(get_db)):
-    """List all orders"""
-    orders = crud_order.get_orders(db)
-    return orders
+def list_orders(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """List orders, one page at a time"""
+    orders = crud_order.get_orders(db, page.limit, page.cursor, load="items")
+    return paginated(response, orders)
+
+# Declared before /orders/{order_id} so "export" is not taken as an id
+@router.get("/orders/export")
+def export_orders(params: ExportParams = Depends()):
+    """Stream orders with their subtotal as NDJSON or CSV, optionally limited to a date range"""
+    return export_response(crud_order.order_export_query(params.start, params.end), params, "orders")
 
 @router.post("/orders", response_model=OrderResponse)
 def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     """Create a new order"""
-    return crud_order.create_order(db, order)
+    try:
+        return crud_order.create_order(db, order)
+    except crud_order.OrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 def get_order(order_id: int, db: Session = Depends(get_db)):
@@ -124,3 +138,25 @@ def update_order_status(order_id: int, status_update: OrderStatusUpdate, db: Ses
     if not updated:
         raise HTTPException(status_code=404, detail="Order not found")
     return updated
+
+@router.post("/orders/{order_id}/items", response_model=OrderItemResponse)
+def add_order_item(order_id: int, item: OrderItemCreate, db: Session = Depends(get_db)):
+    """Add an item to an order"""
+    try:
+        added = crud_order.add_order_item(db, order_id, item)
+    except crud_order.OrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not added:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return added
+
+@router.put("/orders/{order_id}/items/{item_id}", response_model=OrderItemResponse)
+def update_order_item(order_id: int, item_id: int, item: OrderItemUpdate, db: Session = Depends(get_db)):
+    """Change an order item's quantity or status (set status to "cancelled" to cancel it)"""
+    try:
+        updated = crud_order.update_order_item(db, order_id, item_id, item)
+    except crud_order.OrderError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Order item not found")
+    return updated
@@ -0,0 +1,92 @@
+"""Streaming NDJSON/CSV exports.
+
+The generator opens its own session: FastAPI closes dependency sessions
+before a StreamingResponse body is sent. Rows are fetched with yield_per
+(a server-side cursor on Postgres) and written in chunks, so memory stays
+flat regardless of the number of rows exported.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterator, Optional
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+
+from app.db.session import SessionLocal
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ExportParams:
+    """Query parameters shared by export endpoints"""
+
+    def __init__(
+        self,
+        format: ExportFormat = ExportFormat.ndjson,
+        start: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+        end: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    ):
+        self.format = format
+        self.start = start
+        self.end = end
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunks(columns, batches) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in rows
+        )
+
+
+def _csv_chunks(columns, batches) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows([_plain(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _stream(query: Select, fmt: ExportFormat) -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+        batches = result.partitions()
+        if fmt == ExportFormat.csv:
+            yield from _csv_chunks(columns, batches)
+        else:
+            yield from _ndjson_chunks(columns, batches)
+    finally:
+        db.close()
+
+
+def export_response(query: Select, params: ExportParams, filename: str) -> StreamingResponse:
+    if params.format == ExportFormat.csv:
+        media_type = "text/csv"
+    else:
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        _stream(query, params.format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{params.format.value}"'},
+    )
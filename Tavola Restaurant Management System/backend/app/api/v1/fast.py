@@ -0,0 +1,77 @@
+"""Opt-in fast path for list endpoints.
+
+A list endpoint normally returns ORM entities. FastAPI then validates each
+one against its response_model with from_attributes, dumps the models
+back to Python objects and encodes them with the stdlib json module.
+
+A route opts in by loading only a Projection's columns and returning
+projection.response(rows). The rows are plain tuples and are encoded
+straight to JSON bytes by pydantic-core's Rust serializer. Because the
+endpoint returns a Response, FastAPI skips response_model validation; the
+response_model stays on the route for the OpenAPI schema.
+
+Only project rows read straight from our own tables into flat schemas
+whose fields are columns of the same name (or an expression given for
+them). Nothing checks the values against the schema any more.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.crud.pagination import NEXT_CURSOR_HEADER, Page
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by pydantic-core: datetimes as ISO 8601, no extra validation"""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+class Projection:
+    """The columns of `model` backing the fields of a flat response schema.
+
+    `columns` selects the schema's fields in order, followed by `extra`
+    columns the route needs but does not return (e.g. created_at for the
+    pagination cursor). Fields computed by the route, like a nested object,
+    are skipped here and passed to dicts() instead.
+    """
+
+    def __init__(
+        self,
+        schema: Type[BaseModel],
+        model,
+        extra: Sequence[str] = (),
+        skip: Sequence[str] = (),
+        **expressions,
+    ):
+        table_columns = model.__table__.columns
+        self.fields = tuple(name for name in schema.model_fields if name not in skip)
+        for name in self.fields:
+            if name not in expressions and name not in table_columns:
+                raise ValueError(f"{schema.__name__}.{name} is not a column of {model.__name__}")
+        self.columns = tuple(
+            expressions[name].label(name) if name in expressions else getattr(model, name)
+            for name in self.fields
+        ) + tuple(getattr(model, name) for name in extra if name not in self.fields)
+
+    def dicts(self, rows: Iterable[Sequence], **computed: Callable[[Any], Any]) -> list:
+        fields = self.fields
+        # zip stops at the last schema field, dropping the extra columns
+        if not computed:
+            return [dict(zip(fields, row)) for row in rows]
+        return [
+            {**dict(zip(fields, row)), **{name: fn(row) for name, fn in computed.items()}}
+            for row in rows
+        ]
+
+    def response(self, rows: Iterable[Sequence], headers: Optional[Dict[str, str]] = None, **computed) -> Response:
+        return FastJSONResponse(self.dicts(rows, **computed), headers=headers)
+
+    def page_response(self, page: Page, **computed) -> Response:
+        """Like paginated(): the page's rows, with the next cursor in a header"""
+        headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+        return self.response(page.items, headers=headers, **computed)
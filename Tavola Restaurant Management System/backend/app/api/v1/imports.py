@@ -0,0 +1,154 @@
+"""Batch uploads as a JSON array, NDJSON or CSV.
+
+The body can be sent raw with a matching Content-Type, or as a multipart
+form with the upload in a "file" field. Every row is validated on its own,
+so one bad row is reported by number instead of failing the whole upload.
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator, List, NamedTuple, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from app.core.config import settings
+
+Row = TypeVar("Row", bound=BaseModel)
+
+JSON_TYPES = ("application/json",)
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+class RowError(NamedTuple):
+    row: int  # 1-based position in the upload, not counting a CSV header
+    detail: str
+
+
+def import_openapi(model: Type[BaseModel]) -> dict:
+    """OpenAPI request body for an import endpoint, which reads the request itself"""
+    item = model.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                },
+            },
+        }
+    }
+
+
+def _media_type(content_type: str, filename: str = "") -> str:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ("", "application/octet-stream", "text/plain") and filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        media_type = {"json": "application/json", "ndjson": "application/x-ndjson",
+                      "jsonl": "application/x-ndjson", "csv": "text/csv"}.get(extension, media_type)
+    return media_type
+
+
+def _records(text: str, media_type: str) -> List:
+    if media_type in JSON_TYPES:
+        try:
+            records = json.loads(text)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of rows")
+        return records
+    if media_type in NDJSON_TYPES:
+        records = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as exc:
+                # Kept in place so row numbers still line up
+                records.append(RowError(len(records) + 1, f"Invalid JSON: {exc}"))
+        return records
+    if media_type in CSV_TYPES:
+        # Empty cells become missing fields so optional columns can be left blank
+        return [
+            {key: value for key, value in record.items() if value not in ("", None)}
+            for record in csv.DictReader(io.StringIO(text))
+        ]
+    raise HTTPException(
+        status_code=415,
+        detail="Send a JSON array, NDJSON (application/x-ndjson) or CSV (text/csv)",
+    )
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Uploads are limited to {settings.IMPORT_MAX_BYTES} bytes")
+
+
+async def _read_body(request: Request) -> bytes:
+    """The request body, refused with 413 as soon as it passes IMPORT_MAX_BYTES"""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > settings.IMPORT_MAX_BYTES:
+        raise _too_large()
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.IMPORT_MAX_BYTES:
+            raise _too_large()
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _replay(body: bytes) -> AsyncIterator[bytes]:
+    yield body
+
+
+async def read_rows(request: Request, model: Type[Row]) -> Tuple[List[Tuple[int, Row]], List[RowError]]:
+    """Parse and validate an uploaded batch into (row number, model) pairs and row errors"""
+    content_type = request.headers.get("content-type", "")
+    # Read (and cap) the raw body before parsing anything, multipart included
+    body = await _read_body(request)
+    if content_type.startswith("multipart/form-data"):
+        try:
+            form = await MultiPartParser(request.headers, _replay(body), max_files=1).parse()
+        except MultiPartException as exc:
+            raise HTTPException(status_code=400, detail=exc.message)
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail='Upload the batch in a "file" field')
+        raw = await upload.read()
+        await form.close()
+        media_type = _media_type(upload.content_type or "", upload.filename or "")
+    else:
+        raw = body
+        media_type = _media_type(content_type)
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+
+    records = _records(text, media_type)
+    if len(records) > settings.IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.IMPORT_MAX_ROWS} rows per upload")
+
+    rows, errors = [], []
+    for number, record in enumerate(records, start=1):
+        if isinstance(record, RowError):
+            errors.append(record)
+            continue
+        try:
+            rows.append((number, model.model_validate(record)))
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors()
+            )
+            errors.append(RowError(number, detail))
+    return rows, errors
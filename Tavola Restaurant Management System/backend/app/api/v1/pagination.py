@@ -0,0 +1,34 @@
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from app.crud.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    InvalidCursor,
+    Page,
+    decode_cursor,
+)
+
+
+class PageParams:
+    """Query parameters for cursor-paginated list endpoints"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except InvalidCursor as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+        self.cursor = cursor
+        self.limit = limit
+
+
+def paginated(response: Response, page: Page):
+    """Return the page's items, advertising the next page in a response header"""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -0,0 +1,41 @@
+"""Column projections for the list routes on the fast path (see fast.py)"""
+from sqlalchemy import Integer, String, cast, literal
+
+from app.api.v1.fast import Projection
+from app.db.models.menu import Ingredient, StockMovement
+from app.db.models.order import Payment, Table
+from app.db.models.user import Permission, User
+from app.schemas.inventory import InventoryItemResponse, StockMovementResponse
+from app.schemas.order import PaymentResponse, TableResponse
+from app.schemas.user import PermissionResponse, UserResponse
+
+# Paginated lists also select created_at and id for the next cursor
+PAGE_KEY = ("created_at", "id")
+
+INGREDIENTS = Projection(InventoryItemResponse, Ingredient)
+INGREDIENT_PAGE = Projection(InventoryItemResponse, Ingredient, extra=PAGE_KEY)
+STOCK_MOVEMENT_PAGE = Projection(StockMovementResponse, StockMovement, extra=PAGE_KEY)
+# TableResponse declares table_number as an int and a location the model lacks
+TABLE_PAGE = Projection(
+    TableResponse, Table, extra=PAGE_KEY,
+    table_number=cast(Table.table_number, Integer), location=literal(None, String),
+)
+PAYMENT_PAGE = Projection(PaymentResponse, Payment, extra=PAGE_KEY, amount=Payment.amount_cents / 100.0)
+PERMISSIONS = Projection(PermissionResponse, Permission)
+# role is filled in per row from the (few) roles, see role_lookup
+USER_PAGE = Projection(UserResponse, User, extra=PAGE_KEY + ("role_id",), skip=("role",))
+
+
+def role_lookup(roles) -> dict:
+    """role id -> RoleResponse-shaped dict, for filling in USER_PAGE rows"""
+    return {
+        role.id: {
+            "id": role.id,
+            "name": role.name,
+            "description": role.description,
+            "permissions": [
+                {"id": p.id, "name": p.name, "description": p.description} for p in role.permissions
+            ],
+        }
+        for role in roles
+    }
@@ -0,0 +1,26 @@
+"""Query parameters shared by the sync and async report routers"""
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from app.crud.reports import report_range
+
+
+class Grain(str, Enum):
+    hour = "hour"
+    day = "day"
+
+
+class ReportParams:
+    """Report range, rounded out to whole hours; defaults to the last 30 days"""
+
+    def __init__(
+        self,
+        start: Optional[datetime] = Query(None, description="Inclusive lower bound"),
+        end: Optional[datetime] = Query(None, description="Exclusive upper bound"),
+    ):
+        self.start, self.end = report_range(start, end)
+        if self.start >= self.end:
+            raise HTTPException(status_code=400, detail="start must be before end")
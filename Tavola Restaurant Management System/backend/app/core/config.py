@@ -6,7 +6,65 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = "your-secret-key-here"  # Change in production
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # Revoked access tokens are kept in memory per worker; other workers'
+    # revocations are read from the database at most this often
+    REVOCATION_SYNC_SECONDS: int = 5
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+
+    # Authenticated principal cache
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 1024
+    # Embed role id, permission names and role version in issued tokens so
+    # permission checks can be answered from the token itself. Whether the
+    # user is still active and still has that role is looked up per user and
+    # cached like the role version.
+    JWT_PERMISSION_CLAIMS: bool = False
+    # Add nosniff, frame and referrer headers (and HSTS over HTTPS) to responses
+    SECURITY_HEADERS: bool = True
+    # Password hashing. Stored hashes with a different bcrypt cost are
+    # rehashed at BCRYPT_ROUNDS on the user's next successful login.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # login hashing processes; 0 hashes on the threadpool
+    PASSWORD_HASH_MAX_PENDING: int = 64  # logins waiting for a hash before answering 503
+    # Login rate limits (token buckets, per worker process)
+    LOGIN_RATE_USER_BURST: int = 5
+    LOGIN_RATE_USER_PER_MINUTE: float = 5
+    LOGIN_RATE_IP_BURST: int = 100  # one restaurant's staff often share an address
+    LOGIN_RATE_IP_PER_MINUTE: float = 60
+    LOGIN_RATE_MAX_KEYS: int = 10000
+    
+    # Seconds a worker may serve its menu snapshot before re-reading it;
+    # bounds staleness after a menu write handled by another worker
+    MENU_CACHE_TTL_SECONDS: int = 300
+    
+    # Kitchen event hub: "memory" or "package.module:Class" for another backend
+    EVENT_BACKEND: str = "memory"
+    EVENT_BUFFER_SIZE: int = 1000  # events retained for resume after reconnect
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 1000  # undelivered events before a client is dropped
+    EVENT_HEARTBEAT_SECONDS: int = 15
+    
+    # Ingredient usage forecast (GET /inventory/forecast)
+    FORECAST_LOOKBACK_DAYS: int = 56  # history used, in whole days
+    FORECAST_HORIZON_DAYS: int = 28  # how far stock-outs are projected
+    FORECAST_SMOOTHING: float = 0.3  # exponential smoothing factor
+    FORECAST_LEAD_TIME_DAYS: int = 2  # supplier delivery time
+    FORECAST_COVER_DAYS: int = 7  # days of usage a reorder should cover
+    FORECAST_CACHE_TTL_SECONDS: int = 3600
+    # Menu engineering (GET /reports/menu-engineering)
+    MENU_ENGINEERING_POPULARITY_FACTOR: float = 0.7  # popular: sales mix >= factor / items in category
+    MENU_ENGINEERING_CACHE_TTL_SECONDS: int = 300
+    MENU_ENGINEERING_CACHE_MAX_SIZE: int = 256
+    # Largest batch accepted by import endpoints, in rows and in request body bytes
+    IMPORT_MAX_ROWS: int = 10000
+    IMPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    # Refuse stock movements that would take an ingredient below zero
+    STOCK_NON_NEGATIVE: bool = False
+    
+    # Sales tax applied to order subtotals
+    TAX_RATE: float = 0.10
     
     # Database
     POSTGRES_SERVER: str = "localhost"
@@ -14,6 +72,21 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "tavola"
     DATABASE_URI: Optional[str] = None
+    # Async driver URL; derived from DATABASE_URI when not set
+    ASYNC_DATABASE_URI: Optional[str] = None
+    # Connection pool. The default total (pool + overflow) matches the
+    # 40-worker threadpool FastAPI runs sync endpoints on.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; Postgres only
+    DB_POOL_PRE_PING: bool = True  # Postgres only
+    # SQLite connection pragmas
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB
+    # Serve restaurant/cashier/inventory/admin through the async routers
+    ASYNC_ENDPOINTS: bool = False
 
     class Config:
         env_file = ".env"
@@ -29,3 +102,10 @@ if not settings.DATABASE_URI:
     else:
         # Use SQLite for development
         settings.DATABASE_URI = "sqlite:///./tavola.db"
+
+if not settings.ASYNC_DATABASE_URI:
+    settings.ASYNC_DATABASE_URI = (
+        settings.DATABASE_URI
+        .replace("sqlite://", "sqlite+aiosqlite://", 1)
+        .replace("postgresql://", "postgresql+asyncpg://", 1)
+    )
@@ -0,0 +1,196 @@
+"""Order and kitchen event hub.
+
+crud.order publishes an event after every committed order or item change.
+Kitchen screens subscribe over WebSocket or SSE instead of polling the
+order list. Every event carries a sequence number, so a client that
+reconnects with the last sequence it saw gets the events it missed replayed.
+
+The backend assigns sequence numbers, keeps the replay buffer and fans
+events out to the hub. The default in-memory backend only reaches
+subscribers of the same worker. Multi-worker deployments set EVENT_BACKEND
+to a broker-backed implementation ("package.module:Class").
+"""
+import asyncio
+import importlib
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+
+RESYNC = "resync"
+
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    type: str
+    order_id: Optional[int]
+    status: Optional[str]
+    stations: FrozenSet[int]
+    data: str  # JSON body, serialized once for every subscriber
+
+    def matches(self, stations: Optional[FrozenSet[int]], statuses: Optional[FrozenSet[str]]) -> bool:
+        if stations and not stations & self.stations:
+            return False
+        if statuses and self.status not in statuses:
+            return False
+        return True
+
+
+def _make_event(seq: int, type: str, order_id=None, status=None, stations=(), payload=None) -> Event:
+    stations = frozenset(stations)
+    body = {
+        "seq": seq,
+        "type": type,
+        "order_id": order_id,
+        "status": status,
+        "stations": sorted(stations),
+        "at": datetime.utcnow().isoformat(),
+        **(payload or {}),
+    }
+    return Event(seq, type, order_id, status, stations, json.dumps(body))
+
+
+class EventBackend:
+    """Sequencing, retention and fan-out of events"""
+
+    def publish(self, type: str, order_id=None, status=None, stations=(), payload=None) -> None:
+        raise NotImplementedError
+
+    def replay(self, after: int) -> Optional[List[Event]]:
+        """Events with seq > after, or None if some of them are no longer retained"""
+        raise NotImplementedError
+
+    def listen(self, callback: Callable[[Event], None]) -> None:
+        raise NotImplementedError
+
+
+class InMemoryBackend(EventBackend):
+    """Process-local backend with a bounded replay buffer"""
+
+    def __init__(self, buffer_size: int = 1000):
+        self._buffer: "deque[Event]" = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._listeners: List[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+
+    def publish(self, type, order_id=None, status=None, stations=(), payload=None) -> None:
+        with self._lock:
+            self._seq += 1
+            event = _make_event(self._seq, type, order_id, status, stations, payload)
+            self._buffer.append(event)
+            # Deliver under the lock so every listener sees events in seq order
+            for callback in self._listeners:
+                callback(event)
+
+    def replay(self, after: int) -> Optional[List[Event]]:
+        with self._lock:
+            oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+            if after > self._seq or after < oldest - 1:
+                return None
+            return [event for event in self._buffer if event.seq > after]
+
+    def listen(self, callback: Callable[[Event], None]) -> None:
+        with self._lock:
+            self._listeners.append(callback)
+
+
+class Subscription:
+    """One client's filtered view of the event stream"""
+
+    def __init__(self, stations: Optional[Iterable[int]], statuses: Optional[Iterable[str]], max_pending: int):
+        self.stations = frozenset(stations) if stations else None
+        self.statuses = frozenset(statuses) if statuses else None
+        self.last_seq = 0
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+        self._max_pending = max_pending
+        self._overflowed = False
+
+    def _push(self, event: Event) -> None:
+        # Runs on the subscriber's event loop
+        if self._overflowed:
+            return
+        if self._queue.qsize() >= self._max_pending:
+            # A client that cannot keep up is disconnected and resumes from
+            # its last sequence instead of growing the queue without bound
+            self._overflowed = True
+            self._queue.put_nowait(None)
+            return
+        self._queue.put_nowait(event)
+
+    def deliver(self, event: Event) -> None:
+        if event.matches(self.stations, self.statuses):
+            self._loop.call_soon_threadsafe(self._push, event)
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """Next event, raising TimeoutError when idle and EOFError on overflow"""
+        while True:
+            event = await asyncio.wait_for(self._queue.get(), timeout)
+            if event is None:
+                raise EOFError("subscriber fell behind")
+            # Live events already sent as part of the replay are skipped
+            if event.seq > self.last_seq:
+                self.last_seq = event.seq
+                return event
+
+
+class EventHub:
+    def __init__(self, backend: EventBackend):
+        self.backend = backend
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        backend.listen(self._dispatch)
+
+    def publish(self, type: str, order_id=None, status=None, stations=(), payload=None) -> None:
+        self.backend.publish(type, order_id, status, stations, payload)
+
+    def _dispatch(self, event: Event) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    @contextmanager
+    def subscribe(self, after: Optional[int] = None, stations=None, statuses=None) -> Iterator[tuple]:
+        """Register a subscription and return it with the events to replay first.
+
+        The subscription is registered before the replay is read, so no event
+        falls between the two. If the requested events are no longer retained
+        the replay is a single "resync" event telling the client to reload.
+        """
+        subscription = Subscription(stations, statuses, settings.EVENT_SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            replay = []
+            if after is not None:
+                missed = self.backend.replay(after)
+                if missed is None:
+                    replay = [_make_event(0, RESYNC)]
+                else:
+                    replay = [event for event in missed if event.matches(subscription.stations, subscription.statuses)]
+                    subscription.last_seq = missed[-1].seq if missed else after
+            yield subscription, replay
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+
+def _load_backend(name: str) -> EventBackend:
+    if name == "memory":
+        return InMemoryBackend(settings.EVENT_BUFFER_SIZE)
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+hub = EventHub(_load_backend(settings.EVENT_BACKEND))
+
+
+def publish(type: str, order_id=None, status=None, stations=(), payload=None) -> None:
+    hub.publish(type, order_id, status, stations, payload)
@@ -0,0 +1,55 @@
+import threading
+from bisect import bisect_left
+from typing import Dict
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class Histogram:
+    """Thread-safe latency histogram with fixed buckets"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = sum(self._counts)
+            buckets = {str(bound): n for bound, n in zip(self.buckets, self._counts)}
+            buckets["+Inf"] = self._counts[-1]
+            return {
+                "count": count,
+                "sum": self._sum,
+                "max": self._max,
+                "avg": self._sum / count if count else 0.0,
+                "buckets": buckets,
+            }
+
+
+_histograms: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name: str) -> Histogram:
+    """Get or create the named histogram"""
+    with _registry_lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram()
+        return _histograms[name]
+
+
+def snapshot() -> dict:
+    with _registry_lock:
+        names = list(_histograms)
+    return {name: _histograms[name].snapshot() for name in names}
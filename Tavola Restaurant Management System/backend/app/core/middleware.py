@@ -0,0 +1,81 @@
+"""Pure ASGI middleware carrying per-request state.
+
+RequestContextMiddleware puts a RequestContext in the ASGI scope. The
+context holds the request's database session and its authenticated
+principal, so the dependencies that need them (get_db,
+get_current_principal) resolve each one once per request, on the event
+loop. The session is created the first time a handler asks for it and
+closed after the response has been sent. SQLAlchemy only checks out a
+connection on the first query, so a request that never queries never
+touches the pool.
+
+The middleware also adds the security headers to every HTTP response,
+unless the handler already set them.
+"""
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import REQUEST_CONTEXT, SessionLocal
+
+SECURITY_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"referrer-policy", b"no-referrer"),
+)
+# Only sent over HTTPS, where browsers honour it
+HSTS_HEADER = (b"strict-transport-security", b"max-age=31536000; includeSubDomains")
+
+
+class RequestContext:
+    __slots__ = ("_db", "payload", "principal")
+
+    def __init__(self):
+        self._db: Optional[Session] = None
+        self.payload: Optional[dict] = None  # decoded bearer token claims
+        self.principal = None  # app.core.security.Principal once authenticated
+
+    @property
+    def db(self) -> Session:
+        if self._db is None:
+            self._db = SessionLocal()
+        return self._db
+
+    async def close(self) -> None:
+        db, self._db = self._db, None
+        if db is None:
+            return
+        if db.in_transaction() and db.get_bind().dialect.name != "sqlite":
+            # Ending the transaction is a round trip to the server
+            await run_in_threadpool(db.close)
+        else:
+            db.close()
+
+
+class RequestContextMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        context = RequestContext()
+        scope[REQUEST_CONTEXT] = context
+        extra = SECURITY_HEADERS + ((HSTS_HEADER,) if scope.get("scheme") == "https" else ())
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SECURITY_HEADERS:
+                headers = list(message.get("headers", ()))
+                present = {name.lower() for name, _ in headers}
+                headers.extend(header for header in extra if header[0] not in present)
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            await context.close()
@@ -0,0 +1,26 @@
+"""Money as integer cents.
+
+Order totals, line prices, payments and paid balances are stored as whole
+cents so sums and comparisons are exact. Menu prices are still float
+columns; they are converted with to_cents (half-up, like a till) when an
+order line snapshots them. Tax is worked out in Decimal and rounded to the
+cent once per order, on its whole subtotal.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Union
+
+CENT = Decimal("0.01")
+
+
+def to_cents(amount: Union[Decimal, float, int, str]) -> int:
+    # str() first so a float like 35.2 converts as written, not as 35.2000000000000028...
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+def apply_rate(cents: int, rate: Union[Decimal, float, str]) -> int:
+    """cents * rate, rounded half up to a whole cent"""
+    return int((Decimal(cents) * Decimal(str(rate))).quantize(Decimal(1), rounding=ROUND_HALF_UP))
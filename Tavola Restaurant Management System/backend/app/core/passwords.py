@@ -0,0 +1,107 @@
+"""Password hashing off the request path.
+
+bcrypt is slow on purpose (about a quarter of a second at cost 12), and a
+sync login holds a threadpool worker for all of it, so a burst of logins
+starves every other sync endpoint. Login verifies on a small process pool
+instead: the request waits on the event loop without holding a thread, and
+at most PASSWORD_HASH_WORKERS hashes run at once. When
+PASSWORD_HASH_MAX_PENDING logins are already waiting, verify() raises
+HashPoolBusy rather than queueing more.
+
+A successful verify also returns a replacement hash when the stored one is
+plaintext or was made at a bcrypt cost other than BCRYPT_ROUNDS, so a cost
+change reaches each user on their next login.
+
+Functions run in the pool must stay importable without the rest of the app.
+Pool workers are spawned, so like any multiprocessing user, a script that
+drives the app in-process needs an `if __name__ == "__main__":` guard.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+
+class HashPoolBusy(Exception):
+    """Too many logins are already waiting for the hashing pool"""
+
+
+@lru_cache(maxsize=None)
+def context(rounds: int) -> CryptContext:
+    # Pinning min and max to the default flags hashes made at any other cost
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def verify_and_update(plain_password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """Check a password; on success also return a new hash if the stored one needs replacing"""
+    ctx = context(rounds)
+    try:
+        if ctx.identify(hashed_password) is None:
+            # Plaintext stored by seed scripts or the hashing fallback
+            if plain_password != hashed_password:
+                return False, None
+            return True, ctx.hash(plain_password)
+        return ctx.verify_and_update(plain_password, hashed_password)
+    except Exception:
+        return plain_password == hashed_password, None
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has threads and an event loop
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def verify(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update on the hashing pool; raises HashPoolBusy when the queue is full"""
+    global _pool
+    args = (plain_password, hashed_password, settings.BCRYPT_ROUNDS)
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(verify_and_update, *args)
+    if not _pending.acquire(blocking=False):
+        raise HashPoolBusy()
+    try:
+        pool = _get_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, verify_and_update, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next login
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+            return await run_in_threadpool(verify_and_update, *args)
+    finally:
+        _pending.release()
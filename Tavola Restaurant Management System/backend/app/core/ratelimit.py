@@ -0,0 +1,54 @@
+import math
+import threading
+import time
+from typing import Hashable, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class TokenBucket:
+    """Per-key token buckets held in process memory.
+
+    Each key may spend `burst` requests at once, refilled at `per_minute`.
+    A bucket left alone long enough to refill completely is the same as a
+    fresh one, so buckets live in a TTLCache that forgets them after that
+    long; the cache's max size bounds the memory used.
+    """
+
+    def __init__(self, burst: int, per_minute: float, maxsize: int = 10000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self._buckets = TTLCache(maxsize=maxsize, ttl=burst / self.rate)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token for key; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = self.burst if bucket is None else min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens < 1:
+                return (1 - tokens) / self.rate
+            self._buckets.set(key, (tokens - 1, now))
+            return 0.0
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+login_by_user = TokenBucket(
+    settings.LOGIN_RATE_USER_BURST, settings.LOGIN_RATE_USER_PER_MINUTE, settings.LOGIN_RATE_MAX_KEYS
+)
+login_by_ip = TokenBucket(
+    settings.LOGIN_RATE_IP_BURST, settings.LOGIN_RATE_IP_PER_MINUTE, settings.LOGIN_RATE_MAX_KEYS
+)
+
+
+def login_retry_after(username: str, client_ip: Optional[str]) -> int:
+    """Charge a login attempt to its address and username; returns seconds to wait, or 0 if allowed"""
+    if client_ip is not None:
+        wait = login_by_ip.acquire(client_ip)
+        if wait:
+            return math.ceil(wait)
+    return math.ceil(login_by_user.acquire(username.lower()))
@@ -0,0 +1,140 @@
+"""In-memory list of revoked access tokens.
+
+Access tokens are short-lived JWTs identified by their `jti`. Revoking one
+(logout, a deactivated user, a leaked refresh token) writes a RevokedToken
+row; every worker mirrors those rows into a Bloom filter backed by an exact
+set, so checking a token on each request needs no database round trip.
+Almost every token misses the filter; only a filter hit, which is a
+revoked token or a rare false positive, is checked against the exact set.
+
+The list is loaded at startup. Revocations made by this worker are added
+as soon as their transaction commits (see crud.tokens). Those made by
+other workers are picked up by a background thread that reads new
+RevokedToken rows every REVOCATION_SYNC_SECONDS, which bounds how long
+another worker can still accept a revoked token. Checking a token never
+touches the database, so it is safe on the event loop.
+"""
+import hashlib
+import logging
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.user import RevokedToken
+from app.db.session import SessionLocal
+
+SYNC_OVERLAP = timedelta(seconds=60)
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; false positives, never false negatives"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit halves
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    def __init__(self):
+        self._exact: Dict[str, datetime] = {}  # jti -> when the token expires anyway
+        self._filter = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+        self._synced_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, entries: Iterable[Tuple[str, datetime]]) -> None:
+        """Mirror revoked (jti, expires_at) pairs into memory"""
+        with self._lock:
+            for jti, expires_at in entries:
+                self._exact[jti] = expires_at
+                self._filter.add(jti)
+            if len(self._exact) > self._filter.capacity:
+                self._refilter()
+
+    def _refilter(self) -> None:
+        # Expired tokens fail validation anyway; drop them and resize if still full
+        now = datetime.utcnow()
+        self._exact = {jti: expires for jti, expires in self._exact.items() if expires > now}
+        capacity = max(settings.REVOCATION_BLOOM_CAPACITY, 2 * len(self._exact))
+        self._filter = BloomFilter(capacity, settings.REVOCATION_BLOOM_ERROR_RATE)
+        for jti in self._exact:
+            self._filter.add(jti)
+
+    def sync(self, db: Session) -> int:
+        """Read RevokedToken rows added since the last sync; returns how many"""
+        started = datetime.utcnow()
+        query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > started)
+        if self._synced_at is not None:
+            # Overlap the previous sync so rows from transactions that were
+            # still open then are not missed; re-adding a jti is harmless
+            query = query.filter(RevokedToken.created_at >= self._synced_at - SYNC_OVERLAP)
+        rows = query.all()
+        self.add(rows)
+        self._synced_at = started
+        return len(rows)
+
+    def rebuild(self, db: Session) -> int:
+        """Prune expired rows and reload the whole list, e.g. at startup"""
+        db.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        with self._lock:
+            self._exact = {}
+            self._filter = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY, settings.REVOCATION_BLOOM_ERROR_RATE)
+            self._synced_at = None
+        return self.sync(db)
+
+    def _sync_forever(self) -> None:
+        while not self._stop.wait(settings.REVOCATION_SYNC_SECONDS):
+            try:
+                db = SessionLocal()
+                try:
+                    self.sync(db)
+                finally:
+                    db.close()
+            except Exception:
+                # Keep serving from memory; the next sync reads the overlap again
+                logger.exception("Failed to sync revoked tokens")
+
+    def start(self) -> None:
+        """Start syncing other workers' revocations in a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sync_forever, name="revocation-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._filter and jti in self._exact
+
+
+revoked_tokens = RevocationList()
@@ -1,23 +1,71 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from starlette.requests import HTTPConnection
 
 from ..db import models
-from ..db.session import get_db
+from ..db.models.user import role_permission
+from ..db.session import REQUEST_CONTEXT, get_db
+from ..core.cache import TTLCache
 from ..core.config import settings
+from ..core.passwords import context as _password_context
+from ..core.revocation import revoked_tokens
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = _password_context(settings.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of the authenticated user used for authorization"""
+    id: int
+    username: str
+    is_active: bool
+    role_id: Optional[int]
+    permissions: frozenset
+
+
+# token subject (username) -> Principal
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+# role id -> current RoleVersion.version
+role_version_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+# user id -> (User.is_active, User.role_id), for tokens carrying permission claims
+user_state_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(username: Optional[str] = None) -> None:
+    """Drop a cached principal, or every cached principal if no username is given"""
+    if username is None:
+        principal_cache.clear()
+    else:
+        principal_cache.pop(username)
+
+def invalidate_role_versions() -> None:
+    role_version_cache.clear()
+
+def invalidate_user_state(user_id: int) -> None:
+    user_state_cache.pop(user_id)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Simple comparison for testing (in production use bcrypt)
-    if plain_password == hashed_password:
-        return True
     try:
+        if pwd_context.identify(hashed_password) is None:
+            # Plaintext comparison for seeded test users, never against a real hash
+            return plain_password == hashed_password
         return pwd_context.verify(plain_password, hashed_password)
     except:
         return False
@@ -39,29 +87,163 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+        if payload.get("sub") is None:
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.username == username).first()
+        raise _credentials_exception()
+    # Tokens without an id predate revocation and cannot be revoked
+    jti = payload.get("jti")
+    if jti is None or revoked_tokens.is_revoked(jti):
+        raise _credentials_exception()
+    return payload
+
+async def get_token_payload(connection: HTTPConnection, token: str = Depends(oauth2_scheme)) -> dict:
+    """Claims of the bearer token, once it is checked not to be expired or revoked.
+
+    Decoded once per request; the claims are kept on the request context.
+    """
+    context = connection.scope.get(REQUEST_CONTEXT)
+    if context is None:
+        return _decode_token(token)
+    if context.payload is None:
+        context.payload = _decode_token(token)
+    return context.payload
+
+def _load_user(db: Session, username: str):
+    return (
+        db.query(models.User)
+        .options(joinedload(models.User.role).joinedload(models.Role.permissions))
+        .filter(models.User.username == username)
+        .first()
+    )
+
+async def get_current_user(
+    db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)
+):
+    user = await run_in_threadpool(_load_user, db, payload["sub"])
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
+def load_principal(db: Session, username: str) -> Optional[Principal]:
+    """Build a Principal for username with a single query"""
+    rows = (
+        db.query(
+            models.User.id,
+            models.User.is_active,
+            models.User.role_id,
+            models.Permission.name,
+        )
+        .outerjoin(role_permission, role_permission.c.role_id == models.User.role_id)
+        .outerjoin(models.Permission, models.Permission.id == role_permission.c.permission_id)
+        .filter(models.User.username == username)
+        .all()
+    )
+    if not rows:
+        return None
+    user_id, is_active, role_id, _ = rows[0]
+    return Principal(
+        id=user_id,
+        username=username,
+        is_active=bool(is_active),
+        role_id=role_id,
+        permissions=frozenset(name for *_, name in rows if name is not None),
+    )
+
+def get_role_version(db: Session, role_id: int) -> int:
+    """Current version of a role; roles without a RoleVersion row are at version 1"""
+    version = role_version_cache.get(role_id)
+    if version is None:
+        version = db.query(models.RoleVersion.version).filter(
+            models.RoleVersion.role_id == role_id
+        ).scalar() or 1
+        role_version_cache.set(role_id, version)
+    return version
+
+def get_user_state(db: Session, user_id: int) -> Tuple[bool, Optional[int]]:
+    """Whether a user is active, and their current role id; deleted users are (False, None)"""
+    state = user_state_cache.get(user_id)
+    if state is None:
+        row = db.query(models.User.is_active, models.User.role_id).filter(models.User.id == user_id).first()
+        state = (False, None) if row is None else (row.is_active is not False, row.role_id)
+        user_state_cache.set(user_id, state)
+    return state
+
+def _claims_state(db: Session, payload: dict) -> Tuple[int, Tuple[bool, Optional[int]]]:
+    return get_role_version(db, payload["role_id"]), get_user_state(db, payload["uid"])
+
+def permission_claims(db: Session, username: str) -> dict:
+    """Token payload carrying the user's role, permissions and role version"""
+    principal = load_principal(db, username)
+    if principal is None:
+        return {"sub": username}
+    return {
+        "sub": username,
+        "uid": principal.id,
+        "role_id": principal.role_id,
+        "perms": sorted(principal.permissions),
+        "rv": get_role_version(db, principal.role_id),
+    }
+
+def _principal_from_claims(payload: dict, role_version: int, user_state: Tuple[bool, Optional[int]]) -> Principal:
+    is_active, role_id = user_state
+    if payload["rv"] != role_version or payload["role_id"] != role_id:
+        # The user's role, or the role's permissions, changed since the token was issued
+        raise _credentials_exception()
+    return Principal(
+        id=payload["uid"],
+        username=payload["sub"],
+        # Not a claim: deactivation must apply to tokens already issued
+        is_active=is_active,
+        role_id=payload["role_id"],
+        permissions=frozenset(payload["perms"]),
+    )
+
+async def get_current_principal(
+    connection: HTTPConnection,
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+) -> Principal:
+    """Resolve the token to a Principal, hitting the database only on a cache miss.
+
+    Runs on the event loop; only cache misses go to the threadpool. The
+    principal is kept on the request context for the rest of the request.
+    """
+    context = connection.scope.get(REQUEST_CONTEXT)
+    if context is not None and context.principal is not None:
+        return context.principal
+    if "rv" in payload:
+        version = role_version_cache.get(payload["role_id"])
+        user_state = user_state_cache.get(payload["uid"])
+        if version is None or user_state is None:
+            version, user_state = await run_in_threadpool(_claims_state, db, payload)
+        principal = _principal_from_claims(payload, version, user_state)
+    else:
+        username = payload["sub"]
+        principal = principal_cache.get(username)
+        if principal is None:
+            principal = await run_in_threadpool(load_principal, db, username)
+            if principal is None:
+                raise _credentials_exception()
+            principal_cache.set(username, principal)
+    if context is not None:
+        context.principal = principal
+    return principal
+
 def has_permission(user, required_permission: str) -> bool:
-    """Check if user has the required permission"""
+    """Check if user (a User or a Principal) has the required permission"""
+    if isinstance(user, Principal):
+        return required_permission in user.permissions
     if not user.role:
         return False
     return required_permission in [p.name for p in user.role.permissions]
@@ -70,7 +252,12 @@ def has_permission(user, required_permission: str) -> bool:
 def require_permission(permission_name: str):
     from fastapi import Depends, HTTPException, status
 
-    def _dependency(current_user=Depends(get_current_user)):
+    async def _dependency(current_user=Depends(get_current_principal)):
+        if not current_user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Inactive user",
+            )
         if not has_permission(current_user, permission_name):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,62 @@
+"""Async counterparts of app.crud.inventory"""
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.menu import Ingredient, StockAlert, StockMovement
+from app.schemas.inventory import InventoryItemCreate, StockMovementCreate
+from app.crud import forecast as sync_forecast
+from app.crud import inventory as sync_inventory
+from app.crud.inventory import StockError
+from app.crud.pagination import DEFAULT_PAGE_SIZE, keyset, make_page
+
+async def get_ingredients(db: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    if columns:
+        return make_page(await db.execute(keyset(select(*columns), Ingredient, limit, cursor)), limit)
+    return make_page(await db.scalars(keyset(select(Ingredient), Ingredient, limit, cursor)), limit)
+
+async def get_ingredient(db: AsyncSession, ingredient_id: int):
+    return await db.get(Ingredient, ingredient_id)
+
+async def create_ingredient(db: AsyncSession, ingredient: InventoryItemCreate):
+    return await db.run_sync(sync_inventory.create_ingredient, ingredient)
+
+async def update_ingredient(db: AsyncSession, ingredient_id: int, ingredient: InventoryItemCreate):
+    return await db.run_sync(sync_inventory.update_ingredient, ingredient_id, ingredient)
+
+async def delete_ingredient(db: AsyncSession, ingredient_id: int):
+    return await db.run_sync(sync_inventory.delete_ingredient, ingredient_id)
+
+async def get_low_stock_items(db: AsyncSession, columns=None):
+    if columns:
+        query = select(*columns).select_from(Ingredient).join(StockAlert, StockAlert.ingredient_id == Ingredient.id)
+        return (await db.execute(query)).all()
+    query = select(Ingredient).join(StockAlert, StockAlert.ingredient_id == Ingredient.id)
+    return (await db.scalars(query)).all()
+
+async def get_alerts(db: AsyncSession, level: str = None):
+    query = select(StockAlert).join(StockAlert.ingredient).options(contains_eager(StockAlert.ingredient))
+    if level:
+        query = query.where(StockAlert.level == level)
+    return (await db.scalars(query.order_by(StockAlert.level, Ingredient.name))).all()
+
+async def create_stock_movement(db: AsyncSession, movement: StockMovementCreate):
+    return await db.run_sync(sync_inventory.create_stock_movement, movement)
+
+async def create_stock_movements(db: AsyncSession, rows, all_or_nothing: bool = False):
+    return await db.run_sync(sync_inventory.create_stock_movements, rows, all_or_nothing)
+
+async def get_stock_movements(db: AsyncSession, ingredient_id: int = None, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    query = select(*columns) if columns else select(StockMovement)
+    if ingredient_id:
+        query = query.where(StockMovement.ingredient_id == ingredient_id)
+    query = keyset(query, StockMovement, limit, cursor)
+    return make_page(await (db.execute(query) if columns else db.scalars(query)), limit)
+
+async def stock_at(db: AsyncSession, at, ingredient_id: int = None):
+    return await db.run_sync(sync_inventory.stock_at, at, ingredient_id)
+
+async def take_stock_snapshot(db: AsyncSession):
+    return await db.run_sync(sync_inventory.take_stock_snapshot)
+
+async def get_forecast(db: AsyncSession):
+    return await db.run_sync(sync_forecast.get_forecast)
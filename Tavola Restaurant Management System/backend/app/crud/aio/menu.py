@@ -0,0 +1,47 @@
+"""Async counterparts of app.crud.menu.
+
+Reads are native async queries; writes run the sync CRUD functions through
+AsyncSession.run_sync so both stacks share one implementation.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.menu import MenuCategory, MenuItem
+from app.schemas.menu import MenuCategoryCreate, MenuItemCreate
+from app.crud import menu as sync_menu
+from app.crud import catalog as sync_catalog
+
+async def get_catalog(db: AsyncSession):
+    return sync_catalog.cached_catalog() or await db.run_sync(sync_catalog.get_catalog)
+
+async def get_categories(db: AsyncSession):
+    return (await db.scalars(select(MenuCategory))).all()
+
+async def get_category(db: AsyncSession, category_id: int):
+    return await db.get(MenuCategory, category_id)
+
+async def create_category(db: AsyncSession, category: MenuCategoryCreate):
+    return await db.run_sync(sync_menu.create_category, category)
+
+async def update_category(db: AsyncSession, category_id: int, category: MenuCategoryCreate):
+    return await db.run_sync(sync_menu.update_category, category_id, category)
+
+async def delete_category(db: AsyncSession, category_id: int):
+    return await db.run_sync(sync_menu.delete_category, category_id)
+
+async def get_items(db: AsyncSession, category_id: int = None, columns=None):
+    query = select(*columns) if columns else select(MenuItem)
+    if category_id:
+        query = query.where(MenuItem.category_id == category_id)
+    return (await (db.execute(query) if columns else db.scalars(query))).all()
+
+async def get_item(db: AsyncSession, item_id: int):
+    return await db.get(MenuItem, item_id)
+
+async def create_item(db: AsyncSession, item: MenuItemCreate):
+    return await db.run_sync(sync_menu.create_item, item)
+
+async def update_item(db: AsyncSession, item_id: int, item: MenuItemCreate):
+    return await db.run_sync(sync_menu.update_item, item_id, item)
+
+async def delete_item(db: AsyncSession, item_id: int):
+    return await db.run_sync(sync_menu.delete_item, item_id)
@@ -0,0 +1,7 @@
+"""Async counterparts of app.crud.menu_engineering"""
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import menu_engineering as sync_menu_engineering
+
+async def get_menu_engineering(db: AsyncSession, start: datetime, end: datetime, category_id: int = None):
+    return await db.run_sync(sync_menu_engineering.get_menu_engineering, start, end, category_id)
@@ -0,0 +1,69 @@
+"""Async counterparts of app.crud.order.
+
+Orders are always returned with their items loaded, since an AsyncSession
+cannot lazy-load them during response serialization.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.order import Table, Order, Payment
+from app.schemas.order import TableCreate, OrderCreate, OrderItemCreate, OrderItemUpdate, OrderStatusUpdate, PaymentCreate
+from app.crud import order as sync_order
+from app.crud.order import OrderError
+from app.crud.pagination import DEFAULT_PAGE_SIZE, keyset, make_page
+
+async def get_tables(db: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    if columns:
+        return make_page(await db.execute(keyset(select(*columns), Table, limit, cursor)), limit)
+    return make_page(await db.scalars(keyset(select(Table), Table, limit, cursor)), limit)
+
+async def get_table(db: AsyncSession, table_id: int):
+    return await db.get(Table, table_id)
+
+async def create_table(db: AsyncSession, table: TableCreate):
+    return await db.run_sync(sync_order.create_table, table)
+
+async def get_orders(db: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, load: str = "items"):
+    query = select(Order).options(*sync_order.order_load_options(load))
+    return make_page(await db.scalars(keyset(query, Order, limit, cursor)), limit)
+
+async def get_order(db: AsyncSession, order_id: int, refresh: bool = False, load: str = "items"):
+    query = select(Order).options(*sync_order.order_load_options(load)).where(Order.id == order_id)
+    if refresh:
+        query = query.execution_options(populate_existing=True)
+    return (await db.scalars(query)).first()
+
+async def create_order(db: AsyncSession, order: OrderCreate):
+    db_order = await db.run_sync(sync_order.create_order, order)
+    return await get_order(db, db_order.id, refresh=True)
+
+async def add_order_item(db: AsyncSession, order_id: int, item_data: OrderItemCreate):
+    return await db.run_sync(sync_order.add_order_item, order_id, item_data)
+
+async def update_order_item(db: AsyncSession, order_id: int, item_id: int, item_update: OrderItemUpdate):
+    return await db.run_sync(sync_order.update_order_item, order_id, item_id, item_update)
+
+async def check_order_totals(db: AsyncSession, fix: bool = False):
+    return await db.run_sync(sync_order.check_order_totals, fix)
+
+async def update_order_status(db: AsyncSession, order_id: int, status_update: OrderStatusUpdate):
+    db_order = await db.run_sync(sync_order.update_order_status, order_id, status_update)
+    if db_order:
+        db_order = await get_order(db, order_id, refresh=True)
+    return db_order
+
+async def get_payments(db: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    if columns:
+        return make_page(await db.execute(keyset(select(*columns), Payment, limit, cursor)), limit)
+    return make_page(await db.scalars(keyset(select(Payment), Payment, limit, cursor)), limit)
+
+async def get_payment(db: AsyncSession, payment_id: int):
+    return await db.get(Payment, payment_id)
+
+async def create_payment(db: AsyncSession, payment: PaymentCreate, idempotency_key: str = None):
+    return await db.run_sync(sync_order.create_payment, payment, idempotency_key)
+
+async def refund_payment(db: AsyncSession, payment_id: int):
+    return await db.run_sync(sync_order.refund_payment, payment_id)
+
+async def reconcile_payments(db: AsyncSession, fix: bool = False):
+    return await db.run_sync(sync_order.reconcile_payments, fix)
@@ -0,0 +1,16 @@
+"""Async counterparts of app.crud.reports"""
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import reports as sync_reports
+
+async def get_sales(db: AsyncSession, start: datetime, end: datetime, grain: str = "day"):
+    return await db.run_sync(sync_reports.get_sales, start, end, grain)
+
+async def get_item_sales(db: AsyncSession, start: datetime, end: datetime, category_id: int = None):
+    return await db.run_sync(sync_reports.get_item_sales, start, end, category_id)
+
+async def get_payment_mix(db: AsyncSession, start: datetime, end: datetime):
+    return await db.run_sync(sync_reports.get_payment_mix, start, end)
+
+async def backfill_rollups(db: AsyncSession, since: datetime = None):
+    return await db.run_sync(sync_reports.backfill_rollups, since)
@@ -0,0 +1,87 @@
+"""Async counterparts of app.crud.user.
+
+Users and roles are returned with role/permissions loaded for the response
+schemas. Password checks stay on the sync path (see auth.login).
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db.models.user import User, Role, Permission
+from app.schemas.user import UserCreate, UserUpdate, RoleCreate, PermissionCreate
+from app.crud import user as sync_user
+from app.crud.pagination import DEFAULT_PAGE_SIZE, keyset, make_page
+
+_user_options = (selectinload(User.role).selectinload(Role.permissions),)
+_role_options = (selectinload(Role.permissions),)
+
+async def get_user(db: AsyncSession, user_id: int, refresh: bool = False):
+    query = select(User).options(*_user_options).where(User.id == user_id)
+    if refresh:
+        query = query.execution_options(populate_existing=True)
+    return (await db.scalars(query)).first()
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    query = select(User).options(*_user_options).where(User.username == username)
+    return (await db.scalars(query)).first()
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    query = select(User).options(*_user_options).where(User.email == email)
+    return (await db.scalars(query)).first()
+
+async def get_users(db: AsyncSession, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    if columns:
+        return make_page(await db.execute(keyset(select(*columns), User, limit, cursor)), limit)
+    query = select(User).options(*_user_options)
+    return make_page(await db.scalars(keyset(query, User, limit, cursor)), limit)
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    db_user = await db.run_sync(sync_user.create_user, user)
+    return await get_user(db, db_user.id, refresh=True)
+
+async def update_user(db: AsyncSession, user_id: int, user: UserUpdate):
+    db_user = await db.run_sync(sync_user.update_user, user_id, user)
+    if db_user:
+        db_user = await get_user(db, user_id, refresh=True)
+    return db_user
+
+async def delete_user(db: AsyncSession, user_id: int):
+    return await db.run_sync(sync_user.delete_user, user_id)
+
+async def get_roles(db: AsyncSession):
+    return (await db.scalars(select(Role).options(*_role_options))).all()
+
+async def get_role(db: AsyncSession, role_id: int, refresh: bool = False):
+    query = select(Role).options(*_role_options).where(Role.id == role_id)
+    if refresh:
+        query = query.execution_options(populate_existing=True)
+    return (await db.scalars(query)).first()
+
+async def create_role(db: AsyncSession, role: RoleCreate):
+    db_role = await db.run_sync(sync_user.create_role, role)
+    return await get_role(db, db_role.id, refresh=True)
+
+async def update_role(db: AsyncSession, role_id: int, role: RoleCreate):
+    db_role = await db.run_sync(sync_user.update_role, role_id, role)
+    if db_role:
+        db_role = await get_role(db, role_id, refresh=True)
+    return db_role
+
+async def delete_role(db: AsyncSession, role_id: int):
+    return await db.run_sync(sync_user.delete_role, role_id)
+
+async def get_permissions(db: AsyncSession, columns=None):
+    if columns:
+        return (await db.execute(select(*columns))).all()
+    return (await db.scalars(select(Permission))).all()
+
+async def get_permission(db: AsyncSession, permission_id: int):
+    return await db.get(Permission, permission_id)
+
+async def create_permission(db: AsyncSession, permission: PermissionCreate):
+    return await db.run_sync(sync_user.create_permission, permission)
+
+async def delete_permission(db: AsyncSession, permission_id: int):
+    return await db.run_sync(sync_user.delete_permission, permission_id)
+
+async def assign_permission_to_role(db: AsyncSession, role_id: int, permission_id: int):
+    return await db.run_sync(sync_user.assign_permission_to_role, role_id, permission_id)
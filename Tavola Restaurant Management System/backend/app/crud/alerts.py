@@ -0,0 +1,97 @@
+"""Low-stock alerts, maintained incrementally.
+
+Every stock change calls evaluate_alerts with the ingredients it touched,
+before committing. Only those ingredients are compared with their
+thresholds, and the stock_alert table is updated so it always holds exactly
+the ingredients currently below threshold. When an ingredient changes
+level, a stock.low, stock.critical or stock.restored event is published
+through the event hub once the transaction commits.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, contains_eager
+
+from app.core import events
+from app.db.models.menu import Ingredient, StockAlert
+
+_PENDING = "pending_stock_alerts"
+
+
+def alert_level(stock: float, min_stock_level: float, reorder_level: float) -> Optional[str]:
+    stock = stock or 0
+    if stock < (min_stock_level or 0):
+        return "critical"
+    if stock < (reorder_level or 0):
+        return "low"
+    return None
+
+
+def evaluate_alerts(db: Session, ingredient_ids: Iterable[int]) -> None:
+    """Re-check thresholds for the given ingredients, without committing"""
+    ids = set(ingredient_ids)
+    if not ids:
+        return
+    # Sessions do not autoflush; pending ORM changes to thresholds must be visible
+    db.flush()
+    existing = {
+        alert.ingredient_id: alert
+        for alert in db.query(StockAlert).filter(StockAlert.ingredient_id.in_(ids))
+    }
+    levels = db.query(
+        Ingredient.id, Ingredient.name, Ingredient.current_stock, Ingredient.min_stock_level, Ingredient.reorder_level
+    ).filter(Ingredient.id.in_(ids))
+    changes = []
+    for ingredient_id, name, stock, min_stock_level, reorder_level in levels:
+        level = alert_level(stock, min_stock_level, reorder_level)
+        alert = existing.pop(ingredient_id, None)
+        if level is None:
+            if alert is not None:
+                db.delete(alert)
+                changes.append(("stock.restored", ingredient_id, name, None, stock))
+            continue
+        if alert is None:
+            db.add(StockAlert(ingredient_id=ingredient_id, level=level, stock=stock))
+        elif alert.level == level:
+            alert.stock = stock
+            continue
+        else:
+            alert.level = level
+            alert.stock = stock
+        changes.append((f"stock.{level}", ingredient_id, name, level, stock))
+    # Alerts left over belong to ingredients that no longer exist
+    for alert in existing.values():
+        db.delete(alert)
+    if changes:
+        db.info.setdefault(_PENDING, []).extend(changes)
+
+
+def rebuild_alerts(db: Session) -> int:
+    """Evaluate every ingredient, e.g. at startup; returns the number of alerts"""
+    evaluate_alerts(db, [ingredient_id for (ingredient_id,) in db.query(Ingredient.id)])
+    # No events for the initial state; subscribers read it from get_alerts
+    db.info.pop(_PENDING, None)
+    db.commit()
+    return db.query(StockAlert).count()
+
+
+def get_alerts(db: Session, level: str = None):
+    query = db.query(StockAlert).join(StockAlert.ingredient).options(contains_eager(StockAlert.ingredient))
+    if level:
+        query = query.filter(StockAlert.level == level)
+    return query.order_by(StockAlert.level, Ingredient.name).all()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for event_type, ingredient_id, name, level, stock in session.info.pop(_PENDING, ()):
+        events.publish(
+            event_type,
+            status=level,
+            payload={"ingredient_id": ingredient_id, "name": name, "stock": stock},
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
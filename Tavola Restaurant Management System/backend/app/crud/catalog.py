@@ -0,0 +1,125 @@
+"""Process-local snapshot of the menu catalog.
+
+The menu is read by every POS screen but only changes through crud.menu,
+so each worker keeps an immutable snapshot with the list responses already
+serialized. crud.menu bumps the catalog version after every write, which
+makes the next read rebuild the snapshot; other workers pick up the change
+when their snapshot's TTL expires.
+
+ETags are a hash of the serialized body, so every worker hands out the same
+ETag for the same menu.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.menu import MenuCategory, MenuItem
+from app.schemas.menu import MenuCategoryResponse, MenuItemResponse
+
+_categories_adapter = TypeAdapter(Tuple[MenuCategoryResponse, ...])
+_items_adapter = TypeAdapter(Tuple[MenuItemResponse, ...])
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def _cached_body(body: bytes) -> CachedBody:
+    return CachedBody(body, f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+
+
+@dataclass(frozen=True)
+class Catalog:
+    version: int
+    categories: Tuple[MenuCategoryResponse, ...]
+    items: Tuple[MenuItemResponse, ...]
+    items_by_id: Mapping[int, MenuItemResponse]
+    items_by_category: Mapping[int, Tuple[MenuItemResponse, ...]]
+    categories_body: CachedBody
+    items_body: CachedBody
+    items_body_by_category: Mapping[int, CachedBody]
+    expires_at: float
+
+    def items_response(self, category_id: Optional[int] = None) -> CachedBody:
+        if not category_id:
+            return self.items_body
+        return self.items_body_by_category.get(category_id, _EMPTY_BODY)
+
+
+_EMPTY_BODY = _cached_body(b"[]")
+
+_lock = threading.Lock()
+_version = 0
+_catalog: Optional[Catalog] = None
+
+
+def bump_catalog_version() -> None:
+    """Mark this worker's snapshot stale; call after committing a menu write"""
+    global _version, _catalog
+    with _lock:
+        _version += 1
+        _catalog = None
+
+
+def _load(db: Session, model, schema, adapter: TypeAdapter) -> tuple:
+    # Select just the schema's columns: plain rows, no ORM entities to
+    # build and track only to copy a few attributes off them
+    columns = [getattr(model, name) for name in schema.model_fields]
+    rows = db.execute(select(*columns).order_by(model.id)).all()
+    return adapter.validate_python(rows, from_attributes=True)
+
+
+def _build(db: Session, version: int) -> Catalog:
+    categories = _load(db, MenuCategory, MenuCategoryResponse, _categories_adapter)
+    items = _load(db, MenuItem, MenuItemResponse, _items_adapter)
+    by_category = {}
+    for item in items:
+        by_category.setdefault(item.category_id, []).append(item)
+    items_by_category = {category_id: tuple(group) for category_id, group in by_category.items()}
+    return Catalog(
+        version=version,
+        categories=categories,
+        items=items,
+        items_by_id=MappingProxyType({item.id: item for item in items}),
+        items_by_category=MappingProxyType(items_by_category),
+        categories_body=_cached_body(_categories_adapter.dump_json(categories)),
+        items_body=_cached_body(_items_adapter.dump_json(items)),
+        items_body_by_category=MappingProxyType({
+            category_id: _cached_body(_items_adapter.dump_json(group))
+            for category_id, group in items_by_category.items()
+        }),
+        expires_at=time.monotonic() + settings.MENU_CACHE_TTL_SECONDS,
+    )
+
+
+def cached_catalog() -> Optional[Catalog]:
+    """Return the snapshot if it is current, without touching the database"""
+    catalog = _catalog
+    if catalog is not None and catalog.expires_at > time.monotonic():
+        return catalog
+    return None
+
+
+def get_catalog(db: Session) -> Catalog:
+    """Return the current snapshot, querying the database only to rebuild it"""
+    global _catalog
+    catalog = cached_catalog()
+    if catalog is not None:
+        return catalog
+    with _lock:
+        version = _version
+    catalog = _build(db, version)
+    with _lock:
+        # A write that landed while we were building keeps the snapshot stale
+        if version == _version:
+            _catalog = catalog
+    return catalog
@@ -0,0 +1,199 @@
+"""Ingredient consumption forecast and reorder suggestions.
+
+One grouped query loads daily consumption per ingredient for the lookback
+window. Then every ingredient is forecast at once on an
+(ingredients x days) NumPy array: day-of-week seasonal factors, simple
+exponential smoothing of the deseasonalised series, and the smoothed level
+re-seasonalised over the horizon.
+
+Stock already committed to orders that have not reached the kitchen is
+exploded through the recipes and subtracted before projecting stock-outs.
+
+The result is cached per worker until the next committed stock change on
+that worker, or for FORECAST_CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.menu import Ingredient, MenuItemIngredient, StockMovement
+from app.db.models.order import Order, OrderItem
+
+# Orders whose ingredients have not been consumed yet (see crud.order)
+AWAITING_KITCHEN = ("pending", "confirmed")
+
+_CHANGED = "stock_changed"
+
+
+@dataclass(frozen=True)
+class IngredientForecast:
+    ingredient_id: int
+    name: str
+    unit: Optional[str]
+    current_stock: float
+    committed: float  # needed by orders not yet in the kitchen
+    daily_usage: float  # forecast average over the next week
+    suggested_reorder: float
+    stockout_date: Optional[date]
+
+
+@dataclass(frozen=True)
+class Forecast:
+    generated_at: datetime
+    items: List[IngredientForecast]
+    expires_at: float
+
+
+_lock = threading.Lock()
+_version = 0
+_forecast: Optional[Forecast] = None
+
+
+def mark_stock_changed(db: Session) -> None:
+    """Drop the cached forecast once the session's transaction commits"""
+    db.info[_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    global _version, _forecast
+    if session.info.pop(_CHANGED, False):
+        with _lock:
+            _version += 1
+            _forecast = None
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_change(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
+
+
+def _daily_usage(db: Session, ids: np.ndarray, start: date, days: int) -> np.ndarray:
+    """(ingredients x days) consumption matrix from one grouped query"""
+    day = func.date(StockMovement.created_at).label("day")
+    # Core select: tens of thousands of plain tuples, no ORM row processing
+    rows = db.execute(
+        select(StockMovement.ingredient_id, day, (-func.sum(StockMovement.quantity)).label("used"))
+        .where(
+            StockMovement.movement_type == "consumption",
+            StockMovement.created_at >= datetime.combine(start, datetime.min.time()),
+        )
+        .group_by(StockMovement.ingredient_id, day)
+    ).all()
+    usage = np.zeros((len(ids), days))
+    if rows:
+        ingredient_ids, days_, quantities = zip(*rows)
+        ingredient_ids = np.array(ingredient_ids)
+        day_offsets = {d: (date.fromisoformat(str(d)) - start).days for d in set(days_)}
+        offsets = np.array([day_offsets[d] for d in days_])
+        rows_ = np.searchsorted(ids, ingredient_ids)
+        known = (offsets >= 0) & (offsets < days) & (ids[np.minimum(rows_, len(ids) - 1)] == ingredient_ids)
+        np.add.at(usage, (rows_[known], offsets[known]), np.asarray(quantities, dtype=float)[known])
+    return usage
+
+
+def _committed(db: Session, ids: np.ndarray) -> np.ndarray:
+    """Ingredient quantities needed by orders that have not been consumed yet"""
+    rows = (
+        db.query(MenuItemIngredient.ingredient_id, func.sum(OrderItem.quantity * MenuItemIngredient.quantity))
+        .join(OrderItem, OrderItem.menu_item_id == MenuItemIngredient.menu_item_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .filter(Order.status.in_(AWAITING_KITCHEN), OrderItem.status != "cancelled")
+        .group_by(MenuItemIngredient.ingredient_id)
+        .all()
+    )
+    committed = np.zeros(len(ids))
+    for ingredient_id, quantity in rows:
+        row = np.searchsorted(ids, ingredient_id)
+        if row < len(ids) and ids[row] == ingredient_id:
+            committed[row] = quantity or 0.0
+    return committed
+
+
+def seasonal_forecast(usage: np.ndarray, weekdays: np.ndarray, future_weekdays: np.ndarray, alpha: float) -> np.ndarray:
+    """Forecast each row of usage over the future days.
+
+    usage is (ingredients x days); weekdays gives the weekday of each column.
+    Returns an (ingredients x len(future_weekdays)) array.
+    """
+    overall = usage.mean(axis=1, keepdims=True)
+    by_weekday = np.stack(
+        [usage[:, weekdays == d].mean(axis=1) if (weekdays == d).any() else overall[:, 0] for d in range(7)],
+        axis=1,
+    )
+    # Factors average to 1; rows with no history are left unseasoned
+    factors = np.divide(by_weekday, overall, out=np.ones_like(by_weekday), where=overall > 0)
+    deseasoned = np.divide(usage, factors[:, weekdays], out=np.zeros_like(usage), where=factors[:, weekdays] > 0)
+    level = deseasoned[:, 0].copy()
+    for column in deseasoned.T[1:]:
+        level = alpha * column + (1 - alpha) * level
+    return level[:, None] * factors[:, future_weekdays]
+
+
+def _build(db: Session) -> Forecast:
+    today = datetime.utcnow().date()
+    lookback, horizon = settings.FORECAST_LOOKBACK_DAYS, settings.FORECAST_HORIZON_DAYS
+    start = today - timedelta(days=lookback)
+
+    ingredients = db.query(
+        Ingredient.id, Ingredient.name, Ingredient.unit, Ingredient.current_stock, Ingredient.reorder_level
+    ).order_by(Ingredient.id).all()
+    if not ingredients:
+        return Forecast(datetime.utcnow(), [], time.monotonic() + settings.FORECAST_CACHE_TTL_SECONDS)
+    ids = np.array([row.id for row in ingredients])
+    stock = np.array([row.current_stock or 0.0 for row in ingredients])
+    reorder_level = np.array([row.reorder_level or 0.0 for row in ingredients])
+
+    usage = _daily_usage(db, ids, start, lookback)
+    committed = _committed(db, ids)
+    weekdays = (np.arange(lookback) + start.weekday()) % 7
+    future_weekdays = (np.arange(1, horizon + 1) + today.weekday()) % 7
+    forecast = seasonal_forecast(usage, weekdays, future_weekdays, settings.FORECAST_SMOOTHING)
+
+    available = stock - committed
+    projected = available[:, None] - np.cumsum(forecast, axis=1)
+    runs_out = (projected < 0).any(axis=1)
+    stockout_day = np.where(available < 0, 0, np.argmax(projected < 0, axis=1) + 1)
+
+    # Enough to cover the lead time and the cover period, ending at the reorder level
+    window = settings.FORECAST_LEAD_TIME_DAYS + settings.FORECAST_COVER_DAYS
+    needed = forecast[:, :window].sum(axis=1) + reorder_level
+    suggested = np.maximum(needed - available, 0)
+    daily = forecast[:, :7].mean(axis=1)
+
+    items = [
+        IngredientForecast(
+            ingredient_id=row.id,
+            name=row.name,
+            unit=row.unit,
+            current_stock=float(stock[i]),
+            committed=round(float(committed[i]), 3),
+            daily_usage=round(float(daily[i]), 3),
+            suggested_reorder=round(float(suggested[i]), 3),
+            stockout_date=today + timedelta(days=int(stockout_day[i])) if runs_out[i] or available[i] < 0 else None,
+        )
+        for i, row in enumerate(ingredients)
+    ]
+    return Forecast(datetime.utcnow(), items, time.monotonic() + settings.FORECAST_CACHE_TTL_SECONDS)
+
+
+def get_forecast(db: Session) -> Forecast:
+    """Return the cached forecast, recomputing it after a stock change"""
+    global _forecast
+    forecast = _forecast
+    if forecast is not None and forecast.expires_at > time.monotonic():
+        return forecast
+    with _lock:
+        version = _version
+    forecast = _build(db)
+    with _lock:
+        if version == _version:
+            _forecast = forecast
+    return forecast
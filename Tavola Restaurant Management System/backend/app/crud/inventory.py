@@ -1,16 +1,34 @@
+from datetime import datetime
+from sqlalchemy import DateTime, bindparam, func, insert, literal, select, update
 from sqlalchemy.orm import Session
-from app.db.models.menu import Ingredient, StockMovement
+from app.core.config import settings
+from app.db.models.menu import Ingredient, MenuItemIngredient, StockAlert, StockMovement, StockSnapshot
+from app.db.models.order import OrderItem
 from app.schemas.inventory import InventoryItemCreate, StockMovementCreate
+from app.crud.alerts import evaluate_alerts
+from app.crud.forecast import mark_stock_changed
+from app.crud.pagination import DEFAULT_PAGE_SIZE, created_between, keyset, make_page
 
-def get_ingredients(db: Session):
-    return db.query(Ingredient).all()
+# Rows per multi-row INSERT, kept under SQLite's bound parameter limit
+IMPORT_INSERT_CHUNK = 500
+
+class StockError(ValueError):
+    """Raised when a stock movement is rejected (e.g. it would leave negative stock)"""
+
+def get_ingredients(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    query = db.query(*columns) if columns else db.query(Ingredient)
+    return make_page(keyset(query, Ingredient, limit, cursor).all(), limit)
 
 def get_ingredient(db: Session, ingredient_id: int):
     return db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
 
 def create_ingredient(db: Session, ingredient: InventoryItemCreate):
-    db_ingredient = Ingredient(**ingredient.dict())
+    # Ingredient has no supplier column; supplier_id is accepted but not stored
+    db_ingredient = Ingredient(**ingredient.dict(exclude={"supplier_id"}))
     db.add(db_ingredient)
+    db.flush()
+    evaluate_alerts(db, [db_ingredient.id])
+    mark_stock_changed(db)
     db.commit()
     db.refresh(db_ingredient)
     return db_ingredient
@@ -18,8 +36,10 @@ def create_ingredient(db: Session, ingredient: InventoryItemCreate):
 def update_ingredient(db: Session, ingredient_id: int, ingredient: InventoryItemCreate):
     db_ingredient = get_ingredient(db, ingredient_id)
     if db_ingredient:
-        for key, value in ingredient.dict().items():
+        for key, value in ingredient.dict(exclude={"supplier_id"}).items():
             setattr(db_ingredient, key, value)
+        evaluate_alerts(db, [ingredient_id])
+        mark_stock_changed(db)
         db.commit()
         db.refresh(db_ingredient)
     return db_ingredient
@@ -27,34 +47,233 @@ def update_ingredient(db: Session, ingredient_id: int, ingredient: InventoryItem
 def delete_ingredient(db: Session, ingredient_id: int):
     db_ingredient = get_ingredient(db, ingredient_id)
     if db_ingredient:
+        db.query(StockAlert).filter(StockAlert.ingredient_id == ingredient_id).delete()
         db.delete(db_ingredient)
         db.commit()
     return db_ingredient
 
-def get_low_stock_items(db: Session):
-    return db.query(Ingredient).filter(
-        Ingredient.current_stock < Ingredient.reorder_level
-    ).all()
+def get_low_stock_items(db: Session, columns=None):
+    """Ingredients below their reorder or minimum level, from the alert table"""
+    query = db.query(*columns).select_from(Ingredient) if columns else db.query(Ingredient)
+    return query.join(StockAlert, StockAlert.ingredient_id == Ingredient.id).all()
+
+def adjust_stock(db: Session, ingredient_id: int, quantity: float, non_negative: bool = False):
+    """Atomically add quantity to an ingredient's stock and return the new level.
 
-def create_stock_movement(db: Session, movement: StockMovementCreate):
-    # Get the ingredient
-    ingredient = get_ingredient(db, movement.ingredient_id)
-    if not ingredient:
+    The increment is done by the database (UPDATE ... RETURNING), so
+    concurrent movements cannot overwrite each other. With non_negative, a
+    decrement that would take stock below zero is refused with StockError.
+    Returns None if the ingredient does not exist.
+    """
+    table = Ingredient.__table__
+    current = func.coalesce(table.c.current_stock, 0)
+    stmt = (
+        update(table)
+        .where(table.c.id == ingredient_id)
+        .values(current_stock=current + quantity)
+        .returning(table.c.current_stock)
+    )
+    guarded = non_negative and quantity < 0
+    if guarded:
+        stmt = stmt.where(current + quantity >= 0)
+    new_stock = db.execute(stmt).scalar_one_or_none()
+    if new_stock is None and guarded and db.query(Ingredient.id).filter(Ingredient.id == ingredient_id).first():
+        raise StockError(f"Insufficient stock for ingredient {ingredient_id}")
+    return new_stock
+
+def create_stock_movement(db: Session, movement: StockMovementCreate, non_negative: bool = None):
+    if non_negative is None:
+        non_negative = settings.STOCK_NON_NEGATIVE
+    if adjust_stock(db, movement.ingredient_id, movement.quantity, non_negative) is None:
         return None
     
-    # Create movement record
     db_movement = StockMovement(**movement.dict())
     db.add(db_movement)
-    
-    # Update ingredient stock
-    ingredient.current_stock += movement.quantity
-    
+    evaluate_alerts(db, [movement.ingredient_id])
+    mark_stock_changed(db)
     db.commit()
     db.refresh(db_movement)
     return db_movement
 
-def get_stock_movements(db: Session, ingredient_id: int = None):
-    query = db.query(StockMovement)
+def order_consumed(db: Session, order_id: int) -> bool:
+    """Whether consumption movements have already been written for an order"""
+    return db.query(
+        select(StockMovement.id)
+        .where(StockMovement.movement_type == "consumption", StockMovement.reference_id == order_id)
+        .exists()
+    ).scalar()
+
+def consume_order_ingredients(db: Session, order_id: int, item_ids=None):
+    """Deplete stock by the recipes of an order's items, without committing.
+
+    The items are exploded through MenuItemIngredient and summed per
+    ingredient in one query. One consumption movement is written per
+    ingredient, referencing the order, and the stock decrements are applied
+    as a single executemany UPDATE. Pass item_ids to consume only those items.
+    Stock may go negative here even with STOCK_NON_NEGATIVE: the food is
+    already being cooked, so the shortfall is recorded rather than refused.
+    Returns {ingredient_id: quantity consumed}.
+    """
+    used = func.sum(OrderItem.quantity * MenuItemIngredient.quantity)
+    query = (
+        select(MenuItemIngredient.ingredient_id, used)
+        .join(OrderItem, OrderItem.menu_item_id == MenuItemIngredient.menu_item_id)
+        .where(OrderItem.order_id == order_id, OrderItem.status != "cancelled")
+        .group_by(MenuItemIngredient.ingredient_id)
+    )
+    if item_ids is not None:
+        query = query.where(OrderItem.id.in_(item_ids))
+    consumed = {ingredient_id: quantity for ingredient_id, quantity in db.execute(query) if quantity}
+    if not consumed:
+        return consumed
+    db.execute(
+        insert(StockMovement),
+        [
+            {
+                "ingredient_id": ingredient_id,
+                "quantity": -quantity,
+                "movement_type": "consumption",
+                "reference_id": order_id,
+            }
+            for ingredient_id, quantity in consumed.items()
+        ],
+    )
+    table = Ingredient.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("ingredient_id"))
+        .values(current_stock=func.coalesce(table.c.current_stock, 0) - bindparam("used")),
+        [{"ingredient_id": ingredient_id, "used": quantity} for ingredient_id, quantity in consumed.items()],
+    )
+    evaluate_alerts(db, consumed)
+    mark_stock_changed(db)
+    return consumed
+
+def create_stock_movements(db: Session, rows, all_or_nothing: bool = False, non_negative: bool = None):
+    """Record a batch of movements in one transaction.
+
+    rows is a list of (row number, StockMovementCreate). Ingredient ids are
+    checked with one query, stock deltas are summed so each ingredient gets
+    a single atomic UPDATE, and the movements are inserted with multi-row
+    INSERTs. Invalid rows are skipped and reported, unless all_or_nothing is
+    set, in which case any error rolls back the whole batch.
+    Returns (number of movements inserted, [(row number, error)]).
+    """
+    if non_negative is None:
+        non_negative = settings.STOCK_NON_NEGATIVE
+    errors = []
+    ingredient_ids = {movement.ingredient_id for _, movement in rows}
+    known = {
+        ingredient_id
+        for (ingredient_id,) in db.query(Ingredient.id).filter(Ingredient.id.in_(ingredient_ids))
+    } if ingredient_ids else set()
+    valid = []
+    for number, movement in rows:
+        if movement.ingredient_id not in known:
+            errors.append((number, f"Ingredient {movement.ingredient_id} not found"))
+        elif movement.movement_type not in StockMovement.MOVEMENT_TYPES:
+            errors.append((number, f"Invalid movement type '{movement.movement_type}'"))
+        else:
+            valid.append((number, movement))
+    if errors and all_or_nothing:
+        return 0, errors
+    
+    deltas = {}
+    for _, movement in valid:
+        deltas[movement.ingredient_id] = deltas.get(movement.ingredient_id, 0) + movement.quantity
+    refused = set()
+    for ingredient_id, delta in deltas.items():
+        try:
+            adjust_stock(db, ingredient_id, delta, non_negative)
+        except StockError as exc:
+            refused.add(ingredient_id)
+            errors.extend((number, str(exc)) for number, movement in valid if movement.ingredient_id == ingredient_id)
+    if errors and all_or_nothing:
+        db.rollback()
+        return 0, sorted(errors)
+    
+    values = [movement.dict() for _, movement in valid if movement.ingredient_id not in refused]
+    for start in range(0, len(values), IMPORT_INSERT_CHUNK):
+        db.execute(insert(StockMovement).values(values[start:start + IMPORT_INSERT_CHUNK]))
+    evaluate_alerts(db, set(deltas) - refused)
+    mark_stock_changed(db)
+    db.commit()
+    return len(values), sorted(errors)
+
+def get_stock_movements(db: Session, ingredient_id: int = None, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    query = db.query(*columns) if columns else db.query(StockMovement)
     if ingredient_id:
         query = query.filter(StockMovement.ingredient_id == ingredient_id)
-    return query.all()
+    return make_page(keyset(query, StockMovement, limit, cursor).all(), limit)
+
+def take_stock_snapshot(db: Session):
+    """Checkpoint every ingredient's current stock with one INSERT ... SELECT.
+
+    Meant to be run periodically (e.g. nightly from cron through
+    POST /inventory/snapshots). Returns (checkpoint time, ingredients recorded).
+    """
+    taken_at = datetime.utcnow()
+    stamp = literal(taken_at, DateTime)
+    ingredient = Ingredient.__table__
+    result = db.execute(
+        insert(StockSnapshot.__table__).from_select(
+            ["ingredient_id", "taken_at", "balance", "created_at", "updated_at"],
+            select(ingredient.c.id, stamp, func.coalesce(ingredient.c.current_stock, 0), stamp, stamp),
+        )
+    )
+    db.commit()
+    return taken_at, result.rowcount
+
+def _movement_totals(db: Session, after: datetime = None, until: datetime = None, ingredient_ids=None) -> dict:
+    """Net movement per ingredient with after < created_at <= until"""
+    query = db.query(StockMovement.ingredient_id, func.sum(StockMovement.quantity))
+    if after is not None:
+        query = query.filter(StockMovement.created_at > after)
+    if until is not None:
+        query = query.filter(StockMovement.created_at <= until)
+    if ingredient_ids is not None:
+        query = query.filter(StockMovement.ingredient_id.in_(ingredient_ids))
+    return dict(query.group_by(StockMovement.ingredient_id))
+
+def stock_at(db: Session, at: datetime, ingredient_id: int = None) -> dict:
+    """Stock per ingredient at a point in time, as {ingredient_id: stock}.
+
+    Starts from the latest checkpoint at or before `at` and replays only the
+    movements since. Ingredients with no such checkpoint are rolled back from
+    their current stock by the movements after `at` instead.
+    """
+    checkpoint = db.query(func.max(StockSnapshot.taken_at)).filter(StockSnapshot.taken_at <= at).scalar()
+    ids = [ingredient_id] if ingredient_id else None
+    levels = {}
+    if checkpoint is not None:
+        query = db.query(StockSnapshot.ingredient_id, StockSnapshot.balance).filter(StockSnapshot.taken_at == checkpoint)
+        if ids:
+            query = query.filter(StockSnapshot.ingredient_id.in_(ids))
+        levels = dict(query)
+        for moved_id, moved in _movement_totals(db, checkpoint, at, ids or list(levels)).items():
+            levels[moved_id] += moved
+    
+    query = db.query(Ingredient.id, Ingredient.current_stock).filter(Ingredient.created_at <= at)
+    if ids:
+        query = query.filter(Ingredient.id.in_(ids))
+    current = {id_: stock or 0.0 for id_, stock in query if id_ not in levels}
+    if current:
+        for moved_id, moved in _movement_totals(db, after=at, ingredient_ids=list(current)).items():
+            current[moved_id] -= moved
+        levels.update(current)
+    return dict(sorted(levels.items()))
+
+def stock_movement_export_query(start: datetime = None, end: datetime = None, ingredient_id: int = None):
+    """Column projection of stock movements, for streaming export"""
+    query = select(
+        StockMovement.id,
+        StockMovement.ingredient_id,
+        StockMovement.quantity,
+        StockMovement.movement_type,
+        StockMovement.reference_id,
+        StockMovement.notes,
+        StockMovement.created_at,
+    )
+    if ingredient_id:
+        query = query.where(StockMovement.ingredient_id == ingredient_id)
+    return created_between(query, StockMovement, start, end)
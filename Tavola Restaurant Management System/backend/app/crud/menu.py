@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.db.models.menu import MenuCategory, MenuItem
 from app.schemas.menu import MenuCategoryCreate, MenuItemCreate
+from app.crud.catalog import bump_catalog_version
 
 def get_categories(db: Session):
     return db.query(MenuCategory).all()
@@ -12,6 +13,7 @@ def create_category(db: Session, category: MenuCategoryCreate):
     db_category = MenuCategory(**category.dict())
     db.add(db_category)
     db.commit()
+    bump_catalog_version()
     db.refresh(db_category)
     return db_category
 
@@ -21,6 +23,7 @@ def update_category(db: Session, category_id: int, category: MenuCategoryCreate)
         for key, value in category.dict().items():
             setattr(db_category, key, value)
         db.commit()
+        bump_catalog_version()
         db.refresh(db_category)
     return db_category
 
@@ -29,10 +32,11 @@ def delete_category(db: Session, category_id: int):
     if db_category:
         db.delete(db_category)
         db.commit()
+        bump_catalog_version()
     return db_category
 
-def get_items(db: Session, category_id: int = None):
-    query = db.query(MenuItem)
+def get_items(db: Session, category_id: int = None, columns=None):
+    query = db.query(*columns) if columns else db.query(MenuItem)
     if category_id:
         query = query.filter(MenuItem.category_id == category_id)
     return query.all()
@@ -44,6 +48,7 @@ def create_item(db: Session, item: MenuItemCreate):
     db_item = MenuItem(**item.dict())
     db.add(db_item)
     db.commit()
+    bump_catalog_version()
     db.refresh(db_item)
     return db_item
 
@@ -53,6 +58,7 @@ def update_item(db: Session, item_id: int, item: MenuItemCreate):
         for key, value in item.dict().items():
             setattr(db_item, key, value)
         db.commit()
+        bump_catalog_version()
         db.refresh(db_item)
     return db_item
 
@@ -61,4 +67,5 @@ def delete_item(db: Session, item_id: int):
     if db_item:
         db.delete(db_item)
         db.commit()
+        bump_catalog_version()
     return db_item
@@ -0,0 +1,168 @@
+"""Menu engineering: popularity against contribution margin, per category.
+
+Each menu item is classified within its category for a date range:
+
+    star       popular and above-average margin
+    plowhorse  popular, below-average margin
+    puzzle     unpopular, above-average margin
+    dog        unpopular, below-average margin
+
+An item is popular when its share of the category's items sold is at least
+MENU_ENGINEERING_POPULARITY_FACTOR / (items in the category), the usual 70%
+rule. Its margin is compared with the category's average margin per item
+sold. Items that did not sell use price - cost as their margin.
+
+Sales come from the item rollups (crud.reports) in one grouped query. The
+classification runs on every item at once with NumPy. Results are cached
+by (range, category) against the rollup version, so they are recomputed
+once new sales are recorded.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.reports import rollup_filter, rollup_version
+from app.db.models.menu import MenuItem
+from app.db.models.report import ItemSalesRollup
+
+# Indexed by 2 * popular + profitable
+CLASSES = np.array(["dog", "puzzle", "plowhorse", "star"])
+
+_cache = TTLCache(
+    maxsize=settings.MENU_ENGINEERING_CACHE_MAX_SIZE,
+    ttl=settings.MENU_ENGINEERING_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class ItemClassification:
+    menu_item_id: int
+    name: str
+    category_id: int
+    quantity: int
+    popularity: float  # share of the category's items sold
+    unit_margin: float
+    total_margin: float
+    classification: str
+
+
+@dataclass(frozen=True)
+class CategoryThresholds:
+    category_id: int
+    items: int
+    items_sold: int
+    popularity_threshold: float
+    margin_threshold: float
+
+
+@dataclass(frozen=True)
+class MenuEngineering:
+    start: datetime
+    end: datetime
+    items: List[ItemClassification]
+    categories: List[CategoryThresholds]
+
+
+def classify(categories: np.ndarray, quantity: np.ndarray, unit_margin: np.ndarray, popularity_factor: float):
+    """Classify items given each one's category code (0..k-1), quantity sold and unit margin.
+
+    Returns the class names and popularity shares per item, then the
+    popularity threshold, margin threshold and items sold per category.
+    """
+    counts = np.bincount(categories)
+    sold = np.bincount(categories, weights=quantity, minlength=len(counts))
+    margin = np.bincount(categories, weights=quantity * unit_margin, minlength=len(counts))
+    # A category with no sales falls back to the plain average margin of its items
+    plain = np.bincount(categories, weights=unit_margin, minlength=len(counts)) / counts
+    margin_threshold = np.divide(margin, sold, out=plain, where=sold > 0)
+    popularity_threshold = popularity_factor / counts
+
+    popularity = np.divide(quantity, sold[categories], out=np.zeros(len(quantity)), where=sold[categories] > 0)
+    popular = (popularity >= popularity_threshold[categories]) & (quantity > 0)
+    profitable = unit_margin >= margin_threshold[categories]
+    return CLASSES[2 * popular + profitable], popularity, popularity_threshold, margin_threshold, sold
+
+
+def _build(db: Session, start: datetime, end: datetime, category_id: Optional[int]) -> MenuEngineering:
+    sold = (
+        select(
+            ItemSalesRollup.menu_item_id,
+            func.sum(ItemSalesRollup.quantity).label("quantity"),
+            (func.sum(ItemSalesRollup.revenue_cents - ItemSalesRollup.cost_cents) / 100.0).label("margin"),
+        )
+        .where(rollup_filter(ItemSalesRollup, start, end))
+        .group_by(ItemSalesRollup.menu_item_id)
+        .subquery()
+    )
+    query = (
+        select(
+            MenuItem.id,
+            MenuItem.name,
+            MenuItem.category_id,
+            MenuItem.price - MenuItem.cost,
+            func.coalesce(sold.c.quantity, 0),
+            func.coalesce(sold.c.margin, 0.0),
+        )
+        .outerjoin(sold, sold.c.menu_item_id == MenuItem.id)
+        # Items off the menu only matter if they sold in the range
+        .where((MenuItem.is_available.is_not(False)) | (sold.c.quantity > 0))
+        .order_by(MenuItem.category_id, MenuItem.id)
+    )
+    if category_id is not None:
+        query = query.where(MenuItem.category_id == category_id)
+    rows = db.execute(query).all()
+    if not rows:
+        return MenuEngineering(start, end, [], [])
+
+    ids, names, category_ids, list_margin, quantity, total_margin = zip(*rows)
+    category_ids = np.array(category_ids)
+    codes_to_ids, codes = np.unique(category_ids, return_inverse=True)
+    quantity = np.array(quantity, dtype=float)
+    total_margin = np.array(total_margin, dtype=float)
+    unit_margin = np.divide(
+        total_margin, quantity, out=np.array(list_margin, dtype=float), where=quantity > 0
+    )
+    classes, popularity, popularity_threshold, margin_threshold, sold_per_category = classify(
+        codes, quantity, unit_margin, settings.MENU_ENGINEERING_POPULARITY_FACTOR
+    )
+    items = [
+        ItemClassification(
+            menu_item_id=ids[i],
+            name=names[i],
+            category_id=int(category_ids[i]),
+            quantity=int(quantity[i]),
+            popularity=round(float(popularity[i]), 4),
+            unit_margin=round(float(unit_margin[i]), 2),
+            total_margin=round(float(total_margin[i]), 2),
+            classification=str(classes[i]),
+        )
+        for i in range(len(ids))
+    ]
+    counts = np.bincount(codes)
+    categories = [
+        CategoryThresholds(
+            category_id=int(codes_to_ids[code]),
+            items=int(counts[code]),
+            items_sold=int(sold_per_category[code]),
+            popularity_threshold=round(float(popularity_threshold[code]), 4),
+            margin_threshold=round(float(margin_threshold[code]), 2),
+        )
+        for code in range(len(codes_to_ids))
+    ]
+    return MenuEngineering(start, end, items, categories)
+
+
+def get_menu_engineering(db: Session, start: datetime, end: datetime, category_id: int = None) -> MenuEngineering:
+    """Classify menu items over [start, end), optionally for one category"""
+    key = (start, end, category_id, rollup_version())
+    result = _cache.get(key)
+    if result is None:
+        result = _build(db, start, end, category_id)
+        _cache.set(key, result)
+    return result
@@ -1,10 +1,51 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.core import events
+from app.core.config import settings
+from app.core.money import apply_rate, to_cents
+from app.db.models.menu import MenuItem
 from app.db.models.order import Table, Order, OrderItem, Payment
-from app.schemas.order import TableCreate, OrderCreate, OrderStatusUpdate, PaymentCreate
+from app.schemas.order import TableCreate, OrderCreate, OrderItemCreate, OrderItemUpdate, OrderStatusUpdate, PaymentCreate
+from app.crud import reports
+from app.crud.catalog import get_catalog
+from app.crud.inventory import consume_order_ingredients, order_consumed
+from app.crud.pagination import DEFAULT_PAGE_SIZE, created_between, keyset, make_page
 import uuid
 
-def get_tables(db: Session):
-    return db.query(Table).all()
+class OrderError(ValueError):
+    """Raised when an order change is rejected (e.g. an unavailable menu item)"""
+
+class PaymentError(ValueError):
+    """Raised when a payment is rejected (e.g. it exceeds the balance due)"""
+
+class IdempotencyError(ValueError):
+    """Raised when an Idempotency-Key is reused for a different payment"""
+
+# Ingredients are consumed when the kitchen starts an order; items added
+# after that point are consumed as they are added
+CONSUMING_STATUSES = {"preparing", "ready", "served", "completed"}
+
+# Loader strategies for the order graph, chosen per endpoint:
+#   "summary" - order row only
+#   "items"   - order plus its items (enough for OrderResponse and totals)
+#   "full"    - items with their menu items, plus the table
+ORDER_LOADERS = {
+    "summary": (),
+    "items": (selectinload(Order.items),),
+    "full": (
+        selectinload(Order.items).joinedload(OrderItem.menu_item),
+        joinedload(Order.table),
+    ),
+}
+
+def order_load_options(load: str = "items"):
+    return ORDER_LOADERS[load]
+
+def get_tables(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    query = db.query(*columns) if columns else db.query(Table)
+    return make_page(keyset(query, Table, limit, cursor).all(), limit)
 
 def get_table(db: Session, table_id: int):
     return db.query(Table).filter(Table.id == table_id).first()
@@ -16,14 +57,111 @@ def create_table(db: Session, table: TableCreate):
     db.refresh(db_table)
     return db_table
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Order).offset(skip).limit(limit).all()
+def get_orders(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, load: str = "items"):
+    query = db.query(Order).options(*order_load_options(load))
+    return make_page(keyset(query, Order, limit, cursor).all(), limit)
+
+def get_order(db: Session, order_id: int, load: str = "items"):
+    return db.query(Order).options(*order_load_options(load)).filter(Order.id == order_id).first()
+
+def _line_total(item: OrderItem) -> int:
+    """Contribution of an item to its order's subtotal, in cents"""
+    if item.status == "cancelled":
+        return 0
+    return item.quantity * item.unit_price_cents
+
+def _totals(subtotal_cents: int) -> dict:
+    """Stored totals for a subtotal: tax is rounded once, on the whole subtotal"""
+    tax = apply_rate(subtotal_cents, settings.TAX_RATE)
+    return {"subtotal_cents": subtotal_cents, "tax_cents": tax, "total_cents": subtotal_cents + tax}
+
+def _apply_subtotal_delta(db: Session, order_id: int, delta: int) -> int:
+    """Shift an order's stored totals by a change in its item subtotal.
+
+    The subtotal is incremented in the database (UPDATE ... RETURNING) so
+    concurrent item changes do not overwrite each other; that UPDATE holds
+    the order row until commit, so tax and total are then set from the new
+    subtotal. Returns the change in the order's tax, in cents. Does not commit.
+    """
+    if not delta:
+        return 0
+    subtotal, old_tax = db.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(subtotal_cents=Order.subtotal_cents + delta)
+        .returning(Order.subtotal_cents, Order.tax_cents)
+        .execution_options(synchronize_session=False)
+    ).one()
+    totals = _totals(subtotal)
+    db.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(**totals)
+        .execution_options(synchronize_session=False)
+    )
+    return totals["tax_cents"] - old_tax
 
-def get_order(db: Session, order_id: int):
-    return db.query(Order).filter(Order.id == order_id).first()
+def _resolve_prices(db: Session, items) -> dict:
+    """Current price, in cents, of every menu item referenced by items, in one IN query.
+
+    Raises OrderError if any item is unknown or not available.
+    """
+    menu_item_ids = {item.menu_item_id for item in items}
+    rows = db.query(MenuItem.id, MenuItem.price, MenuItem.is_available).filter(
+        MenuItem.id.in_(menu_item_ids)
+    ).all()
+    found = {menu_item_id: (price, is_available) for menu_item_id, price, is_available in rows}
+    missing = sorted(menu_item_ids - found.keys())
+    if missing:
+        raise OrderError(f"Menu item(s) {', '.join(map(str, missing))} not found")
+    unavailable = sorted(i for i, (_, is_available) in found.items() if not is_available)
+    if unavailable:
+        raise OrderError(f"Menu item(s) {', '.join(map(str, unavailable))} not available")
+    return {menu_item_id: to_cents(price) for menu_item_id, (price, _) in found.items()}
+
+def _station(db: Session, menu_item_id: int):
+    """Kitchen station of a menu item: its menu category"""
+    item = get_catalog(db).items_by_id.get(menu_item_id)
+    return item.category_id if item else None
+
+def _item_payload(db: Session, item: OrderItem) -> dict:
+    return {
+        "id": item.id,
+        "menu_item_id": item.menu_item_id,
+        "quantity": item.quantity,
+        "status": item.status,
+        "notes": item.notes,
+        "station": _station(db, item.menu_item_id),
+    }
+
+def _publish_order(db: Session, event_type: str, db_order: Order):
+    items = [_item_payload(db, item) for item in db_order.items]
+    events.publish(
+        event_type,
+        order_id=db_order.id,
+        status=db_order.status,
+        stations={item["station"] for item in items if item["station"] is not None},
+        payload={
+            "order_number": db_order.order_number,
+            "order_type": db_order.order_type,
+            "table_id": db_order.table_id,
+            "items": items,
+        },
+    )
+
+def _publish_item(db: Session, event_type: str, order_item: OrderItem):
+    item = _item_payload(db, order_item)
+    events.publish(
+        event_type,
+        order_id=order_item.order_id,
+        status=order_item.status,
+        stations=[item["station"]] if item["station"] is not None else [],
+        payload={"item": item},
+    )
 
 def create_order(db: Session, order: OrderCreate):
     order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    prices = _resolve_prices(db, order.items)
     
     db_order = Order(
         order_number=order_number,
@@ -34,48 +172,218 @@ def create_order(db: Session, order: OrderCreate):
     db.add(db_order)
     db.flush()
     
-    # Add order items
-    total_amount = 0.0
-    for item_data in order.items:
-        order_item = OrderItem(
-            order_id=db_order.id,
-            menu_item_id=item_data.menu_item_id,
-            quantity=item_data.quantity,
-            special_instructions=item_data.special_instructions,
-        )
-        db.add(order_item)
-        # Calculate item total (would fetch from MenuItem in real scenario)
-        # For now, using a placeholder
-        total_amount += item_data.quantity * 10.0  # Placeholder
-    
-    db_order.total_amount = total_amount
+    # Snapshot the current menu price on each line and write all lines with
+    # one executemany INSERT rather than one INSERT per ORM object
+    lines = [
+        {
+            "order_id": db_order.id,
+            "menu_item_id": item_data.menu_item_id,
+            "quantity": item_data.quantity,
+            "unit_price_cents": prices[item_data.menu_item_id],
+            "notes": item_data.special_instructions,
+            "status": "pending",
+        }
+        for item_data in order.items
+    ]
+    if lines:
+        db.execute(insert(OrderItem), lines)
+    for column, cents in _totals(sum(line["quantity"] * line["unit_price_cents"] for line in lines)).items():
+        setattr(db_order, column, cents)
     db.commit()
     db.refresh(db_order)
+    _publish_order(db, "order.created", db_order)
     return db_order
 
+def add_order_item(db: Session, order_id: int, item_data: OrderItemCreate):
+    """Add an item to an existing order and update its totals"""
+    found = db.query(Order.status, Order.paid_at).filter(Order.id == order_id).first()
+    if not found:
+        return None
+    prices = _resolve_prices(db, [item_data])
+    order_item = OrderItem(
+        order_id=order_id,
+        menu_item_id=item_data.menu_item_id,
+        quantity=item_data.quantity,
+        unit_price_cents=prices[item_data.menu_item_id],
+        special_instructions=item_data.special_instructions,
+    )
+    db.add(order_item)
+    db.flush()
+    tax_change = _apply_subtotal_delta(db, order_id, _line_total(order_item))
+    if found.status in CONSUMING_STATUSES:
+        consume_order_ingredients(db, order_id, item_ids=[order_item.id])
+    if found.paid_at:
+        reports.record_item_change(db, order_id, found.paid_at, order_item.id, 1, tax_change)
+    db.commit()
+    db.refresh(order_item)
+    _publish_item(db, "item.created", order_item)
+    return order_item
+
+def update_order_item(db: Session, order_id: int, item_id: int, item_update: OrderItemUpdate):
+    """Change an item's quantity, status or instructions and update its order's totals"""
+    order_item = db.query(OrderItem).filter(
+        OrderItem.id == item_id, OrderItem.order_id == order_id
+    ).first()
+    if not order_item:
+        return None
+    changes = item_update.dict(exclude_unset=True)
+    if changes.get("status", order_item.status) not in OrderItem.ITEM_STATUSES:
+        raise OrderError(f"Invalid item status '{changes['status']}'")
+    before = _line_total(order_item)
+    # Items of a paid order stay counted in the hour the order was paid
+    paid_at = db.query(Order.paid_at).filter(Order.id == order_id).scalar()
+    if paid_at:
+        reports.record_item_change(db, order_id, paid_at, item_id, -1)
+    for key, value in changes.items():
+        setattr(order_item, key, value)
+    tax_change = _apply_subtotal_delta(db, order_id, _line_total(order_item) - before)
+    if paid_at:
+        reports.record_item_change(db, order_id, paid_at, item_id, 1, tax_change)
+    db.commit()
+    db.refresh(order_item)
+    _publish_item(db, "item.updated", order_item)
+    return order_item
+
+def check_order_totals(db: Session, fix: bool = False):
+    """Recompute every order's totals from its items in bulk.
+
+    Returns (orders checked, ids whose stored totals disagree). With fix=True
+    the stored totals of mismatched orders are overwritten in one UPDATE.
+    """
+    computed = (
+        select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price_cents), 0))
+        .where(OrderItem.order_id == Order.id, OrderItem.status != "cancelled")
+        .correlate(Order)
+        .scalar_subquery()
+        .label("computed")
+    )
+    checked = db.query(func.count(Order.id)).scalar()
+    rows = db.query(Order.id, computed).filter(Order.subtotal_cents != computed).all()
+    mismatched = [order_id for order_id, _ in rows]
+    if fix and rows:
+        # Bulk UPDATE by primary key, one parameter set per order
+        db.execute(update(Order), [{"id": order_id, **_totals(cents)} for order_id, cents in rows])
+        db.commit()
+    return checked, mismatched
+
 def update_order_status(db: Session, order_id: int, status_update: OrderStatusUpdate):
     db_order = get_order(db, order_id)
     if db_order:
+        starts_preparing = (
+            status_update.status in CONSUMING_STATUSES and db_order.status not in CONSUMING_STATUSES
+        )
         db_order.status = status_update.status
+        # A refunded order goes back to pending; it is not consumed twice
+        if starts_preparing and not order_consumed(db, order_id):
+            consume_order_ingredients(db, order_id)
         db.commit()
         db.refresh(db_order)
+        _publish_order(db, "order.status", db_order)
     return db_order
 
-def get_payments(db: Session):
-    return db.query(Payment).all()
+def order_export_query(start: datetime = None, end: datetime = None):
+    """Column projection of orders with their totals, for streaming export"""
+    query = select(
+        Order.id,
+        Order.order_number,
+        Order.status,
+        Order.order_type,
+        Order.table_id,
+        Order.waiter_id,
+        (Order.subtotal_cents / 100.0).label("subtotal"),
+        (Order.tax_cents / 100.0).label("tax_amount"),
+        (Order.total_cents / 100.0).label("total_amount"),
+        Order.created_at,
+    )
+    return created_between(query, Order, start, end)
+
+def payment_export_query(start: datetime = None, end: datetime = None):
+    """Column projection of payments, for streaming export"""
+    query = select(
+        Payment.id,
+        Payment.order_id,
+        (Payment.amount_cents / 100.0).label("amount"),
+        Payment.payment_method,
+        Payment.status,
+        Payment.transaction_id,
+        Payment.created_at,
+    )
+    return created_between(query, Payment, start, end)
+
+def get_payments(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    query = db.query(*columns) if columns else db.query(Payment)
+    return make_page(keyset(query, Payment, limit, cursor).all(), limit)
 
 def get_payment(db: Session, payment_id: int):
     return db.query(Payment).filter(Payment.id == payment_id).first()
 
-def create_payment(db: Session, payment: PaymentCreate):
+def _replay_payment(db: Session, payment: PaymentCreate, idempotency_key: str):
+    """The payment already recorded under idempotency_key, if any"""
+    existing = db.query(Payment).filter(Payment.idempotency_key == idempotency_key).first()
+    if existing is None:
+        return None
+    if (existing.order_id, existing.amount_cents, existing.payment_method) != (
+        payment.order_id, to_cents(payment.amount), payment.payment_method
+    ):
+        raise IdempotencyError("Idempotency-Key was already used for a different payment")
+    return existing
+
+def create_payment(db: Session, payment: PaymentCreate, idempotency_key: str = None):
+    """Record a full, partial or split payment against an order's balance due.
+
+    The order's paid balance is advanced with a guarded UPDATE, so concurrent
+    payments cannot overpay it; the order is settled once it is paid in
+    full. With an idempotency_key, a retry returns the original payment
+    instead of charging twice. Returns None if the order does not exist.
+    """
+    if idempotency_key:
+        existing = _replay_payment(db, payment, idempotency_key)
+        if existing:
+            return existing
+    if payment.payment_method not in Payment.PAYMENT_METHODS:
+        raise PaymentError(f"Invalid payment method '{payment.payment_method}'")
+    order = get_order(db, payment.order_id, load="summary")
+    if not order:
+        return None
+    cents = to_cents(payment.amount)
+    if cents <= 0:
+        raise PaymentError("Payment amount must be positive")
+    advanced = db.execute(
+        update(Order)
+        .where(Order.id == payment.order_id, Order.amount_paid_cents + cents <= Order.total_cents)
+        .values(amount_paid_cents=Order.amount_paid_cents + cents)
+        .returning(Order.amount_paid_cents, Order.total_cents)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if advanced is None:
+        db.rollback()
+        balance_due = get_order(db, payment.order_id, load="summary").balance_due
+        if balance_due <= 0:
+            raise PaymentError("Order is already paid in full")
+        raise PaymentError(f"Payment exceeds the balance due of {balance_due}")
+    paid, total = advanced
+    
     db_payment = Payment(
         order_id=payment.order_id,
-        amount=payment.amount,
+        amount_cents=cents,
         payment_method=payment.payment_method,
         transaction_id=payment.transaction_id,
+        idempotency_key=idempotency_key,
         status="completed",
     )
     db.add(db_payment)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key (or transaction id) got there first
+        db.rollback()
+        existing = _replay_payment(db, payment, idempotency_key) if idempotency_key else None
+        if existing:
+            return existing
+        raise PaymentError(f"Transaction '{payment.transaction_id}' is already recorded")
+    reports.record_payment(db, db_payment)
+    if paid >= total and order.paid_at is None:
+        reports.settle_order(db, order, db_payment.created_at)
     db.commit()
     db.refresh(db_payment)
     return db_payment
@@ -83,11 +391,45 @@ def create_payment(db: Session, payment: PaymentCreate):
 def refund_payment(db: Session, payment_id: int):
     db_payment = get_payment(db, payment_id)
     if db_payment:
+        order = get_order(db, db_payment.order_id, load="summary")
+        if db_payment.status == "completed":
+            reports.record_payment(db, db_payment, -1)
+            db.execute(
+                update(Order)
+                .where(Order.id == db_payment.order_id)
+                .values(amount_paid_cents=Order.amount_paid_cents - db_payment.amount_cents)
+                .execution_options(synchronize_session=False)
+            )
+            # No longer paid in full
+            if order and order.paid_at is not None:
+                reports.unsettle_order(db, order)
         db_payment.status = "refunded"
         # Update order status back to pending
-        order = get_order(db, db_payment.order_id)
         if order:
             order.status = "pending"
         db.commit()
         db.refresh(db_payment)
+        if order:
+            _publish_order(db, "order.status", order)
     return db_payment
+
+def reconcile_payments(db: Session, fix: bool = False):
+    """Recompute every order's paid balance from its completed payments.
+
+    Returns (orders checked, ids whose stored balance disagrees). With
+    fix=True the mismatched balances are overwritten in one UPDATE.
+    """
+    computed = (
+        select(func.coalesce(func.sum(Payment.amount_cents), 0))
+        .where(Payment.order_id == Order.id, Payment.status == "completed")
+        .correlate(Order)
+        .scalar_subquery()
+    )
+    checked = db.query(func.count(Order.id)).scalar()
+    mismatched = [order_id for (order_id,) in db.query(Order.id).filter(Order.amount_paid_cents != computed)]
+    if fix and mismatched:
+        db.query(Order).filter(Order.id.in_(mismatched)).update(
+            {Order.amount_paid_cents: computed}, synchronize_session=False
+        )
+        db.commit()
+    return checked, mismatched
@@ -0,0 +1,415 @@
+"""Sales reporting from pre-aggregated rollup tables.
+
+Hourly and daily rollups of settled orders, items sold and payments are
+maintained incrementally, inside the transaction of the order or payment
+change that affects them (see crud.order). Reports then read a few hundred
+rollup rows instead of scanning orders, items and payments.
+
+An order is settled, and its items counted, when it is paid; its sales are
+bucketed at that time (Order.paid_at). A refund takes the payment and the
+order's sales back out of the buckets they were recorded in. Payments are
+bucketed at the time they were taken.
+
+Money is summed in integer cents. Tax is the tax each order was charged
+(Order.tax_cents), not recomputed from revenue, so reports match invoices
+and past periods do not change with TAX_RATE.
+
+backfill_rollups rebuilds the tables from orders and payments, for history
+that predates the rollups or after a bulk data fix.
+
+rollup_version() advances every time a transaction that changed the rollups
+commits on this worker, so results derived from them can be cached against it.
+"""
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.money import from_cents, to_cents
+from app.db.models.menu import MenuItem
+from app.db.models.order import Order, OrderItem, Payment
+from app.db.models.report import ItemSalesRollup, PaymentRollup, SalesRollup
+
+_KEYS = {
+    SalesRollup: ("grain", "bucket"),
+    ItemSalesRollup: ("grain", "bucket", "menu_item_id"),
+    PaymentRollup: ("grain", "bucket", "payment_method"),
+}
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+_CHANGED = "rollups_changed"
+_lock = threading.Lock()
+_version = 0
+
+
+def rollup_version() -> int:
+    return _version
+
+
+@event.listens_for(Session, "after_commit")
+def _advance_on_commit(session: Session) -> None:
+    global _version
+    if session.info.pop(_CHANGED, False):
+        with _lock:
+            _version += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_change(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
+
+
+def bucket_start(at: datetime, grain: str) -> datetime:
+    if grain == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def _merge(rows: Iterable[dict], keys: Tuple[str, ...]) -> List[dict]:
+    """Sum rows that share a key into one row per key"""
+    merged: Dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row[k] for k in keys)
+        if key in merged:
+            for column, value in row.items():
+                if column not in keys:
+                    merged[key][column] += value
+        else:
+            merged[key] = dict(row)
+    return list(merged.values())
+
+
+def _add(db: Session, model, rows: List[dict]) -> None:
+    """Add each row's values into its hour and day buckets, creating them as needed"""
+    if not rows:
+        return
+    keys = _KEYS[model]
+    # One row per key: a multi-row upsert may not touch the same row twice
+    buckets = _merge(
+        ({**row, "grain": grain, "bucket": bucket_start(row["bucket"], grain)} for row in rows for grain in ("hour", "day")),
+        keys,
+    )
+    stmt = _INSERTS[db.get_bind().dialect.name](model)
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            column: table.c[column] + stmt.excluded[column]
+            for column in rows[0]
+            if column not in keys
+        },
+    )
+    db.execute(stmt, buckets)
+    db.info[_CHANGED] = True
+
+
+def record_payment(db: Session, payment: Payment, sign: int = 1) -> None:
+    """Count a completed payment (sign=-1 takes a refunded one back out)"""
+    _add(db, PaymentRollup, [{
+        "bucket": payment.created_at,
+        "payment_method": payment.payment_method,
+        "payments": sign,
+        "amount_cents": sign * payment.amount_cents,
+    }])
+
+
+def _cost_cents(quantity: int, unit_cost) -> int:
+    return quantity * to_cents(unit_cost or 0)
+
+
+def _item_rows(db: Session, order_id: int, bucket: datetime, sign: int, item_ids=None) -> List[dict]:
+    """Quantity, revenue and cost per menu item for an order's non-cancelled items"""
+    query = (
+        db.query(
+            OrderItem.menu_item_id,
+            MenuItem.cost,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.unit_price_cents),
+        )
+        .join(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .filter(OrderItem.order_id == order_id, OrderItem.status != "cancelled")
+        .group_by(OrderItem.menu_item_id, MenuItem.cost)
+    )
+    if item_ids is not None:
+        query = query.filter(OrderItem.id.in_(item_ids))
+    return [
+        {"bucket": bucket, "menu_item_id": menu_item_id, "quantity": sign * quantity,
+         "revenue_cents": sign * revenue, "cost_cents": sign * _cost_cents(quantity, unit_cost)}
+        for menu_item_id, unit_cost, quantity, revenue in query
+    ]
+
+
+def _record_items(db: Session, rows: List[dict], bucket: datetime, covers: int, tax_cents: int) -> None:
+    _add(db, ItemSalesRollup, rows)
+    _add(db, SalesRollup, [{
+        "bucket": bucket,
+        "covers": covers,
+        "items_sold": sum(row["quantity"] for row in rows),
+        "revenue_cents": sum(row["revenue_cents"] for row in rows),
+        "tax_cents": tax_cents,
+        "cost_cents": sum(row["cost_cents"] for row in rows),
+    }])
+
+
+def _order_tax(db: Session, order_id: int) -> int:
+    # Read from the database: item changes update the stored totals in SQL
+    return db.query(Order.tax_cents).filter(Order.id == order_id).scalar() or 0
+
+
+def settle_order(db: Session, order: Order, at: datetime) -> None:
+    """Mark an order paid at the given time and count its sales"""
+    db.flush()
+    order.paid_at = at
+    _record_items(db, _item_rows(db, order.id, at, 1), at, 1, _order_tax(db, order.id))
+
+
+def unsettle_order(db: Session, order: Order) -> None:
+    """Take a refunded order's sales back out of the bucket they were counted in"""
+    db.flush()
+    _record_items(db, _item_rows(db, order.id, order.paid_at, -1), order.paid_at, -1, -_order_tax(db, order.id))
+    order.paid_at = None
+
+
+def record_item_change(db: Session, order_id: int, paid_at: datetime, item_id: int, sign: int, tax_cents: int = 0) -> None:
+    """Count (sign=1) or uncount (sign=-1) one item of an already settled order.
+
+    Called around a change to the item, so edits after payment stay in the
+    order's original bucket. tax_cents is the change in the order's stored
+    tax that the edit caused.
+    """
+    db.flush()
+    _record_items(db, _item_rows(db, order_id, paid_at, sign, item_ids=[item_id]), paid_at, 0, tax_cents)
+
+
+def _hour_expr(db: Session, column):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    return func.date_trunc("hour", column)
+
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def _with_days(rows: List[dict], keys: Tuple[str, ...]) -> List[dict]:
+    """Hour rows plus the day rows they add up to"""
+    return rows + _merge(({**row, "grain": "day", "bucket": bucket_start(row["bucket"], "day")} for row in rows), keys)
+
+
+def backfill_rollups(db: Session, since: Optional[datetime] = None) -> dict:
+    """Rebuild the rollups from orders and payments, from since (a whole day) onwards.
+
+    Orders paid in full before rollups existed are given a paid_at from
+    their last completed payment. Returns the number of rollup rows written
+    per table.
+    """
+    since = bucket_start(since, "day") if since else None
+    completed_payments = select(Payment).where(Payment.order_id == Order.id, Payment.status == "completed")
+    last_payment = completed_payments.with_only_columns(func.max(Payment.created_at)).correlate(Order).scalar_subquery()
+    paid = completed_payments.with_only_columns(func.sum(Payment.amount_cents)).correlate(Order).scalar_subquery()
+    db.execute(
+        update(Order)
+        .where(Order.paid_at.is_(None), Order.total_cents > 0, paid >= Order.total_cents)
+        .values(paid_at=last_payment)
+        .execution_options(synchronize_session=False)
+    )
+    for model in _KEYS:
+        stmt = delete(model)
+        if since:
+            stmt = stmt.where(model.bucket >= since)
+        db.execute(stmt)
+
+    hour = _hour_expr(db, Order.paid_at).label("hour")
+    settled = Order.paid_at.is_not(None) if since is None else Order.paid_at >= since
+    orders = (
+        db.query(hour, func.count(Order.id), func.sum(Order.tax_cents)).filter(settled).group_by(hour).all()
+    )
+    items = (
+        db.query(
+            hour,
+            OrderItem.menu_item_id,
+            MenuItem.cost,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.unit_price_cents),
+        )
+        .join(Order, Order.id == OrderItem.order_id)
+        .join(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .filter(settled, OrderItem.status != "cancelled")
+        .group_by(hour, OrderItem.menu_item_id, MenuItem.cost)
+        .all()
+    )
+    item_rows = []
+    sales = defaultdict(lambda: {"covers": 0, "items_sold": 0, "revenue_cents": 0, "tax_cents": 0, "cost_cents": 0})
+    for bucket, count, tax in orders:
+        totals = sales[_as_datetime(bucket)]
+        totals["covers"] = count
+        totals["tax_cents"] = tax or 0
+    for bucket, menu_item_id, unit_cost, quantity, revenue in items:
+        bucket = _as_datetime(bucket)
+        cost = _cost_cents(quantity, unit_cost)
+        item_rows.append({"grain": "hour", "bucket": bucket, "menu_item_id": menu_item_id,
+                          "quantity": quantity, "revenue_cents": revenue, "cost_cents": cost})
+        totals = sales[bucket]
+        totals["items_sold"] += quantity
+        totals["revenue_cents"] += revenue
+        totals["cost_cents"] += cost
+
+    hour = _hour_expr(db, Payment.created_at).label("hour")
+    completed = [Payment.status == "completed"] + ([Payment.created_at >= since] if since else [])
+    payments = (
+        db.query(hour, Payment.payment_method, func.count(Payment.id), func.sum(Payment.amount_cents))
+        .filter(*completed)
+        .group_by(hour, Payment.payment_method)
+        .all()
+    )
+
+    written = {}
+    for model, rows in (
+        (SalesRollup, [{"grain": "hour", "bucket": bucket, **totals} for bucket, totals in sales.items()]),
+        (ItemSalesRollup, item_rows),
+        (PaymentRollup, [
+            {"grain": "hour", "bucket": _as_datetime(bucket), "payment_method": method, "payments": count, "amount_cents": amount}
+            for bucket, method, count, amount in payments
+        ]),
+    ):
+        rows = _with_days(rows, _KEYS[model])
+        if rows:
+            db.execute(insert(model.__table__), rows)
+        written[model.__tablename__] = len(rows)
+    db.info[_CHANGED] = True
+    db.commit()
+    return written
+
+
+def report_range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Hour-aligned [start, end) in naive UTC; defaults to the last 30 days"""
+    start, end = (
+        at.astimezone(timezone.utc).replace(tzinfo=None) if at and at.tzinfo else at for at in (start, end)
+    )
+    if end is None:
+        end = datetime.utcnow()
+    aligned_end = bucket_start(end, "hour")
+    if aligned_end < end:
+        aligned_end += timedelta(hours=1)
+    start = bucket_start(start, "hour") if start else bucket_start(aligned_end - timedelta(days=30), "day")
+    return start, aligned_end
+
+
+def rollup_filter(model, start: datetime, end: datetime):
+    """Filter selecting day buckets for the whole days in [start, end) and hour buckets for the rest"""
+    first_day = bucket_start(start, "day")
+    if first_day < start:
+        first_day += timedelta(days=1)
+    last_day = bucket_start(end, "day")
+    if first_day >= last_day:
+        return and_(model.grain == "hour", model.bucket >= start, model.bucket < end)
+    # Three flat ranges, so each is an index range scan on (grain, bucket)
+    return or_(
+        and_(model.grain == "day", model.bucket >= first_day, model.bucket < last_day),
+        and_(model.grain == "hour", model.bucket >= start, model.bucket < first_day),
+        and_(model.grain == "hour", model.bucket >= last_day, model.bucket < end),
+    )
+
+
+_SALES_COLUMNS = (
+    SalesRollup.covers, SalesRollup.items_sold, SalesRollup.revenue_cents, SalesRollup.tax_cents, SalesRollup.cost_cents
+)
+
+
+def _sales_row(covers, items_sold, revenue, tax, cost, **extra) -> dict:
+    revenue, cost = revenue or 0, cost or 0
+    return {
+        **extra,
+        "covers": covers or 0,
+        "items_sold": items_sold or 0,
+        "revenue": from_cents(revenue),
+        "tax": from_cents(tax or 0),
+        "cost": from_cents(cost),
+        "margin": from_cents(revenue - cost),
+    }
+
+
+def get_sales(db: Session, start: datetime, end: datetime, grain: str = "day") -> dict:
+    """Totals over [start, end) plus one row per bucket of the given grain"""
+    totals = db.query(*(func.sum(column) for column in _SALES_COLUMNS)).filter(
+        rollup_filter(SalesRollup, start, end)
+    ).one()
+    buckets = (
+        db.query(SalesRollup.bucket, *_SALES_COLUMNS)
+        .filter(
+            SalesRollup.grain == grain,
+            SalesRollup.bucket >= bucket_start(start, grain),
+            SalesRollup.bucket < end,
+        )
+        .order_by(SalesRollup.bucket)
+    )
+    return {
+        "start": start,
+        "end": end,
+        "grain": grain,
+        "totals": _sales_row(*totals),
+        "buckets": [_sales_row(*row[1:], bucket=row[0]) for row in buckets],
+    }
+
+
+def get_item_sales(db: Session, start: datetime, end: datetime, category_id: int = None) -> List[dict]:
+    """Quantity, revenue, cost and margin per menu item over [start, end), best sellers first"""
+    # Aggregate the rollup rows first, then join the handful of totals to the menu
+    sold = select(
+        ItemSalesRollup.menu_item_id,
+        func.sum(ItemSalesRollup.quantity).label("quantity"),
+        func.sum(ItemSalesRollup.revenue_cents).label("revenue"),
+        func.sum(ItemSalesRollup.cost_cents).label("cost"),
+    ).where(rollup_filter(ItemSalesRollup, start, end))
+    if category_id is not None:
+        sold = sold.where(
+            ItemSalesRollup.menu_item_id.in_(select(MenuItem.id).where(MenuItem.category_id == category_id))
+        )
+    sold = sold.group_by(ItemSalesRollup.menu_item_id).subquery()
+    query = db.execute(
+        select(MenuItem.id, MenuItem.name, MenuItem.category_id, sold.c.quantity, sold.c.revenue, sold.c.cost)
+        .join(sold, sold.c.menu_item_id == MenuItem.id)
+        .order_by(sold.c.revenue.desc())
+    )
+    return [
+        {
+            "menu_item_id": menu_item_id,
+            "name": name,
+            "category_id": item_category_id,
+            "quantity": quantity,
+            "revenue": from_cents(item_revenue),
+            "cost": from_cents(cost),
+            "margin": from_cents(item_revenue - cost),
+        }
+        for menu_item_id, name, item_category_id, quantity, item_revenue, cost in query
+        if quantity
+    ]
+
+
+def get_payment_mix(db: Session, start: datetime, end: datetime) -> List[dict]:
+    """Payments and amount per payment method over [start, end), with each method's share"""
+    rows = (
+        db.query(PaymentRollup.payment_method, func.sum(PaymentRollup.payments), func.sum(PaymentRollup.amount_cents))
+        .filter(rollup_filter(PaymentRollup, start, end))
+        .group_by(PaymentRollup.payment_method)
+        .all()
+    )
+    total = sum(amount for _, _, amount in rows)
+    return sorted(
+        (
+            {
+                "payment_method": method,
+                "payments": payments,
+                "amount": from_cents(amount),
+                "share": round(amount / total, 4) if total else 0.0,
+            }
+            for method, payments, amount in rows
+            if payments
+        ),
+        key=lambda row: row["amount"],
+        reverse=True,
+    )
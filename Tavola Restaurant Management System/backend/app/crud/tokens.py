@@ -0,0 +1,132 @@
+"""Access and refresh tokens.
+
+Login issues a short-lived access token (ACCESS_TOKEN_EXPIRE_MINUTES) and
+an opaque refresh token (REFRESH_TOKEN_EXPIRE_DAYS), stored hashed in
+refresh_token together with the id (jti) of the access token issued with
+it. Each refresh rotates the refresh token. Presenting an already rotated
+token revokes its whole family, since only a copy of it can still be in use.
+
+Revoking access tokens writes RevokedToken rows and, once the transaction
+commits, adds them to this worker's in-memory list (core.revocation).
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.revocation import revoked_tokens
+from app.core.security import create_access_token, permission_claims
+from app.db.models.user import RefreshToken, RevokedToken, User
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+# Session.info key: (jti, expires_at) pairs revoked in the open transaction
+_REVOKED = "revoked_access_tokens"
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_tokens(db: Session, user: User, family: str = None) -> dict:
+    """Create an access token and a refresh token for user; commits"""
+    jti = uuid.uuid4().hex
+    access_ttl = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    now = datetime.utcnow()
+    refresh_token = secrets.token_urlsafe(32)
+    if settings.JWT_PERMISSION_CLAIMS:
+        claims = permission_claims(db, user.username)
+    else:
+        claims = {"sub": user.username}
+    db.add(RefreshToken(
+        user_id=user.id,
+        token_hash=_digest(refresh_token),
+        family=family or uuid.uuid4().hex,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        access_jti=jti,
+        access_expires_at=now + access_ttl,
+    ))
+    db.commit()
+    return {
+        "access_token": create_access_token(data={**claims, "jti": jti}, expires_delta=access_ttl),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": int(access_ttl.total_seconds()),
+    }
+
+
+def rotate_refresh_token(db: Session, refresh_token: str) -> Optional[dict]:
+    """Exchange a refresh token for a new pair; None if it is unknown, expired, reused or the user is inactive"""
+    row = db.query(RefreshToken).filter(RefreshToken.token_hash == _digest(refresh_token)).first()
+    if row is None:
+        return None
+    now = datetime.utcnow()
+    # Guarded so that of two concurrent refreshes with one token, one wins
+    rotated = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: now}, synchronize_session=False)
+    )
+    if not rotated:
+        revoke_family(db, row.family)
+        db.commit()
+        return None
+    user = db.get(User, row.user_id)
+    if row.expires_at <= now or user is None or user.is_active is False:
+        db.commit()
+        return None
+    return issue_tokens(db, user, family=row.family)
+
+
+def _revoke_access(db: Session, tokens: Iterable[Tuple[str, datetime]]) -> None:
+    now = datetime.utcnow()
+    rows = [{"jti": jti, "expires_at": expires_at} for jti, expires_at in tokens if expires_at > now]
+    if not rows:
+        return
+    stmt = _INSERTS[db.get_bind().dialect.name](RevokedToken).values(rows)
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["jti"]))
+    db.info.setdefault(_REVOKED, []).extend((row["jti"], row["expires_at"]) for row in rows)
+
+
+def _revoke_where(db: Session, *criteria) -> None:
+    rows = db.query(RefreshToken.access_jti, RefreshToken.access_expires_at).filter(*criteria).all()
+    _revoke_access(db, rows)
+    db.query(RefreshToken).filter(*criteria, RefreshToken.revoked_at.is_(None)).update(
+        {RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False
+    )
+
+
+def revoke_family(db: Session, family: str) -> None:
+    """Revoke every refresh token in a family and the access tokens issued with them. Does not commit."""
+    _revoke_where(db, RefreshToken.family == family)
+
+
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """Revoke all of a user's refresh and access tokens. Does not commit."""
+    _revoke_where(db, RefreshToken.user_id == user_id)
+
+
+def logout(db: Session, jti: str, expires_at: datetime) -> None:
+    """Revoke an access token and the refresh token family it was issued with"""
+    family = db.query(RefreshToken.family).filter(RefreshToken.access_jti == jti).scalar()
+    if family is not None:
+        revoke_family(db, family)
+    _revoke_access(db, [(jti, expires_at)])
+    db.commit()
+
+
+@event.listens_for(Session, "after_commit")
+def _mirror_revoked(session: Session) -> None:
+    revoked = session.info.pop(_REVOKED, None)
+    if revoked:
+        revoked_tokens.add(revoked)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_revoked(session: Session) -> None:
+    session.info.pop(_REVOKED, None)
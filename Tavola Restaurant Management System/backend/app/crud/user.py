@@ -1,7 +1,11 @@
 from sqlalchemy.orm import Session
-from app.db.models.user import User, Role, Permission
+from app.db.models.user import User, Role, Permission, RoleVersion, RefreshToken, role_permission
 from app.schemas.user import UserCreate, UserUpdate, RoleCreate, PermissionCreate
-from app.core.security import get_password_hash, verify_password
+from app.crud import tokens
+from app.crud.pagination import DEFAULT_PAGE_SIZE, keyset, make_page
+from app.core.config import settings
+from app.core.passwords import verify_and_update
+from app.core.security import get_password_hash, invalidate_principal, invalidate_role_versions, invalidate_user_state
 
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
@@ -12,8 +16,9 @@ def get_user_by_username(db: Session, username: str):
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None, columns=None):
+    query = db.query(*columns) if columns else db.query(User)
+    return make_page(keyset(query, User, limit, cursor).all(), limit)
 
 def create_user(db: Session, user: UserCreate):
     # Determine role: use provided role_id or fallback to a default role named 'user'
@@ -45,25 +50,67 @@ def create_user(db: Session, user: UserCreate):
 def update_user(db: Session, user_id: int, user: UserUpdate):
     db_user = get_user(db, user_id)
     if db_user:
+        old_username = db_user.username
+        was_active = db_user.is_active is not False
         for key, value in user.dict(exclude_unset=True).items():
             setattr(db_user, key, value)
+        if was_active and db_user.is_active is False:
+            # Deactivation ends every session now rather than at token expiry
+            tokens.revoke_user_tokens(db, db_user.id)
         db.commit()
         db.refresh(db_user)
+        invalidate_principal(old_username)
+        invalidate_principal(db_user.username)
+        invalidate_user_state(db_user.id)
     return db_user
 
 def delete_user(db: Session, user_id: int):
     db_user = get_user(db, user_id)
     if db_user:
+        tokens.revoke_user_tokens(db, db_user.id)
+        db.query(RefreshToken).filter(RefreshToken.user_id == db_user.id).delete(synchronize_session=False)
         db.delete(db_user)
         db.commit()
+        invalidate_principal(db_user.username)
+        invalidate_user_state(db_user.id)
     return db_user
 
 def authenticate_user(db: Session, username: str, password: str):
     user = get_user_by_username(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+    if not user:
         return None
+    valid, new_hash = verify_and_update(password, user.hashed_password, settings.BCRYPT_ROUNDS)
+    if not valid:
+        return None
+    if new_hash:
+        set_password_hash(db, user.id, new_hash)
     return user
 
+def set_password_hash(db: Session, user_id: int, hashed_password: str):
+    """Store a rehashed password; the user's permissions are unchanged, so cached principals stay valid"""
+    db.query(User).filter(User.id == user_id).update(
+        {User.hashed_password: hashed_password}, synchronize_session=False
+    )
+    db.commit()
+
+def bump_role_versions(db: Session, role_ids):
+    """Increment the version of each role so tokens issued before the change are rejected.
+
+    Does not commit; call it inside the transaction that changes the role.
+    """
+    role_ids = set(role_ids)
+    if not role_ids:
+        return
+    existing = {
+        rid for (rid,) in db.query(RoleVersion.role_id).filter(RoleVersion.role_id.in_(role_ids))
+    }
+    if existing:
+        db.query(RoleVersion).filter(RoleVersion.role_id.in_(existing)).update(
+            {RoleVersion.version: RoleVersion.version + 1}, synchronize_session=False
+        )
+    for rid in role_ids - existing:
+        db.add(RoleVersion(role_id=rid, version=2))
+
 def get_roles(db: Session):
     return db.query(Role).all()
 
@@ -93,19 +140,25 @@ def update_role(db: Session, role_id: int, role: RoleCreate):
     if db_role:
         db_role.name = role.name
         db_role.description = role.description
+        bump_role_versions(db, [role_id])
         db.commit()
         db.refresh(db_role)
+        invalidate_principal()
+        invalidate_role_versions()
     return db_role
 
 def delete_role(db: Session, role_id: int):
     db_role = get_role(db, role_id)
     if db_role:
         db.delete(db_role)
+        bump_role_versions(db, [role_id])
         db.commit()
+        invalidate_principal()
+        invalidate_role_versions()
     return db_role
 
-def get_permissions(db: Session):
-    return db.query(Permission).all()
+def get_permissions(db: Session, columns=None):
+    return (db.query(*columns) if columns else db.query(Permission)).all()
 
 def get_permission(db: Session, permission_id: int):
     return db.query(Permission).filter(Permission.id == permission_id).first()
@@ -123,8 +176,16 @@ def create_permission(db: Session, permission: PermissionCreate):
 def delete_permission(db: Session, permission_id: int):
     db_permission = get_permission(db, permission_id)
     if db_permission:
+        role_ids = [
+            rid for (rid,) in db.query(role_permission.c.role_id).filter(
+                role_permission.c.permission_id == permission_id
+            )
+        ]
         db.delete(db_permission)
+        bump_role_versions(db, role_ids)
         db.commit()
+        invalidate_principal()
+        invalidate_role_versions()
     return db_permission
 
 def assign_permission_to_role(db: Session, role_id: int, permission_id: int):
@@ -134,6 +195,9 @@ def assign_permission_to_role(db: Session, role_id: int, permission_id: int):
     if role and permission:
         if permission not in role.permissions:
             role.permissions.append(permission)
+            bump_role_versions(db, [role_id])
             db.commit()
+            invalidate_principal()
+            invalidate_role_versions()
         return role
     return None
@@ -0,0 +1,29 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from ..core.config import settings
+from .session import TimedAsyncAdaptedQueuePool, engine_options, set_sqlite_pragmas
+
+ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DATABASE_URI
+
+if ":memory:" in ASYNC_SQLALCHEMY_DATABASE_URL:
+    async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+else:
+    async_engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **engine_options(ASYNC_SQLALCHEMY_DATABASE_URL),
+    )
+
+if "sqlite" in ASYNC_SQLALCHEMY_DATABASE_URL:
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+
+# Objects stay usable after commit; lazy loads are not available on an
+# AsyncSession, so the async CRUD layer eager-loads what responses need.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,13 +1,17 @@
 from .base import BaseModel
-from .user import User, Role, Permission, Employee, Attendance, Leave
-from .menu import MenuCategory, MenuItem, Ingredient, MenuItemIngredient, StockMovement
+from .user import User, Role, Permission, RoleVersion, RefreshToken, RevokedToken, Employee, Attendance, Leave
+from .menu import MenuCategory, MenuItem, Ingredient, MenuItemIngredient, StockMovement, StockSnapshot, StockAlert
 from .order import Table, Order, OrderItem, Payment, Reservation
+from .report import SalesRollup, ItemSalesRollup, PaymentRollup
 
 __all__ = [
     "BaseModel",
     "User",
     "Role",
     "Permission",
+    "RoleVersion",
+    "RefreshToken",
+    "RevokedToken",
     "Employee",
     "Attendance",
     "Leave",
@@ -16,9 +20,14 @@ __all__ = [
     "Ingredient",
     "MenuItemIngredient",
     "StockMovement",
+    "StockSnapshot",
+    "StockAlert",
     "Table",
     "Order",
     "OrderItem",
     "Payment",
     "Reservation",
+    "SalesRollup",
+    "ItemSalesRollup",
+    "PaymentRollup",
 ]
@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, DateTime, func
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 
 @as_declarative()
 class BaseModel:
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    # Set in Python rather than with func.now(): SQLite's CURRENT_TIMESTAMP is
+    # second-precision text that does not compare equal to bound datetimes,
+    # which breaks keyset pagination on (created_at, id)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     @declared_attr
     def __tablename__(cls):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Boolean, Index, UniqueConstraint, DateTime
 from sqlalchemy.orm import relationship
 
 from .base import BaseModel
@@ -34,6 +34,7 @@ class MenuItem(BaseModel):
 
 class Ingredient(BaseModel):
     __tablename__ = "ingredient"
+    __table_args__ = (Index("ix_ingredient_created_at_id", "created_at", "id"),)  # keyset pagination
     
     name = Column(String, unique=True, index=True, nullable=False)
     description = Column(String)
@@ -48,9 +49,12 @@ class Ingredient(BaseModel):
 
 class MenuItemIngredient(BaseModel):
     __tablename__ = "menu_item_ingredient"
+    # The inherited id is the only primary key column: a composite key with
+    # id in it cannot autoincrement, so recipe rows could not be inserted
+    __table_args__ = (UniqueConstraint("menu_item_id", "ingredient_id"),)
     
-    menu_item_id = Column(Integer, ForeignKey("menu_item.id"), primary_key=True)
-    ingredient_id = Column(Integer, ForeignKey("ingredient.id"), primary_key=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_item.id"), nullable=False)
+    ingredient_id = Column(Integer, ForeignKey("ingredient.id"), nullable=False)
     quantity = Column(Float, nullable=False)  # Amount of ingredient needed
     
     # Relationships
@@ -59,6 +63,12 @@ class MenuItemIngredient(BaseModel):
 
 class StockMovement(BaseModel):
     __tablename__ = "stock_movement"
+    __table_args__ = (
+        Index("ix_stock_movement_created_at_id", "created_at", "id"),  # keyset pagination
+        # Per-ingredient history: filtered keyset pages and point-in-time replay
+        Index("ix_stock_movement_ingredient_created_at_id", "ingredient_id", "created_at", "id"),
+        Index("ix_stock_movement_reference", "reference_id", "movement_type"),
+    )
     
     MOVEMENT_TYPES = ["purchase", "consumption", "adjustment", "waste"]
     
@@ -70,3 +80,33 @@ class StockMovement(BaseModel):
     
     # Relationships
     ingredient = relationship("Ingredient", back_populates="stock_movements")
+
+class StockSnapshot(BaseModel):
+    """Stock of every ingredient at a checkpoint.
+
+    Stock at any time is the latest checkpoint before it plus the movements
+    since, so point-in-time queries only replay a short stretch of the log.
+    """
+    __tablename__ = "stock_snapshot"
+    __table_args__ = (UniqueConstraint("taken_at", "ingredient_id"),)
+    
+    ingredient_id = Column(Integer, ForeignKey("ingredient.id"), nullable=False)
+    taken_at = Column(DateTime, nullable=False)
+    balance = Column(Float, nullable=False)
+
+class StockAlert(BaseModel):
+    """An ingredient currently below one of its stock thresholds.
+
+    Maintained by crud.alerts as stock changes; a row exists only while the
+    ingredient is below threshold, so dashboards read this small table
+    instead of scanning every ingredient.
+    """
+    __tablename__ = "stock_alert"
+    
+    LEVELS = ["low", "critical"]  # below reorder_level / below min_stock_level
+    
+    ingredient_id = Column(Integer, ForeignKey("ingredient.id"), unique=True, nullable=False)
+    level = Column(String, nullable=False, index=True)
+    stock = Column(Float, nullable=False)  # stock when last evaluated
+    
+    ingredient = relationship("Ingredient")
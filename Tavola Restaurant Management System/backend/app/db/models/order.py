@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, DateTime, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, DateTime, Boolean, Index
+from sqlalchemy.orm import relationship, synonym
 from datetime import datetime
 
+from app.core.money import from_cents
+
 from .base import BaseModel
 
 class Table(BaseModel):
     __tablename__ = "table"
+    __table_args__ = (Index("ix_table_created_at_id", "created_at", "id"),)  # keyset pagination
     
     table_number = Column(String, unique=True, index=True, nullable=False)
     capacity = Column(Integer, nullable=False)
@@ -16,6 +19,7 @@ class Table(BaseModel):
 
 class Order(BaseModel):
     __tablename__ = "order"
+    __table_args__ = (Index("ix_order_created_at_id", "created_at", "id"),)  # keyset pagination
     
     ORDER_STATUSES = ["pending", "confirmed", "preparing", "ready", "served", "completed", "cancelled"]
     
@@ -24,6 +28,15 @@ class Order(BaseModel):
     order_type = Column(String, nullable=False)  # dine-in, takeaway, delivery
     notes = Column(String)
     
+    # Totals over non-cancelled items, in cents, maintained incrementally by crud.order
+    subtotal_cents = Column(Integer, nullable=False, default=0)
+    tax_cents = Column(Integer, nullable=False, default=0)
+    total_cents = Column(Integer, nullable=False, default=0)
+    # Running total of completed payments, in cents, maintained by crud.order
+    amount_paid_cents = Column(Integer, nullable=False, default=0)
+    # When the order was paid in full; its sales are reported in this hour (crud.reports)
+    paid_at = Column(DateTime, nullable=True)
+    
     # Foreign Keys
     table_id = Column(Integer, ForeignKey("table.id"), nullable=True)  # Null for takeaway/delivery
     waiter_id = Column(Integer, ForeignKey("user.id"), nullable=True)
@@ -35,16 +48,23 @@ class Order(BaseModel):
     
     @property
     def subtotal(self):
-        return sum(item.subtotal for item in self.items)
+        return from_cents(self.subtotal_cents or 0)
     
     @property
     def tax_amount(self):
-        # Assuming 10% tax for example
-        return self.subtotal * 0.1
+        return from_cents(self.tax_cents or 0)
     
     @property
     def total_amount(self):
-        return self.subtotal + self.tax_amount
+        return from_cents(self.total_cents or 0)
+    
+    @property
+    def amount_paid(self):
+        return from_cents(self.amount_paid_cents or 0)
+    
+    @property
+    def balance_due(self):
+        return from_cents((self.total_cents or 0) - (self.amount_paid_cents or 0))
 
 class OrderItem(BaseModel):
     __tablename__ = "order_item"
@@ -54,33 +74,49 @@ class OrderItem(BaseModel):
     order_id = Column(Integer, ForeignKey("order.id"), nullable=False)
     menu_item_id = Column(Integer, ForeignKey("menu_item.id"), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
-    unit_price = Column(Float, nullable=False)
+    unit_price_cents = Column(Integer, nullable=False)  # menu price when ordered
     notes = Column(String)
+    special_instructions = synonym("notes")
     status = Column(String, default="pending", nullable=False)
     
     # Relationships
     order = relationship("Order", back_populates="items")
     menu_item = relationship("MenuItem")
     
+    @property
+    def unit_price(self):
+        return from_cents(self.unit_price_cents)
+    
     @property
     def subtotal(self):
-        return self.quantity * self.unit_price
+        return from_cents(self.quantity * self.unit_price_cents)
+    
+    @property
+    def item_total(self):
+        return self.subtotal
 
 class Payment(BaseModel):
     __tablename__ = "payment"
+    __table_args__ = (Index("ix_payment_created_at_id", "created_at", "id"),)  # keyset pagination
     
     PAYMENT_METHODS = ["cash", "credit_card", "debit_card", "mobile_payment"]
     PAYMENT_STATUSES = ["pending", "completed", "failed", "refunded"]
     
     order_id = Column(Integer, ForeignKey("order.id"), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount_cents = Column(Integer, nullable=False)
     payment_method = Column(String, nullable=False)
     status = Column(String, default="pending", nullable=False)
     transaction_id = Column(String, unique=True, nullable=True)
+    # Client-supplied Idempotency-Key; a retried request returns the original payment
+    idempotency_key = Column(String, unique=True, nullable=True)
     notes = Column(String)
     
     # Relationships
     order = relationship("Order", back_populates="payments")
+    
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
 
 class Reservation(BaseModel):
     __tablename__ = "reservation"
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from .base import BaseModel
+
+# Rollup rows are kept at two grains: "hour" buckets start on the hour,
+# "day" buckets at midnight (UTC, like every other timestamp here). Money is
+# kept in integer cents so the many small +/- updates add up exactly.
+ROLLUP_GRAINS = ("hour", "day")
+
+class SalesRollup(BaseModel):
+    """Settled orders per bucket, maintained by app.crud.reports"""
+    __tablename__ = "sales_rollup"
+    __table_args__ = (UniqueConstraint("grain", "bucket"),)
+
+    grain = Column(String, nullable=False)
+    bucket = Column(DateTime, nullable=False)
+    covers = Column(Integer, nullable=False, default=0)  # settled orders
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue_cents = Column(Integer, nullable=False, default=0)  # item subtotals, before tax
+    tax_cents = Column(Integer, nullable=False, default=0)  # Order.tax_cents as charged
+    cost_cents = Column(Integer, nullable=False, default=0)  # MenuItem.cost of the items sold
+
+class ItemSalesRollup(BaseModel):
+    """Items sold per menu item per bucket"""
+    __tablename__ = "item_sales_rollup"
+    __table_args__ = (UniqueConstraint("grain", "bucket", "menu_item_id"),)
+
+    grain = Column(String, nullable=False)
+    bucket = Column(DateTime, nullable=False)
+    menu_item_id = Column(Integer, ForeignKey("menu_item.id"), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue_cents = Column(Integer, nullable=False, default=0)
+    cost_cents = Column(Integer, nullable=False, default=0)
+
+    # Relationships
+    menu_item = relationship("MenuItem")
+
+class PaymentRollup(BaseModel):
+    """Completed payments per payment method per bucket"""
+    __tablename__ = "payment_rollup"
+    __table_args__ = (UniqueConstraint("grain", "bucket", "payment_method"),)
+
+    grain = Column(String, nullable=False)
+    bucket = Column(DateTime, nullable=False)
+    payment_method = Column(String, nullable=False)
+    payments = Column(Integer, nullable=False, default=0)
+    amount_cents = Column(Integer, nullable=False, default=0)
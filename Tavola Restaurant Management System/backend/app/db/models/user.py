@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Table
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -31,8 +31,18 @@ class Role(BaseModel):
     permissions = relationship("Permission", secondary=role_permission, back_populates="roles")
     users = relationship("User", back_populates="role")
 
+class RoleVersion(BaseModel):
+    __tablename__ = "role_version"
+    
+    # Bumped whenever a role or its permissions change; tokens carrying an
+    # older version are rejected. Not a foreign key so deleted roles keep
+    # their last version.
+    role_id = Column(Integer, unique=True, index=True, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+
 class User(BaseModel):
     __tablename__ = "user"
+    __table_args__ = (Index("ix_user_created_at_id", "created_at", "id"),)  # keyset pagination
     
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -50,6 +60,28 @@ class User(BaseModel):
     def __repr__(self):
         return f"<User {self.username}>"
 
+class RefreshToken(BaseModel):
+    __tablename__ = "refresh_token"
+    
+    # One row per issued refresh token. Refreshing rotates it: the row is
+    # revoked and replaced by a new one in the same family, so presenting a
+    # revoked token again means it leaked and the whole family is revoked.
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), index=True, nullable=False)
+    token_hash = Column(String, unique=True, index=True, nullable=False)  # sha256 of the token
+    family = Column(String, index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    # The access token issued alongside, revoked with this row
+    access_jti = Column(String, nullable=False)
+    access_expires_at = Column(DateTime, nullable=False)
+
+class RevokedToken(BaseModel):
+    __tablename__ = "revoked_token"
+    
+    # Access token ids revoked before they expire; rows past expires_at are pruned
+    jti = Column(String, unique=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+
 class Employee(BaseModel):
     __tablename__ = "employee"
     
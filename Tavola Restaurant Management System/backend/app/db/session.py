@@ -1,27 +1,102 @@
-from sqlalchemy import create_engine
+import time
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.requests import HTTPConnection
+from ..core import metrics
 from ..core.config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URI
 
+pool_checkout_wait = metrics.histogram("db_pool_checkout_wait_seconds")
+
+
+class _TimedCheckoutMixin:
+    """Records how long callers wait for a pooled connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str) -> dict:
+    """Pool configuration shared by the sync and async engines"""
+    if ":memory:" in url:
+        # In-memory SQLite uses a per-thread pool; sizing does not apply
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if "sqlite" not in url:
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply WAL and cache tuning to every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    # busy_timeout first so switching to WAL waits out concurrent openers
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+
 # SQLite specific configuration
 if "sqlite" in SQLALCHEMY_DATABASE_URL:
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL, 
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        poolclass=None if ":memory:" in SQLALCHEMY_DATABASE_URL else TimedQueuePool,
+        **engine_options(SQLALCHEMY_DATABASE_URL),
     )
+    event.listen(engine, "connect", set_sqlite_pragmas)
 else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=TimedQueuePool,
+        **engine_options(SQLALCHEMY_DATABASE_URL),
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
-    """Dependency for getting database session"""
+# ASGI scope key of the per-request context set by app.core.middleware
+REQUEST_CONTEXT = "tavola.context"
+
+async def get_db(connection: HTTPConnection):
+    """Dependency for getting database session.
+
+    Behind RequestContextMiddleware this is the request's own session,
+    created on first use and closed by the middleware once the response is
+    sent. An async generator runs on the event loop, so resolving it costs
+    no threadpool round trip.
+    """
+    context = connection.scope.get(REQUEST_CONTEXT)
+    if context is not None:
+        yield context.db
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
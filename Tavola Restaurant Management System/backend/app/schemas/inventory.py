@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
 class SupplierResponse(BaseModel):
     id: int
@@ -45,3 +45,51 @@ class StockMovementResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class StockMovementRowError(BaseModel):
+    row: int
+    detail: str
+
+class StockMovementBatchResponse(BaseModel):
+    received: int
+    inserted: int
+    errors: list[StockMovementRowError] = []
+
+class StockLevelResponse(BaseModel):
+    ingredient_id: int
+    stock: float
+
+class StockSnapshotResponse(BaseModel):
+    taken_at: datetime
+    ingredients: int
+
+class StockAlertResponse(BaseModel):
+    ingredient_id: int
+    level: str
+    stock: float
+    ingredient: InventoryItemResponse
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class IngredientForecastResponse(BaseModel):
+    ingredient_id: int
+    name: str
+    unit: Optional[str] = None
+    current_stock: float
+    committed: float
+    daily_usage: float
+    suggested_reorder: float
+    stockout_date: Optional[date] = None
+
+    class Config:
+        from_attributes = True
+
+class ForecastResponse(BaseModel):
+    generated_at: datetime
+    items: list[IngredientForecastResponse]
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from decimal import Decimal
 
 class TableResponse(BaseModel):
     id: int
@@ -22,10 +23,17 @@ class OrderItemCreate(BaseModel):
     quantity: int
     special_instructions: Optional[str] = None
 
+class OrderItemUpdate(BaseModel):
+    quantity: Optional[int] = None
+    status: Optional[str] = None
+    special_instructions: Optional[str] = None
+
 class OrderItemResponse(BaseModel):
     id: int
     menu_item_id: int
     quantity: int
+    unit_price: float
+    status: str = "pending"
     special_instructions: Optional[str] = None
     item_total: float
 
@@ -44,6 +52,8 @@ class OrderResponse(BaseModel):
     order_type: str
     status: str = "pending"
     items: List[OrderItemResponse] = []
+    subtotal: float = 0.0
+    tax_amount: float = 0.0
     total_amount: float
     created_at: datetime
 
@@ -53,9 +63,30 @@ class OrderResponse(BaseModel):
 class OrderStatusUpdate(BaseModel):
     status: str
 
+class InvoiceResponse(BaseModel):
+    order_id: int
+    order_number: str
+    items: List[OrderItemResponse] = []
+    subtotal: float
+    tax_amount: float
+    total_amount: float
+    amount_paid: float = 0.0
+    balance_due: float
+
+class OrderTotalsCheck(BaseModel):
+    checked: int
+    mismatched: List[int] = []
+    fixed: bool = False
+
+class PaymentReconciliation(BaseModel):
+    checked: int
+    mismatched: List[int] = []
+    fixed: bool = False
+
 class PaymentCreate(BaseModel):
     order_id: int
-    amount: float
+    # Exact to the cent; may be less than the balance due (partial or split payment)
+    amount: Decimal = Field(gt=0, max_digits=12, decimal_places=2)
     payment_method: str
     transaction_id: Optional[str] = None
 
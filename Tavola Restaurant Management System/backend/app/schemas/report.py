@@ -0,0 +1,71 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class SalesBucket(BaseModel):
+    bucket: Optional[datetime] = None
+    covers: int
+    items_sold: int
+    revenue: float
+    tax: float
+    cost: float
+    margin: float
+
+class SalesReportResponse(BaseModel):
+    start: datetime
+    end: datetime
+    grain: str
+    totals: SalesBucket
+    buckets: list[SalesBucket] = []
+
+class ItemSalesResponse(BaseModel):
+    menu_item_id: int
+    name: str
+    category_id: int
+    quantity: int
+    revenue: float
+    cost: float
+    margin: float
+
+class PaymentMixResponse(BaseModel):
+    payment_method: str
+    payments: int
+    amount: float
+    share: float
+
+class RollupBackfillResponse(BaseModel):
+    sales_rollup: int
+    item_sales_rollup: int
+    payment_rollup: int
+
+class ItemClassificationResponse(BaseModel):
+    menu_item_id: int
+    name: str
+    category_id: int
+    quantity: int
+    popularity: float
+    unit_margin: float
+    total_margin: float
+    classification: str
+
+    class Config:
+        from_attributes = True
+
+class CategoryThresholdsResponse(BaseModel):
+    category_id: int
+    items: int
+    items_sold: int
+    popularity_threshold: float
+    margin_threshold: float
+
+    class Config:
+        from_attributes = True
+
+class MenuEngineeringResponse(BaseModel):
+    start: datetime
+    end: datetime
+    items: list[ItemClassificationResponse]
+    categories: list[CategoryThresholdsResponse]
+
+    class Config:
+        from_attributes = True
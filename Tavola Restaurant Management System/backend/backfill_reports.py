@@ -0,0 +1,34 @@
+"""Rebuild the sales report rollups from orders and payments.
+
+Usage (from the backend directory):
+    python backfill_reports.py [--since 2024-01-01]
+
+Run it once after upgrading, to report on history recorded before the
+rollups existed, or after bulk-editing orders or payments. Without --since
+every rollup row is rebuilt; with it, only days from that date on.
+"""
+import argparse
+from datetime import datetime
+
+from app.crud.reports import backfill_rollups
+from app.db import models
+from app.db.session import engine, SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    models.BaseModel.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        written = backfill_rollups(db, args.since)
+    finally:
+        db.close()
+    for table, rows in written.items():
+        print(f"{table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare requests/sec of the sync and async restaurant routers.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_async_vs_sync [--requests 2000] [--concurrency 20]
+
+Runs against a throwaway database seeded with menu items; both apps are
+driven in-process through httpx's ASGI transport. Set DATABASE_URI to a
+Postgres URL to compare psycopg2 against asyncpg; on SQLite the async path
+goes through aiosqlite's worker thread and is not expected to win.
+
+Keep --concurrency at or below DB_POOL_SIZE + DB_MAX_OVERFLOW for the sync
+run: a sync session keeps its connection while response validation and
+get_db's teardown wait for a threadpool worker, so with more requests in
+flight than connections every worker can end up blocked on the pool.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+from fastapi import FastAPI
+
+from app.db import models
+from app.db.session import engine, SessionLocal
+from app.api.v1.endpoints.restaurant import router as sync_router
+from app.api.v1.async_endpoints.restaurant import router as async_router
+from app.db.async_session import async_engine
+
+
+def seed(items: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    category = models.MenuCategory(name="Bench")
+    db.add(category)
+    db.flush()
+    db.add_all(
+        models.MenuItem(name=f"Item {i}", price=10.0, cost=4.0, category_id=category.id)
+        for i in range(items)
+    )
+    db.commit()
+    db.close()
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        await one()  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--items", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.items)
+    asyncio.run(compare(args.requests, args.concurrency))
+
+
+async def compare(requests: int, concurrency: int) -> None:
+    for label, router in (("sync", sync_router), ("async", async_router)):
+        app = FastAPI()
+        app.include_router(router)
+        for path in ("/restaurant/items", "/restaurant/items/1"):
+            rps = await run(app, path, requests, concurrency)
+            print(f"{label:5} {path:22} {rps:10.1f} req/s")
+    # aiosqlite connections run on non-daemon threads
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time the ingredient forecast over a large ingredient catalogue.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_forecast [--ingredients 2000]
+
+Seeds a throwaway database with --ingredients ingredients and one
+consumption movement per ingredient per day of the lookback window. Then
+it times a cold forecast (queries plus the NumPy pass), a cached read, and
+the array pass on its own.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import numpy as np
+
+from app.core.config import settings
+from app.crud import forecast as crud_forecast
+from app.db import models
+from app.db.session import engine, SessionLocal
+
+
+def seed(ingredients: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            models.Ingredient.__table__.insert(),
+            [{"name": f"Ingredient {i}", "unit": "kg", "current_stock": 100.0, "reorder_level": 10.0} for i in range(ingredients)],
+        )
+        for day in range(1, settings.FORECAST_LOOKBACK_DAYS + 1):
+            conn.execute(
+                models.StockMovement.__table__.insert(),
+                [
+                    {
+                        "ingredient_id": i + 1,
+                        "quantity": -float(1 + (i + day) % 5),
+                        "movement_type": "consumption",
+                        "created_at": now - timedelta(days=day),
+                    }
+                    for i in range(ingredients)
+                ],
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ingredients", type=int, default=2000)
+    args = parser.parse_args()
+
+    seed(args.ingredients)
+    db = SessionLocal()
+    start = time.perf_counter()
+    forecast = crud_forecast.get_forecast(db)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    crud_forecast.get_forecast(db)
+    cached = time.perf_counter() - start
+    db.close()
+
+    days = settings.FORECAST_LOOKBACK_DAYS
+    usage = np.random.default_rng(1).random((args.ingredients, days))
+    weekdays = np.arange(days) % 7
+    future = np.arange(settings.FORECAST_HORIZON_DAYS) % 7
+    start = time.perf_counter()
+    crud_forecast.seasonal_forecast(usage, weekdays, future, settings.FORECAST_SMOOTHING)
+    array_pass = time.perf_counter() - start
+
+    print(f"{len(forecast.items)} ingredients x {days} days")
+    print(f"cold forecast: {cold * 1000:8.1f} ms")
+    print(f"cached read:   {cached * 1000:8.3f} ms")
+    print(f"array pass:    {array_pass * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare OFFSET and keyset page latency deep into the stock movement log.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_keyset_pagination [--rows 1000000] [--page-size 100]
+
+Seeds a throwaway database with --rows stock movements, then times fetching
+one page at increasing depths with OFFSET/LIMIT and with the keyset cursor
+used by the list endpoints.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from app.db import models
+from app.db.session import engine, SessionLocal
+from app.crud import inventory as crud_inventory
+from app.crud.pagination import encode_cursor
+
+BATCH = 50_000
+
+
+def seed(rows: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.Ingredient.__table__.insert(), [{"name": "Flour", "unit": "kg"}])
+        table = models.StockMovement.__table__
+        for offset in range(0, rows, BATCH):
+            conn.execute(
+                table.insert(),
+                [
+                    {
+                        "ingredient_id": 1,
+                        "quantity": 1.0,
+                        "movement_type": "purchase",
+                        "created_at": start + timedelta(seconds=n // 3),
+                    }
+                    for n in range(offset, min(offset + BATCH, rows))
+                ],
+            )
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    db = SessionLocal()
+    print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+    for depth in (0, args.rows // 100, args.rows // 10, args.rows // 2, args.rows - args.page_size):
+        anchor = (
+            db.query(models.StockMovement.created_at, models.StockMovement.id)
+            .order_by(models.StockMovement.created_at, models.StockMovement.id)
+            .offset(depth)
+            .first()
+        )
+        cursor = encode_cursor(*anchor)
+
+        def by_offset():
+            (
+                db.query(models.StockMovement)
+                .order_by(models.StockMovement.created_at, models.StockMovement.id)
+                .offset(depth)
+                .limit(args.page_size)
+                .all()
+            )
+            db.expunge_all()
+
+        def by_keyset():
+            crud_inventory.get_stock_movements(db, limit=args.page_size, cursor=cursor)
+            db.expunge_all()
+
+        print(f"{depth:>10} {timed(by_offset):>10.2f} {timed(by_keyset):>10.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
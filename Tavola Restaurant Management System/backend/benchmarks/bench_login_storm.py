@@ -0,0 +1,150 @@
+"""Shift-change login storm: latency of other endpoints while many staff log in.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_login_storm [--logins 60] [--probes 4] [--workers 2]
+
+Seeds a throwaway database with --logins users, then serves the app with
+uvicorn in a subprocess twice: once hashing on the threadpool
+(PASSWORD_HASH_WORKERS=0, the old login path) and once on a hashing pool of
+--workers processes. Each run measures GET /restaurant/items and /health
+from --probes concurrent clients, first idle and then while every user logs
+in at once, and reports p50/p99 for those probes and for the logins.
+
+Hashes use BCRYPT_ROUNDS (default 12), so the storm is real bcrypt work.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+
+from app.core.passwords import context
+from app.core.config import settings
+from app.db import models
+from app.db.session import engine
+
+PORT = 8765
+BASE = f"http://127.0.0.1:{PORT}"
+PROBES = ("/api/v1/restaurant/items", "/health")
+
+
+def seed(users: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    hashed = context(settings.BCRYPT_ROUNDS).hash("secret")
+    with engine.begin() as conn:
+        conn.execute(models.Role.__table__.insert(), [{"name": "staff"}])
+        conn.execute(models.MenuCategory.__table__.insert(), [{"name": "Bench"}])
+        conn.execute(
+            models.MenuItem.__table__.insert(),
+            [{"name": f"Item {i}", "price": 10.0, "cost": 4.0, "category_id": 1} for i in range(50)],
+        )
+        conn.execute(
+            models.User.__table__.insert(),
+            [
+                {"username": f"staff{i}", "email": f"staff{i}@bench", "hashed_password": hashed, "role_id": 1}
+                for i in range(users)
+            ],
+        )
+
+
+def serve(workers: int) -> subprocess.Popen:
+    env = dict(os.environ, PASSWORD_HASH_WORKERS=str(workers), LOGIN_RATE_IP_BURST="100000")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(300):
+        try:
+            httpx.get(f"{BASE}/health")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def probe(stop: threading.Event, latencies: dict) -> None:
+    with httpx.Client(base_url=BASE, timeout=60) as client:
+        while not stop.is_set():
+            for path in PROBES:
+                start = time.perf_counter()
+                client.get(path).raise_for_status()
+                latencies[path].append(time.perf_counter() - start)
+
+
+def measure(probes: int, during=None, seconds: float = 2.0):
+    latencies = {path: [] for path in PROBES}
+    stop = threading.Event()
+    threads = [threading.Thread(target=probe, args=(stop, latencies)) for _ in range(probes)]
+    for thread in threads:
+        thread.start()
+    result = during() if during else time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, result
+
+
+def login(username: str):
+    start = time.perf_counter()
+    response = httpx.post(f"{BASE}/api/v1/auth/login", json={"username": username, "password": "secret"}, timeout=120)
+    return response.status_code, time.perf_counter() - start
+
+
+def storm(users: int):
+    with ThreadPoolExecutor(users) as executor:
+        return list(executor.map(login, [f"staff{i}" for i in range(users)]))
+
+
+def pct(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0] * 1000
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] * 1000
+
+
+def run(label: str, workers: int, users: int, probes: int) -> None:
+    server = serve(workers)
+    try:
+        login("staff0")  # warm up, and start the hashing pool
+        idle, _ = measure(probes)
+        busy, results = measure(probes, lambda: storm(users))
+    finally:
+        server.terminate()
+        server.wait()
+    times = [elapsed for _, elapsed in results]
+    failed = sum(status != 200 for status, _ in results)
+    print(f"{label}: {users} logins, {failed} failed, login p50 {pct(times, 50):.0f} ms, p99 {pct(times, 99):.0f} ms")
+    print(f"  {'endpoint':<28} {'idle p50':>9} {'idle p99':>9} {'storm p50':>10} {'storm p99':>10} {'storm n':>8}")
+    for path in PROBES:
+        print(
+            f"  {path:<28} {pct(idle[path], 50):>9.1f} {pct(idle[path], 99):>9.1f}"
+            f" {pct(busy[path], 50):>10.1f} {pct(busy[path], 99):>10.1f} {len(busy[path]):>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=60)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS or 2)
+    args = parser.parse_args()
+
+    seed(args.logins)
+    print(f"bcrypt cost {settings.BCRYPT_ROUNDS}, {os.cpu_count()} CPUs")
+    run("threadpool", 0, args.logins, args.probes)
+    run(f"pool of {args.workers}", args.workers, args.logins, args.probes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Count SQL statements and time for creating orders of increasing size.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_order_create [--repeat 50]
+
+Exits non-zero if a 30-line banquet order issues more statements than a
+one-line order.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from sqlalchemy import event
+
+from app.crud import order as crud_order
+from app.db import models
+from app.db.session import engine, SessionLocal
+from app.schemas.order import OrderCreate, OrderItemCreate
+
+LINES = (1, 10, 30)
+
+
+def seed() -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    category = models.MenuCategory(name="Bench")
+    db.add(category)
+    db.flush()
+    db.add_all(
+        models.MenuItem(name=f"Dish {i}", price=5.0 + i, cost=2.0, category_id=category.id)
+        for i in range(max(LINES))
+    )
+    db.commit()
+    db.close()
+
+
+def order_of(lines: int) -> OrderCreate:
+    return OrderCreate(
+        items=[OrderItemCreate(menu_item_id=i + 1, quantity=2) for i in range(lines)]
+    )
+
+
+def count_statements(lines: int) -> int:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        crud_order.create_order(db, order_of(lines))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        db.close()
+    return len(statements)
+
+
+def time_create(lines: int, repeat: int) -> float:
+    db = SessionLocal()
+    order = order_of(lines)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        crud_order.create_order(db, order)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    seed()
+    # Warm the menu catalog snapshot so its one-off rebuild is not counted
+    db = SessionLocal()
+    crud_order.create_order(db, order_of(1))
+    db.close()
+    counts = {}
+    for lines in LINES:
+        counts[lines] = count_statements(lines)
+        print(f"{lines:3} lines: {counts[lines]:2} statements, {time_create(lines, args.repeat):6.2f} ms/order")
+    if counts[max(LINES)] != counts[min(LINES)]:
+        print("statement count grows with the number of order lines")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
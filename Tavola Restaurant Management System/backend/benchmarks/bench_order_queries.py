@@ -0,0 +1,85 @@
+"""Count SQL statements issued by GET /restaurant/orders.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_order_queries [--items-per-order 5]
+
+Lists 10 and then 100 orders and exits non-zero if the number of
+statements grows with the number of orders (an N+1 regression).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db import models
+from app.db.session import engine, SessionLocal
+from app.api.v1.endpoints.restaurant import router
+
+
+def seed(orders: int, items_per_order: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    category = models.MenuCategory(name="Bench")
+    db.add(category)
+    db.flush()
+    menu_item = models.MenuItem(name="Dish", price=12.5, cost=4.0, category_id=category.id)
+    db.add(menu_item)
+    db.flush()
+    for n in range(orders):
+        order = models.Order(order_number=f"BENCH-{n}", order_type="dine_in")
+        db.add(order)
+        db.flush()
+        db.add_all(
+            models.OrderItem(order_id=order.id, menu_item_id=menu_item.id, quantity=2, unit_price_cents=1250)
+            for _ in range(items_per_order)
+        )
+    db.commit()
+    db.close()
+
+
+def count_statements(client: TestClient, limit: int) -> tuple[int, float]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        start = time.perf_counter()
+        response = client.get("/restaurant/orders", params={"limit": limit})
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    response.raise_for_status()
+    assert len(response.json()) == limit
+    return len(statements), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items-per-order", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(100, args.items_per_order)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    results = {limit: count_statements(client, limit) for limit in (10, 100)}
+    for limit, (statements, elapsed) in results.items():
+        print(f"{limit:4} orders: {statements:3} statements, {elapsed * 1000:7.1f} ms")
+    if results[10][0] != results[100][0]:
+        print("statement count grows with the number of orders")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Memory and time of list reads: ORM entities vs column projections.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_projections [--rows 100000] [--repeat 3]
+
+Seeds a throwaway database with --rows menu items, ingredients, tables and
+users, then reads each table through its crud list function twice:
+
+    orm         the default: full entities, built and tracked by the session,
+                then validated against the response schema and dumped to JSON
+    projection  columns=projection.columns: plain rows of the schema's
+                columns, zipped into dicts and dumped by pydantic-core
+
+Both paths must produce the same JSON (checked once per read).
+
+Each read uses a fresh session. The report gives the best time to load the
+rows and to load and serialize them, and the peak memory (tracemalloc) of
+a load, in a separate run so tracing does not skew the times.
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from main import init_db
+from app.api.v1.fast import Projection
+from app.api.v1.projections import INGREDIENT_PAGE, TABLE_PAGE, USER_PAGE, role_lookup
+from app.crud import inventory as crud_inventory
+from app.crud import menu as crud_menu
+from app.crud import order as crud_order
+from app.crud import user as crud_user
+from app.db import models
+from app.db.session import SessionLocal, engine
+from app.schemas.inventory import InventoryItemResponse
+from app.schemas.menu import MenuItemResponse
+from app.schemas.order import TableResponse
+from app.schemas.user import UserResponse
+
+MENU_ITEMS = Projection(MenuItemResponse, models.MenuItem)
+
+
+def seed(rows: int) -> None:
+    with engine.begin() as conn:
+        role_id = conn.execute(models.Role.__table__.select().where(models.Role.name == "admin")).first().id
+        conn.execute(models.MenuCategory.__table__.insert(), [{"name": "Bench"}])
+        conn.execute(
+            models.MenuItem.__table__.insert(),
+            [{"name": f"Item {i}", "price": 10.0, "cost": 4.0, "category_id": 1, "is_available": True} for i in range(rows)],
+        )
+        conn.execute(
+            models.Ingredient.__table__.insert(),
+            [
+                {"name": f"Ingredient {i}", "unit": "kg", "current_stock": i * 0.5, "min_stock_level": 2.0, "reorder_level": 5.0}
+                for i in range(rows)
+            ],
+        )
+        conn.execute(
+            models.Table.__table__.insert(),
+            [{"table_number": str(i), "capacity": 4, "status": "available"} for i in range(rows)],
+        )
+        conn.execute(
+            models.User.__table__.insert(),
+            [
+                {"username": f"user{i}", "email": f"user{i}@bench", "hashed_password": "x", "full_name": f"User {i}", "role_id": role_id}
+                for i in range(rows)
+            ],
+        )
+
+
+def cases(rows: int) -> dict:
+    """name -> (schema, orm load, projection load, projection -> JSON)"""
+    def users_json(page, db):
+        roles = role_lookup(crud_user.get_roles(db))
+        return to_json(USER_PAGE.dicts(page.items, role=lambda row: roles.get(row.role_id)))
+
+    return {
+        "menu.get_items": (
+            MenuItemResponse,
+            lambda db: crud_menu.get_items(db),
+            lambda db: crud_menu.get_items(db, columns=MENU_ITEMS.columns),
+            lambda loaded, db: to_json(MENU_ITEMS.dicts(loaded)),
+        ),
+        "inventory.get_ingredients": (
+            InventoryItemResponse,
+            lambda db: crud_inventory.get_ingredients(db, rows).items,
+            lambda db: crud_inventory.get_ingredients(db, rows, columns=INGREDIENT_PAGE.columns),
+            lambda page, db: to_json(INGREDIENT_PAGE.dicts(page.items)),
+        ),
+        "order.get_tables": (
+            TableResponse,
+            lambda db: crud_order.get_tables(db, rows).items,
+            lambda db: crud_order.get_tables(db, rows, columns=TABLE_PAGE.columns),
+            lambda page, db: to_json(TABLE_PAGE.dicts(page.items)),
+        ),
+        "user.get_users": (
+            UserResponse,
+            lambda db: crud_user.get_users(db, rows).items,
+            lambda db: crud_user.get_users(db, rows, columns=USER_PAGE.columns),
+            users_json,
+        ),
+    }
+
+
+def best_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            gc.collect()
+            start = time.perf_counter()
+            fn(db)
+            times.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return min(times)
+
+
+def peak_memory(fn) -> int:
+    db = SessionLocal()
+    try:
+        gc.collect()
+        tracemalloc.start()
+        loaded = fn(db)  # noqa: F841  held until the peak is read
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rows)
+    print(f"{args.rows} rows per read")
+    print(f"{'read':<28} {'path':<11} {'load ms':>9} {'+json ms':>9} {'peak MB':>8}")
+    for name, (schema, orm, projected, dump) in cases(args.rows).items():
+        adapter = TypeAdapter(list[schema])
+
+        def orm_json(db):
+            return adapter.dump_json(adapter.validate_python(orm(db), from_attributes=True))
+
+        def projection_json(db):
+            return dump(projected(db), db)
+
+        db = SessionLocal()
+        try:
+            assert json.loads(orm_json(db)) == json.loads(projection_json(db)), f"{name}: results differ"
+        finally:
+            db.close()
+        for path, load, full in (("orm", orm, orm_json), ("projection", projected, projection_json)):
+            print(
+                f"{name:<28} {path:<11} {best_time(load, args.repeat) * 1e3:>9.0f}"
+                f" {best_time(full, args.repeat) * 1e3:>9.0f} {peak_memory(load) / 2**20:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
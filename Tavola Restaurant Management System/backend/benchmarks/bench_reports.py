@@ -0,0 +1,164 @@
+"""Sales reports over a year of history: rollups against scanning orders.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_reports [--orders 200000] [--items 80]
+
+Seeds a throwaway database with --orders paid orders (three lines each)
+spread over the last 365 days, then backfills the rollups. It times each
+report over the full year from the rollups and the same totals computed
+ad hoc from orders, items and payments, plus the menu-engineering
+classification cold and cached. Exits non-zero if the two disagree.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.money import apply_rate, from_cents
+from app.crud import menu_engineering as crud_menu_engineering
+from app.crud import reports as crud_reports
+from app.db import models
+from app.db.session import engine, SessionLocal
+
+BATCH = 20_000
+METHODS = ("cash", "credit_card", "debit_card", "mobile_payment")
+
+
+def seed(orders: int, items: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    start = datetime.utcnow() - timedelta(days=365)
+    step = timedelta(days=365) / orders
+    with engine.begin() as conn:
+        conn.execute(models.MenuCategory.__table__.insert(), [{"name": f"Category {i}"} for i in range(8)])
+        conn.execute(
+            models.MenuItem.__table__.insert(),
+            [
+                {"name": f"Item {i}", "price": 5.0 + i % 20, "cost": 2.0 + i % 7, "category_id": i % 8 + 1}
+                for i in range(items)
+            ],
+        )
+        for offset in range(0, orders, BATCH):
+            order_rows, item_rows, payment_rows = [], [], []
+            for n in range(offset, min(offset + BATCH, orders)):
+                at = start + step * n
+                lines = [((n * 7 + k * 13) % items + 1, 1 + (n + k) % 3) for k in range(3)]
+                subtotal = sum((500 + (menu_item_id - 1) % 20 * 100) * quantity for menu_item_id, quantity in lines)
+                tax = apply_rate(subtotal, settings.TAX_RATE)
+                total = subtotal + tax
+                order_rows.append({
+                    "id": n + 1, "order_number": f"ORD-{n}", "status": "completed", "order_type": "dine_in",
+                    "subtotal_cents": subtotal, "tax_cents": tax, "total_cents": total,
+                    "amount_paid_cents": total, "created_at": at, "paid_at": at,
+                })
+                item_rows.extend(
+                    {"order_id": n + 1, "menu_item_id": menu_item_id, "quantity": quantity,
+                     "unit_price_cents": 500 + (menu_item_id - 1) % 20 * 100, "status": "served", "created_at": at}
+                    for menu_item_id, quantity in lines
+                )
+                payment_rows.append({
+                    "order_id": n + 1, "amount_cents": total, "payment_method": METHODS[n % len(METHODS)],
+                    "status": "completed", "created_at": at,
+                })
+            conn.execute(models.Order.__table__.insert(), order_rows)
+            conn.execute(models.OrderItem.__table__.insert(), item_rows)
+            conn.execute(models.Payment.__table__.insert(), payment_rows)
+
+
+def timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def scan_sales(db, start, end):
+    Order, OrderItem, MenuItem = models.Order, models.OrderItem, models.MenuItem
+    return (
+        db.query(func.sum(OrderItem.quantity * OrderItem.unit_price_cents), func.sum(OrderItem.quantity * MenuItem.cost))
+        .join(Order, Order.id == OrderItem.order_id)
+        .join(MenuItem, MenuItem.id == OrderItem.menu_item_id)
+        .filter(Order.paid_at >= start, Order.paid_at < end, OrderItem.status != "cancelled")
+        .one()
+    )
+
+
+def scan_items(db, start, end):
+    Order, OrderItem = models.Order, models.OrderItem
+    return (
+        db.query(OrderItem.menu_item_id, func.sum(OrderItem.quantity))
+        .join(Order, Order.id == OrderItem.order_id)
+        .filter(Order.paid_at >= start, Order.paid_at < end, OrderItem.status != "cancelled")
+        .group_by(OrderItem.menu_item_id)
+        .all()
+    )
+
+
+def scan_payments(db, start, end):
+    Payment = models.Payment
+    return (
+        db.query(Payment.payment_method, func.sum(Payment.amount_cents))
+        .filter(Payment.status == "completed", Payment.created_at >= start, Payment.created_at < end)
+        .group_by(Payment.payment_method)
+        .all()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--items", type=int, default=80)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.orders, args.items)
+    print(f"seeded {args.orders} orders in {time.perf_counter() - started:.0f}s")
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    written = crud_reports.backfill_rollups(db)
+    print(f"backfill: {time.perf_counter() - started:.1f}s, {written}")
+
+    start, end = crud_reports.report_range(datetime.utcnow() - timedelta(days=365), None)
+    print(f"{'report (one year)':<22} {'scan ms':>10} {'rollup ms':>10}")
+    scan_ms, (revenue, cost) = timed(lambda: scan_sales(db, start, end), repeat=3)
+    rollup_ms, sales = timed(lambda: crud_reports.get_sales(db, start, end, "day"))
+    print(f"{'sales by day':<22} {scan_ms:>10.1f} {rollup_ms:>10.1f}")
+    ok = sales["totals"]["revenue"] == from_cents(revenue) and abs(float(sales["totals"]["cost"]) - cost) < 0.01
+
+    scan_ms, expected = timed(lambda: scan_items(db, start, end), repeat=3)
+    rollup_ms, items = timed(lambda: crud_reports.get_item_sales(db, start, end))
+    print(f"{'items':<22} {scan_ms:>10.1f} {rollup_ms:>10.1f}")
+    ok &= dict(expected) == {row["menu_item_id"]: row["quantity"] for row in items}
+
+    scan_ms, expected = timed(lambda: scan_payments(db, start, end), repeat=3)
+    rollup_ms, mix = timed(lambda: crud_reports.get_payment_mix(db, start, end))
+    print(f"{'payment methods':<22} {scan_ms:>10.1f} {rollup_ms:>10.1f}")
+    ok &= all(from_cents(dict(expected)[row["payment_method"]]) == row["amount"] for row in mix)
+
+    def cold():
+        crud_menu_engineering._cache.clear()
+        return crud_menu_engineering.get_menu_engineering(db, start, end)
+
+    cold_ms, engineering = timed(cold)
+    cached_ms, _ = timed(lambda: crud_menu_engineering.get_menu_engineering(db, start, end))
+    print(f"{'menu engineering':<22} {'cold':>10} {cold_ms:>10.1f}")
+    print(f"{'menu engineering':<22} {'cached':>10} {cached_ms:>10.3f}")
+    ok &= sum(item.quantity for item in engineering.items) == sum(row["quantity"] for row in items)
+    db.close()
+    if not ok:
+        print("rollup reports disagree with a scan of orders and payments")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-request overhead of the app's middleware and dependency chain.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_request_overhead [--requests 3000] [--concurrency 10]
+
+Drives main.app in-process through httpx's ASGI transport against a
+throwaway database, so the numbers are framework, dependency and query
+cost without a network. For each endpoint it reports the mean and p99
+latency of sequential requests, then requests/sec with --concurrency in
+flight:
+
+    /auth/me              bearer token -> User from the database
+    /admin/users/1        require_permission -> principal, then a query
+    /restaurant/items     no auth, served from the menu snapshot
+
+To compare revisions, run the same script from a checkout of each.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+
+from main import app, init_db
+from app.crud import tokens as crud_tokens
+from app.db import models
+from app.db.session import SessionLocal
+
+PATHS = ("/api/v1/auth/me", "/api/v1/admin/users/1", "/api/v1/restaurant/items")
+
+
+def seed(items: int) -> str:
+    db = SessionLocal()
+    admin = db.query(models.Role).filter_by(name="admin").one()
+    user = models.User(username="bench", email="bench@bench", hashed_password="x", full_name="Bench", role_id=admin.id)
+    category = models.MenuCategory(name="Bench")
+    db.add_all([user, category])
+    db.flush()
+    db.add_all(
+        models.MenuItem(name=f"Item {i}", price=10.0, cost=4.0, category_id=category.id)
+        for i in range(items)
+    )
+    db.commit()
+    token = crud_tokens.issue_tokens(db, user)["access_token"]
+    db.close()
+    return token
+
+
+async def sequential(client: httpx.AsyncClient, path: str, requests: int) -> list:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return latencies
+
+
+async def concurrent(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            (await client.get(path)).raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def run(token: str, requests: int, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        print(f"{'endpoint':<28} {'mean us':>9} {'p99 us':>9} {'req/s':>9}")
+        for path in PATHS:
+            await sequential(client, path, 200)  # warm up
+            latencies = await sequential(client, path, requests)
+            p99 = statistics.quantiles(latencies, n=100)[98]
+            rps = await concurrent(client, path, requests, concurrency)
+            print(f"{path:<28} {statistics.fmean(latencies) * 1e6:>9.0f} {p99 * 1e6:>9.0f} {rps:>9.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--items", type=int, default=50)
+    args = parser.parse_args()
+
+    init_db()
+    token = seed(args.items)
+    asyncio.run(run(token, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
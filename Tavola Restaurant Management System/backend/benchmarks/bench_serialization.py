@@ -0,0 +1,121 @@
+"""Cost of serializing a large list response: ORM + response_model vs a Projection.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_serialization [--rows 5000] [--requests 30]
+
+Seeds a throwaway database with --rows ingredients and users, then serves
+both from a small app with two routes each, requested in-process through
+httpx's ASGI transport:
+
+    orm    the crud function returns entities; FastAPI validates them
+           against the response_model and encodes them with json
+    fast   the crud function selects the Projection's columns and the
+           route returns projection.page_response(), encoded by pydantic-core
+
+Both routes return the same JSON (checked before timing). The report gives
+the mean time per request and rows/sec for each.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from main import init_db
+from app.api.v1.projections import INGREDIENT_PAGE, USER_PAGE, role_lookup
+from app.crud import inventory as crud_inventory
+from app.crud import user as crud_user
+from app.db import models
+from app.db.session import engine, get_db
+from app.schemas.inventory import InventoryItemResponse
+from app.schemas.user import UserResponse
+
+
+def seed(rows: int) -> None:
+    with engine.begin() as conn:
+        role_id = conn.execute(models.Role.__table__.select().where(models.Role.name == "admin")).first().id
+        conn.execute(
+            models.Ingredient.__table__.insert(),
+            [
+                {"name": f"Ingredient {i}", "unit": "kg", "current_stock": i * 0.5, "min_stock_level": 2.0, "reorder_level": 5.0}
+                for i in range(rows)
+            ],
+        )
+        conn.execute(
+            models.User.__table__.insert(),
+            [
+                {"username": f"user{i}", "email": f"user{i}@bench", "hashed_password": "x", "full_name": f"User {i}", "role_id": role_id}
+                for i in range(rows)
+            ],
+        )
+
+
+def build_app(rows: int) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/orm/items", response_model=list[InventoryItemResponse])
+    def orm_items(db: Session = Depends(get_db)):
+        return crud_inventory.get_ingredients(db, rows).items
+
+    @bench.get("/fast/items", response_model=list[InventoryItemResponse])
+    def fast_items(db: Session = Depends(get_db)):
+        return INGREDIENT_PAGE.page_response(crud_inventory.get_ingredients(db, rows, columns=INGREDIENT_PAGE.columns))
+
+    @bench.get("/orm/users", response_model=list[UserResponse])
+    def orm_users(db: Session = Depends(get_db)):
+        return crud_user.get_users(db, rows).items
+
+    @bench.get("/fast/users", response_model=list[UserResponse])
+    def fast_users(db: Session = Depends(get_db)):
+        users = crud_user.get_users(db, rows, columns=USER_PAGE.columns)
+        roles = role_lookup(crud_user.get_roles(db))
+        return USER_PAGE.page_response(users, role=lambda row: roles.get(row.role_id))
+
+    return bench
+
+
+async def timed(client: httpx.AsyncClient, path: str, requests: int) -> list:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return latencies
+
+
+async def run(rows: int, requests: int) -> None:
+    transport = httpx.ASGITransport(app=build_app(rows))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{rows} rows per response")
+        print(f"{'route':<14} {'mean ms':>9} {'rows/s':>10}")
+        for resource in ("items", "users"):
+            orm, fast = [(await client.get(f"/{path}/{resource}")).json() for path in ("orm", "fast")]
+            assert orm == fast, f"{resource}: responses differ"
+            for path in ("orm", "fast"):
+                latencies = await timed(client, f"/{path}/{resource}", requests)
+                mean = statistics.fmean(latencies)
+                print(f"{path + '/' + resource:<14} {mean * 1e3:>9.1f} {rows / mean:>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rows)
+    asyncio.run(run(args.rows, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Point-in-time stock and per-ingredient history over a long movement log.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_stock_ledger [--rows 10000000] [--ingredients 200] [--days 365]
+
+Seeds a throwaway database with --rows stock movements spread over --days
+days and a stock snapshot at every midnight. Then it compares a full
+replay of the log against crud.inventory.stock_at, and times deep
+per-ingredient pages of GET /inventory/movements?ingredient_id=. Exits
+non-zero if stock_at disagrees with the full replay.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from sqlalchemy import func
+
+from app.crud import inventory as crud_inventory
+from app.crud.pagination import encode_cursor
+from app.db import models
+from app.db.session import engine, SessionLocal
+
+BATCH = 50_000
+START = datetime(2024, 1, 1)
+
+
+def quantity(n: int) -> float:
+    return float((n * 7919) % 21 - 10)
+
+
+def seed(rows: int, ingredients: int, days: int) -> None:
+    models.BaseModel.metadata.create_all(bind=engine)
+    step = timedelta(days=days) / rows
+    balances = [0.0] * ingredients
+    movement_table = models.StockMovement.__table__
+    snapshot_table = models.StockSnapshot.__table__
+    next_midnight = START + timedelta(days=1)
+    with engine.begin() as conn:
+        conn.execute(
+            models.Ingredient.__table__.insert(),
+            [{"name": f"Ingredient {i}", "unit": "kg", "created_at": START} for i in range(ingredients)],
+        )
+        for offset in range(0, rows, BATCH):
+            batch, snapshots = [], []
+            for n in range(offset, min(offset + BATCH, rows)):
+                created_at = START + step * n
+                while created_at >= next_midnight:
+                    snapshots.extend(
+                        {"ingredient_id": i + 1, "taken_at": next_midnight, "balance": balance}
+                        for i, balance in enumerate(balances)
+                    )
+                    next_midnight += timedelta(days=1)
+                balances[n % ingredients] += quantity(n)
+                batch.append({
+                    "ingredient_id": n % ingredients + 1,
+                    "quantity": quantity(n),
+                    "movement_type": "adjustment",
+                    "created_at": created_at,
+                })
+            conn.execute(movement_table.insert(), batch)
+            if snapshots:
+                conn.execute(snapshot_table.insert(), snapshots)
+        for i, balance in enumerate(balances):
+            conn.execute(
+                models.Ingredient.__table__.update()
+                .where(models.Ingredient.__table__.c.id == i + 1)
+                .values(current_stock=balance)
+            )
+
+
+def timed(fn, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def full_replay(db, at: datetime, ingredient_id: int = None) -> dict:
+    query = db.query(models.StockMovement.ingredient_id, func.sum(models.StockMovement.quantity)).filter(
+        models.StockMovement.created_at <= at
+    )
+    if ingredient_id:
+        query = query.filter(models.StockMovement.ingredient_id == ingredient_id)
+    return dict(query.group_by(models.StockMovement.ingredient_id))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--ingredients", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.rows, args.ingredients, args.days)
+    print(f"seeded {args.rows} movements in {time.perf_counter() - started:.0f}s")
+
+    db = SessionLocal()
+    rng = random.Random(1)
+    ok = True
+    print(f"{'query':<28} {'replay ms':>10} {'snapshot ms':>12}")
+    for fraction in (0.1, 0.5, 0.99):
+        at = START + timedelta(days=args.days * fraction, hours=rng.randint(1, 20))
+        ingredient_id = rng.randint(1, args.ingredients)
+        for label, target in ((f"all @ {fraction:.0%}", None), (f"one @ {fraction:.0%}", ingredient_id)):
+            replay_ms, expected = timed(lambda: full_replay(db, at, target))
+            ledger_ms, levels = timed(lambda: crud_inventory.stock_at(db, at, target))
+            ok &= all(abs(levels.get(i, 0.0) - stock) < 1e-6 for i, stock in expected.items())
+            print(f"{label:<28} {replay_ms:>10.1f} {ledger_ms:>12.1f}")
+
+    ingredient_id = rng.randint(1, args.ingredients)
+    movements = models.StockMovement
+    for fraction in (0.0, 0.5, 0.99):
+        anchor = (
+            db.query(movements.created_at, movements.id)
+            .filter(movements.created_at >= START + timedelta(days=args.days * fraction))
+            .order_by(movements.created_at, movements.id)
+            .first()
+        )
+        cursor = encode_cursor(*anchor) if fraction else None
+
+        def page():
+            rows = crud_inventory.get_stock_movements(db, ingredient_id, 100, cursor)
+            db.expunge_all()
+            return rows
+
+        page_ms, _ = timed(page)
+        print(f"{f'ingredient page @ {fraction:.0%}':<28} {'':>10} {page_ms:>12.1f}")
+    db.close()
+    if not ok:
+        print("stock_at disagrees with a full replay of the log")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Check that concurrent stock movements never lose an update.
+
+Usage (from the backend directory):
+    python -m benchmarks.stress_stock_movements [--threads 8] [--movements 200]
+
+Each of --threads threads records --movements random movements against the
+same ingredient through crud.inventory.create_stock_movement. The final
+stock must equal the initial stock plus the sum of the movements. A second
+run with the non-negative guard drains a small stock concurrently and checks
+that the stock never goes below zero and that refused movements left no
+movement row. Exits non-zero on any mismatch.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+if "DATABASE_URI" not in os.environ:
+    os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from sqlalchemy import func
+
+from app.crud import inventory as crud_inventory
+from app.db import models
+from app.db.session import engine, SessionLocal
+from app.schemas.inventory import StockMovementCreate
+
+
+def new_ingredient(name: str, stock: float) -> int:
+    db = SessionLocal()
+    ingredient = models.Ingredient(name=name, unit="pcs", current_stock=stock)
+    db.add(ingredient)
+    db.commit()
+    ingredient_id = ingredient.id
+    db.close()
+    return ingredient_id
+
+
+def run_threads(threads: int, work) -> float:
+    start = time.perf_counter()
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def stock_and_movements(ingredient_id: int) -> tuple:
+    db = SessionLocal()
+    stock = db.query(models.Ingredient.current_stock).filter(models.Ingredient.id == ingredient_id).scalar()
+    moved = db.query(func.coalesce(func.sum(models.StockMovement.quantity), 0.0)).filter(
+        models.StockMovement.ingredient_id == ingredient_id
+    ).scalar()
+    db.close()
+    return stock, moved
+
+
+def check_sum(threads: int, movements: int) -> bool:
+    ingredient_id = new_ingredient("Flour", 1000.0)
+    applied = [0] * threads
+
+    def work(n: int) -> None:
+        rng = random.Random(n)
+        db = SessionLocal()
+        for _ in range(movements):
+            quantity = rng.randint(-5, 10)
+            crud_inventory.create_stock_movement(
+                db, StockMovementCreate(ingredient_id=ingredient_id, quantity=quantity, movement_type="adjustment")
+            )
+            applied[n] += quantity
+        db.close()
+
+    elapsed = run_threads(threads, work)
+    stock, moved = stock_and_movements(ingredient_id)
+    expected = 1000.0 + sum(applied)
+    total = threads * movements
+    print(f"sum check:   {total} movements in {elapsed:.2f}s, stock {stock} (expected {expected}, logged {1000.0 + moved})")
+    return stock == expected == 1000.0 + moved
+
+
+def check_guard(threads: int, movements: int) -> bool:
+    initial = float(threads * movements // 2)
+    ingredient_id = new_ingredient("Eggs", initial)
+    refused = [0] * threads
+
+    def work(n: int) -> None:
+        db = SessionLocal()
+        for _ in range(movements):
+            try:
+                crud_inventory.create_stock_movement(
+                    db,
+                    StockMovementCreate(ingredient_id=ingredient_id, quantity=-1, movement_type="consumption"),
+                    non_negative=True,
+                )
+            except crud_inventory.StockError:
+                db.rollback()
+                refused[n] += 1
+        db.close()
+
+    run_threads(threads, work)
+    stock, moved = stock_and_movements(ingredient_id)
+    print(f"guard check: stock {stock} after draining {initial} with {threads * movements} decrements, {sum(refused)} refused")
+    return stock == 0 and initial + moved == 0 and sum(refused) == threads * movements - initial
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--movements", type=int, default=200)
+    args = parser.parse_args()
+
+    models.BaseModel.metadata.create_all(bind=engine)
+    ok = check_sum(args.threads, args.movements)
+    ok = check_guard(args.threads, args.movements) and ok
+    if not ok:
+        print("stock does not match the recorded movements")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,57 +2,93 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.core import metrics, passwords
 from app.core.config import settings
+from app.core.middleware import RequestContextMiddleware
+from app.core.revocation import revoked_tokens
+from app.crud.pagination import NEXT_CURSOR_HEADER
 from app.db.session import engine
 from app.db import models
 from app.api.v1 import api_router
 
-# Try to create all database tables, but don't fail if database is unavailable
-try:
-    models.BaseModel.metadata.create_all(bind=engine)
-except Exception as e:
-    print(f"Warning: Could not initialize database: {e}")
-    print("Running in development mode without database")
-
-# Seed default permissions and ensure admin role has permissions
-try:
-    from app.db.session import SessionLocal
-    db = SessionLocal()
-    # Default permissions
-    default_perms = [
-        ("view_users", "View users"),
-        ("manage_users", "Create/update/delete users"),
-        ("view_roles", "View roles"),
-        ("manage_roles", "Create/update/delete roles"),
-        ("view_permissions", "View permissions"),
-        ("manage_permissions", "Create/delete permissions"),
-    ]
-    perms = []
-    for name, desc in default_perms:
-        p = db.query(models.User.__table__.metadata.tables['permission'].c if False else models.Permission).filter(models.Permission.name == name).first()
-        if not p:
-            p = models.Permission(name=name, description=desc)
-            db.add(p)
+
+def init_db():
+    """Create the tables and bring seeded and cached state up to date.
+
+    Runs on startup rather than at import: password hashing workers are
+    spawned and re-import the entry module, which must not touch the
+    database each time. Scripts that drive the app in-process call it
+    themselves.
+    """
+    # Try to create all database tables, but don't fail if database is unavailable
+    try:
+        models.BaseModel.metadata.create_all(bind=engine)
+    except Exception as e:
+        print(f"Warning: Could not initialize database: {e}")
+        print("Running in development mode without database")
+
+    # Seed default permissions and ensure admin role has permissions
+    try:
+        from app.db.session import SessionLocal
+        db = SessionLocal()
+        # Default permissions
+        default_perms = [
+            ("view_users", "View users"),
+            ("manage_users", "Create/update/delete users"),
+            ("view_roles", "View roles"),
+            ("manage_roles", "Create/update/delete roles"),
+            ("view_permissions", "View permissions"),
+            ("manage_permissions", "Create/delete permissions"),
+            ("view_reports", "View sales reports"),
+            ("manage_reports", "Rebuild report rollups"),
+            ("manage_billing", "Check and repair order totals and paid balances"),
+        ]
+        perms = []
+        for name, desc in default_perms:
+            p = db.query(models.User.__table__.metadata.tables['permission'].c if False else models.Permission).filter(models.Permission.name == name).first()
+            if not p:
+                p = models.Permission(name=name, description=desc)
+                db.add(p)
+                db.commit()
+                db.refresh(p)
+            perms.append(p)
+
+        # Ensure admin role exists and has all permissions
+        admin_role = db.query(models.Role).filter(models.Role.name == 'admin').first()
+        if not admin_role:
+            admin_role = models.Role(name='admin', description='Administrator')
+            db.add(admin_role)
             db.commit()
-            db.refresh(p)
-        perms.append(p)
-
-    # Ensure admin role exists and has all permissions
-    admin_role = db.query(models.Role).filter(models.Role.name == 'admin').first()
-    if not admin_role:
-        admin_role = models.Role(name='admin', description='Administrator')
-        db.add(admin_role)
+            db.refresh(admin_role)
+
+        # Attach permissions to admin role
+        for p in perms:
+            if p not in admin_role.permissions:
+                admin_role.permissions.append(p)
         db.commit()
-        db.refresh(admin_role)
+        db.close()
+    except Exception as e:
+        print(f"Warning: Failed to seed permissions: {e}")
+
+    # Bring the low-stock alert table in line with current stock
+    try:
+        from app.db.session import SessionLocal
+        from app.crud.alerts import rebuild_alerts
+        db = SessionLocal()
+        rebuild_alerts(db)
+        db.close()
+    except Exception as e:
+        print(f"Warning: Failed to rebuild stock alerts: {e}")
+
+    # Load revoked access token ids into memory
+    try:
+        from app.db.session import SessionLocal
+        db = SessionLocal()
+        revoked_tokens.rebuild(db)
+        db.close()
+    except Exception as e:
+        print(f"Warning: Failed to load revoked tokens: {e}")
 
-    # Attach permissions to admin role
-    for p in perms:
-        if p not in admin_role.permissions:
-            admin_role.permissions.append(p)
-    db.commit()
-    db.close()
-except Exception as e:
-    print(f"Warning: Failed to seed permissions: {e}")
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -69,11 +105,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # read by clients paging through lists
 )
 
+# Per-request session and principal, security headers. Added last so it
+# wraps CORS and its headers reach preflight responses too.
+app.add_middleware(RequestContextMiddleware)
+
 # Include API routers
 app.include_router(api_router)
 
+
+@app.on_event("startup")
+def start_up():
+    init_db()
+    revoked_tokens.start()
+
+
+@app.on_event("shutdown")
+def stop_background_work():
+    revoked_tokens.stop()
+    passwords.shutdown()
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -86,6 +140,10 @@ async def health_check():
         },
     )
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
 @app.get("/")
 async def root():
     return {
@@ -98,6 +156,8 @@ async def root():
             "restaurant": f"{settings.API_V1_STR}/restaurant",
             "cashier": f"{settings.API_V1_STR}/cashier",
             "inventory": f"{settings.API_V1_STR}/inventory",
+            "kitchen": f"{settings.API_V1_STR}/kitchen",
+            "reports": f"{settings.API_V1_STR}/reports",
         }
     }
 
@@ -68,7 +68,9 @@ const Dashboard = ({ onLogout }) => {
   };
 
   const handleLogout = () => {
+    APIService.logout().catch(() => {});
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     onLogout();
   };
 
@@ -16,6 +16,7 @@ const LoginPage = ({ onLoginSuccess }) => {
     try {
       const response = await APIService.login(username, password);
       localStorage.setItem('token', response.access_token);
+      localStorage.setItem('refresh_token', response.refresh_token);
       setUsername('');
       setPassword('');
       onLoginSuccess(response);
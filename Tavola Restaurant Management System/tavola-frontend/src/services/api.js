@@ -2,6 +2,7 @@ class APIService {
   constructor() {
     this.baseURL = '/api/v1';
     this.token = localStorage.getItem('token');
+    this.refreshing = null;
   }
 
   getAuthHeaders() {
@@ -12,6 +13,67 @@ class APIService {
     };
   }
 
+  // Retries once with a fresh access token when the current one has expired
+  async fetchWithAuth(url, options) {
+    const sentToken = localStorage.getItem('token');
+    let response = await fetch(url, options);
+    if (response.status === 401) {
+      // Another request may already have refreshed while this one was in flight
+      const refreshed = localStorage.getItem('token') !== sentToken || await this.refreshToken();
+      if (refreshed) {
+        response = await fetch(url, { ...options, headers: { ...options.headers, ...this.getAuthHeaders() } });
+      }
+    }
+    return response;
+  }
+
+  // Refresh tokens are single use: presenting one twice revokes the whole
+  // session, so concurrent 401s share a single refresh request
+  refreshToken() {
+    if (!this.refreshing) {
+      this.refreshing = this.sendRefresh().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
+  }
+
+  async sendRefresh() {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) return false;
+    const response = await fetch(`${this.baseURL}/auth/refresh`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken })
+    });
+    if (!response.ok) {
+      localStorage.removeItem('refresh_token');
+      return false;
+    }
+    const data = await response.json();
+    localStorage.setItem('token', data.access_token);
+    localStorage.setItem('refresh_token', data.refresh_token);
+    return true;
+  }
+
+  // List endpoints return one page at a time; follow X-Next-Cursor until the last page
+  async fetchAllPages(url, errorMessage) {
+    const items = [];
+    let cursor = null;
+    do {
+      const params = new URLSearchParams({ limit: '1000', ...(cursor && { cursor }) });
+      const separator = url.includes('?') ? '&' : '?';
+      const response = await this.fetchWithAuth(`${url}${separator}${params}`, {
+        method: 'GET',
+        headers: this.getAuthHeaders()
+      });
+      if (!response.ok) throw new Error(errorMessage);
+      items.push(...await response.json());
+      cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+  }
+
   // Auth endpoints
   async login(username, password) {
     const response = await fetch(`${this.baseURL}/auth/login`, {
@@ -25,18 +87,20 @@ class APIService {
     return await response.json();
   }
 
-  // User endpoints
-  async getUsers() {
-    const response = await fetch(`${this.baseURL}/admin/users`, {
-      method: 'GET',
+  async logout() {
+    await fetch(`${this.baseURL}/auth/logout`, {
+      method: 'POST',
       headers: this.getAuthHeaders()
     });
-    if (!response.ok) throw new Error('Failed to fetch users');
-    return await response.json();
+  }
+
+  // User endpoints
+  async getUsers() {
+    return this.fetchAllPages(`${this.baseURL}/admin/users`, 'Failed to fetch users');
   }
 
   async createUser(username, email, password, full_name) {
-    const response = await fetch(`${this.baseURL}/admin/users`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/admin/users`, {
       method: 'POST',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ username, email, password, full_name })
@@ -47,7 +111,7 @@ class APIService {
 
   // Permission endpoints
   async getPermissions() {
-    const response = await fetch(`${this.baseURL}/admin/permissions`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/admin/permissions`, {
       method: 'GET',
       headers: this.getAuthHeaders()
     });
@@ -56,7 +120,7 @@ class APIService {
   }
 
   async createPermission(name, description) {
-    const response = await fetch(`${this.baseURL}/admin/permissions`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/admin/permissions`, {
       method: 'POST',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ name, description })
@@ -66,7 +130,7 @@ class APIService {
   }
 
   async deletePermission(permissionId) {
-    const response = await fetch(`${this.baseURL}/admin/permissions/${permissionId}`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/admin/permissions/${permissionId}`, {
       method: 'DELETE',
       headers: this.getAuthHeaders(),
     });
@@ -75,7 +139,7 @@ class APIService {
   }
 
   async getCurrentUser() {
-    const response = await fetch(`${this.baseURL}/auth/me`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/auth/me`, {
       method: 'GET',
       headers: this.getAuthHeaders(),
     });
@@ -85,7 +149,7 @@ class APIService {
 
   // Menu endpoints
   async getMenuCategories() {
-    const response = await fetch(`${this.baseURL}/restaurant/categories`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/restaurant/categories`, {
       method: 'GET',
       headers: this.getAuthHeaders()
     });
@@ -97,7 +161,7 @@ class APIService {
     const url = categoryId 
       ? `${this.baseURL}/restaurant/items?category_id=${categoryId}`
       : `${this.baseURL}/restaurant/items`;
-    const response = await fetch(url, {
+    const response = await this.fetchWithAuth(url, {
       method: 'GET',
       headers: this.getAuthHeaders()
     });
@@ -106,7 +170,7 @@ class APIService {
   }
 
   async createMenuItem(name, description, category_id, price, cost) {
-    const response = await fetch(`${this.baseURL}/restaurant/items`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/restaurant/items`, {
       method: 'POST',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ name, description, category_id, price, cost, is_available: true })
@@ -117,16 +181,11 @@ class APIService {
 
   // Order endpoints
   async getOrders() {
-    const response = await fetch(`${this.baseURL}/restaurant/orders`, {
-      method: 'GET',
-      headers: this.getAuthHeaders()
-    });
-    if (!response.ok) throw new Error('Failed to fetch orders');
-    return await response.json();
+    return this.fetchAllPages(`${this.baseURL}/restaurant/orders`, 'Failed to fetch orders');
   }
 
   async createOrder(table_id, order_type, items) {
-    const response = await fetch(`${this.baseURL}/restaurant/orders`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/restaurant/orders`, {
       method: 'POST',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ table_id, order_type, items })
@@ -136,7 +195,7 @@ class APIService {
   }
 
   async updateOrderStatus(order_id, status) {
-    const response = await fetch(`${this.baseURL}/restaurant/orders/${order_id}/status`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/restaurant/orders/${order_id}/status`, {
       method: 'PUT',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ status })
@@ -147,7 +206,7 @@ class APIService {
 
   // Cashier endpoints
   async generateInvoice(order_id) {
-    const response = await fetch(`${this.baseURL}/cashier/orders/${order_id}/invoice`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/cashier/orders/${order_id}/invoice`, {
       method: 'GET',
       headers: this.getAuthHeaders()
     });
@@ -156,7 +215,7 @@ class APIService {
   }
 
   async processPayment(order_id, amount, payment_method) {
-    const response = await fetch(`${this.baseURL}/cashier/payments`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/cashier/payments`, {
       method: 'POST',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ order_id, amount, payment_method })
@@ -167,16 +226,11 @@ class APIService {
 
   // Inventory endpoints
   async getInventoryItems() {
-    const response = await fetch(`${this.baseURL}/inventory/items`, {
-      method: 'GET',
-      headers: this.getAuthHeaders()
-    });
-    if (!response.ok) throw new Error('Failed to fetch inventory');
-    return await response.json();
+    return this.fetchAllPages(`${this.baseURL}/inventory/items`, 'Failed to fetch inventory');
   }
 
   async getLowStockItems() {
-    const response = await fetch(`${this.baseURL}/inventory/items/low-stock`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/inventory/items/low-stock`, {
       method: 'GET',
       headers: this.getAuthHeaders()
     });
@@ -185,7 +239,7 @@ class APIService {
   }
 
   async createInventoryItem(name, unit, current_stock, min_stock_level, reorder_level) {
-    const response = await fetch(`${this.baseURL}/inventory/items`, {
+    const response = await this.fetchWithAuth(`${this.baseURL}/inventory/items`, {
       method: 'POST',
       headers: this.getAuthHeaders(),
       body: JSON.stringify({ name, unit, current_stock, min_stock_level, reorder_level })
@@ -196,12 +250,7 @@ class APIService {
 
   // Tables
   async getTables() {
-    const response = await fetch(`${this.baseURL}/restaurant/tables`, {
-      method: 'GET',
-      headers: this.getAuthHeaders()
-    });
-    if (!response.ok) throw new Error('Failed to fetch tables');
-    return await response.json();
+    return this.fetchAllPages(`${this.baseURL}/restaurant/tables`, 'Failed to fetch tables');
   }
 }
 